@@ -6,9 +6,27 @@
 
 import ply.lex as lex
 import ply.yacc as yacc
+import array
+import asyncio
+import bisect
+import contextlib
+import hashlib
+import importlib.util
+import io
+import itertools
+from collections import ChainMap, OrderedDict, deque
+import functools
+import json
+import math
+import multiprocessing
+import operator
 import pprint
+import re
+import struct
 import sys
 import os
+import time
+import weakref
 
 # Nomes dos arquivos de saída (Globais)
 ARQ_IN = 'codigo_fonte.lisp'
@@ -26,7 +44,9 @@ reserved = {
     'geq' : 'MAIORIGUAL', 'leq' : 'MENORIGUAL', 'eq' : 'IGUAL', 'neq' : 'DIFERENTE',
     'cond' : 'COND', 'and' : 'AND', 'or' : 'OR', 'not' : 'NOT',
     'defun' : 'DEFUN', 'nil' : 'NIL', 'car' : 'CAR', 'cdr' : 'CDR',
-    'cons' : 'CONS', 'if' : 'IF', 'print': 'PRINT'
+    'cons' : 'CONS', 'if' : 'IF', 'print': 'PRINT',
+    'let' : 'LET', 'setq' : 'SETQ', 'while' : 'WHILE', 'dotimes' : 'DOTIMES',
+    'mapcar' : 'MAPCAR', 'reduce' : 'REDUCE'
 }
 
 tokens = [
@@ -47,6 +67,8 @@ def t_NUMERO(t):
 def t_IDENTIFICADOR(t):
     r'[a-zA-Z_][a-zA-Z_0-9]*'
     t.type = reserved.get(t.value.lower(), 'IDENTIFICADOR')
+    # Nome internado: o mesmo objeto str percorre AST, código gerado e o Simbolo da VM
+    t.value = sys.intern(t.value)
     return t
 
 def t_newline(t):
@@ -57,7 +79,20 @@ def t_error(t):
     print(f"Caractere ilegal '{t.value[0]}' na linha {t.lexer.lineno}")
     t.lexer.skip(1)
 
-lexer = lex.lex()
+_lexer_base = None
+
+def obter_lexer():
+    """Lexer pronto para uso: clone do lexer construído uma única vez por processo."""
+    global _lexer_base
+    if _lexer_base is None: _lexer_base = lex.lex(module=sys.modules[__name__])
+    return _lexer_base.clone()
+
+def tokenizar(texto, linha_inicial=1):
+    """Uma única passada do lexer; a lista serve ao log de tokens e ao parser."""
+    lx = obter_lexer()
+    lx.lineno = linha_inicial
+    lx.input(texto)
+    return list(lx)
 
 # =============================================================
 # 2. ANALISADOR SINTÁTICO (PARSER)
@@ -65,6 +100,11 @@ lexer = lex.lex()
 
 start = 'programa'
 
+def _marcar(p, no):
+    """Guarda a linha do '(' que abre `no` (as mensagens do ligador usam)."""
+    p.parser.linhas[id(no)] = p.lineno(1)
+    return no
+
 def p_programa(p):
     '''programa : programa expressao
                 | expressao'''
@@ -80,6 +120,10 @@ def p_expressao(p):
                  | expressao_logica
                  | expressao_lista
                  | expressao_io
+                 | expressao_let
+                 | expressao_setq
+                 | expressao_laco
+                 | expressao_vetorial
                  | lista_generica'''
     p[0] = p[1]
 
@@ -91,7 +135,7 @@ def p_atomo(p):
 
 def p_expressao_aritmetica(p):
     '''expressao_aritmetica : PARENTESE_ESQ op_aritmetico lista_de_expressoes PARENTESE_DIR'''
-    p[0] = (p[2], p[3]) 
+    p[0] = _marcar(p, (p[2], p[3]))
 
 def p_op_aritmetico(p):
     '''op_aritmetico : MAIS
@@ -104,7 +148,7 @@ def p_op_aritmetico(p):
 
 def p_expressao_comparacao(p):
     '''expressao_comparacao : PARENTESE_ESQ op_comparacao expressao expressao PARENTESE_DIR'''
-    p[0] = (p[2], p[3], p[4])
+    p[0] = _marcar(p, (p[2], p[3], p[4]))
 
 def p_op_comparacao(p):
     '''op_comparacao : IGUAL
@@ -119,23 +163,23 @@ def p_expressao_logica(p):
     '''expressao_logica : PARENTESE_ESQ NOT expressao PARENTESE_DIR
                         | PARENTESE_ESQ AND expressao expressao PARENTESE_DIR
                         | PARENTESE_ESQ OR expressao expressao PARENTESE_DIR'''
-    if p[2].lower() == 'not': p[0] = (p[2], p[3])
-    else: p[0] = (p[2], p[3], p[4])
+    if p[2].lower() == 'not': p[0] = _marcar(p, (p[2], p[3]))
+    else: p[0] = _marcar(p, (p[2], p[3], p[4]))
 
 def p_expressao_lista(p):
     '''expressao_lista : PARENTESE_ESQ CAR expressao PARENTESE_DIR
                        | PARENTESE_ESQ CDR expressao PARENTESE_DIR
                        | PARENTESE_ESQ CONS expressao expressao PARENTESE_DIR'''
-    if p[2].lower() == 'cons': p[0] = (p[2], p[3], p[4])
-    else: p[0] = (p[2], p[3])
+    if p[2].lower() == 'cons': p[0] = _marcar(p, (p[2], p[3], p[4]))
+    else: p[0] = _marcar(p, (p[2], p[3]))
 
 def p_expressao_io(p):
     '''expressao_io : PARENTESE_ESQ PRINT expressao PARENTESE_DIR'''
-    p[0] = (p[2], p[3])
+    p[0] = _marcar(p, (p[2], p[3]))
 
 def p_definicao_funcao(p):
     'definicao_funcao : PARENTESE_ESQ DEFUN IDENTIFICADOR lista_parametros expressao PARENTESE_DIR'
-    p[0] = ('defun', p[3], p[4], p[5])
+    p[0] = _marcar(p, ('defun', p[3], p[4], p[5]))
 
 def p_lista_parametros(p):
     'lista_parametros : PARENTESE_ESQ lista_de_expressoes PARENTESE_DIR'
@@ -143,11 +187,52 @@ def p_lista_parametros(p):
 
 def p_expressao_if(p):
     'expressao_if : PARENTESE_ESQ IF expressao expressao expressao PARENTESE_DIR'
-    p[0] = ('if', p[3], p[4], p[5])
+    p[0] = _marcar(p, ('if', p[3], p[4], p[5]))
+
+# --- Variáveis locais e laços ---
+# (let ((x e1) (y e2)) corpo...) vira lets aninhados de uma variável cada
+# (sequencial, como let*); corpos de várias expressões viram ('progn', ...).
+# (dotimes (i n) corpo...) é açúcar para let + while.
+
+def _sequencia(exprs):
+    if not exprs: return 'nil'
+    return exprs[0] if len(exprs) == 1 else ('progn', *exprs)
+
+def p_expressao_let(p):
+    'expressao_let : PARENTESE_ESQ LET PARENTESE_ESQ lista_de_ligacoes PARENTESE_DIR lista_de_expressoes PARENTESE_DIR'
+    corpo = _sequencia(p[6])
+    for nome, valor in reversed(p[4]): corpo = _marcar(p, ('let', nome, valor, corpo))
+    p[0] = corpo
+
+def p_lista_de_ligacoes(p):
+    '''lista_de_ligacoes : PARENTESE_ESQ IDENTIFICADOR expressao PARENTESE_DIR lista_de_ligacoes
+                         | '''
+    if len(p) == 6: p[0] = [(p[2], p[3])] + p[5]
+    else: p[0] = []
+
+def p_expressao_setq(p):
+    'expressao_setq : PARENTESE_ESQ SETQ IDENTIFICADOR expressao PARENTESE_DIR'
+    p[0] = _marcar(p, ('setq', p[3], p[4]))
+
+def p_expressao_laco(p):
+    '''expressao_laco : PARENTESE_ESQ WHILE expressao lista_de_expressoes PARENTESE_DIR
+                      | PARENTESE_ESQ DOTIMES PARENTESE_ESQ IDENTIFICADOR expressao PARENTESE_DIR lista_de_expressoes PARENTESE_DIR'''
+    if len(p) == 6:
+        p[0] = _marcar(p, ('while', p[3], _sequencia(p[4])))
+    else:
+        # O limite é avaliado uma vez, numa variável que o programa não consegue nomear
+        i, corpo = p[4], p[7] + [('setq', p[4], ('+', [p[4], 1]))]
+        p[0] = _marcar(p, ('let', '%fim', p[5], ('let', i, 0, ('while', ('lt', i, '%fim'), _sequencia(corpo)))))
+
+# --- Builtins vetoriais com operador: (mapcar + a b) e (reduce * l) ---
+def p_expressao_vetorial(p):
+    '''expressao_vetorial : PARENTESE_ESQ MAPCAR op_aritmetico expressao expressao PARENTESE_DIR
+                          | PARENTESE_ESQ REDUCE op_aritmetico expressao PARENTESE_DIR'''
+    p[0] = _marcar(p, (p[2].lower(), p[3], *p[4:len(p) - 1]))
 
 def p_lista_generica(p):
     'lista_generica : PARENTESE_ESQ lista_de_expressoes PARENTESE_DIR'
-    p[0] = p[2]
+    p[0] = _marcar(p, p[2])
 
 def p_lista_de_expressoes(p):
     '''lista_de_expressoes : expressao lista_de_expressoes
@@ -159,64 +244,320 @@ def p_error(p):
     if p: print(f"Erro de sintaxe: '{p.value}' linha {p.lineno}")
     else: print("Erro de sintaxe: fim inesperado.")
 
-parser = yacc.yacc()
+# Tabelas LALR pré-computadas, ao lado deste arquivo (nunca no diretório atual)
+ARQ_TABELAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parsetab.py')
+
+_parser = None
+
+def obter_parser():
+    """Parser construído uma única vez por processo, a partir de parsetab.py.
+
+    Não grava nada: sem parser.out e, se a gramática mudou, as tabelas são
+    refeitas só em memória (use --gerar-tabelas para atualizar parsetab.py).
+    """
+    global _parser
+    if _parser is None:
+        tabelas = 'parsetab'
+        if os.path.exists(ARQ_TABELAS):
+            spec = importlib.util.spec_from_file_location('parsetab', ARQ_TABELAS)
+            tabelas = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(tabelas)
+        _parser = yacc.yacc(module=sys.modules[__name__], tabmodule=tabelas,
+                            debug=False, write_tables=False)
+    return _parser
+
+def gerar_tabelas_parser():
+    """Regrava parsetab.py (necessário só quando a gramática muda)."""
+    yacc.yacc(module=sys.modules[__name__], tabmodule='parsetab', debug=False,
+              outputdir=os.path.dirname(ARQ_TABELAS))
+
+class _FonteDeTokens:
+    """Entrega ao parser tokens já produzidos por tokenizar()."""
+    def __init__(self, tokens): self._tokens = iter(tokens)
+    def token(self): return next(self._tokens, None)
+
+class Programa(list):
+    """AST de um programa: a lista das formas de topo, mais a linha de cada forma composta."""
+    def __init__(self, formas, linhas):
+        super().__init__(formas)
+        self.linhas = linhas   # id(nó) -> linha do '(' que o abre
+
+def analisar(tokens):
+    """Constrói a AST a partir da lista de tokens de tokenizar()."""
+    parser = obter_parser()
+    parser.linhas = {}
+    ast = parser.parse(lexer=_FonteDeTokens(tokens))
+    return Programa(ast, parser.linhas) if ast else ast
+
+def __getattr__(nome):
+    # Compatibilidade: `analizador.lexer` / `analizador.parser` continuam existindo,
+    # mas só são construídos no primeiro acesso.
+    if nome == 'lexer': return obter_lexer()
+    if nome == 'parser': return obter_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
 
 # =============================================================
 # 3. GERADOR DE CÓDIGO INTERMEDIÁRIO
 # =============================================================
 
-codigo_intermediario = []
-tabela_global_funcoes = {}
+class Compilador:
+    """Estado de uma sessão de compilação; cada VM (ou job em lote) tem o seu."""
+    def __init__(self, funcoes=None):
+        self.codigo = []    # código intermediário da compilação em curso (não acumula)
+        self.funcoes = {} if funcoes is None else funcoes   # nome -> label, aridade, pureza
+        # Numeração dos labels de `if` (independe do tamanho de self.codigo)
+        self.labels = itertools.count()
+        # Builtins vetoriais que o programa redefiniu (calculado a cada compilação)
+        self.sombreadas = set()
+        # Chamadas a funções ainda não definidas (modo incremental): nome -> [(linha, n_args, chamador)]
+        self.pendentes = {}
+        # Grafo reverso das chamadas (nome -> funções que o chamam) e label -> nome:
+        # uma (re)definição só mexe na pureza e nos caches de quem depende dela
+        self.chamadores = {}
+        self.por_label = {}
+        self.aridades = {}   # nome -> número de parâmetros (o que ligar consulta)
+        for nome, meta in self.funcoes.items(): self._indexar(nome, meta)
+        self.alteradas = set()   # funções (re)definidas na compilação em curso
+
+    def definir(self, nome, meta):
+        """Registra (ou troca) a função `nome`, mantendo os índices em dia."""
+        antiga = self.funcoes.get(nome)
+        if antiga is not None:
+            for chamada in antiga.get('chama', ()): self.chamadores.get(chamada, set()).discard(nome)
+        self.funcoes[nome] = meta
+        self._indexar(nome, meta)
+        self.alteradas.add(nome)
+
+    def _indexar(self, nome, meta):
+        for chamada in meta.get('chama', ()): self.chamadores.setdefault(chamada, set()).add(nome)
+        self.por_label[meta['label']] = nome
+        self.aridades[nome] = meta['n_params']
+
+def afetadas(nomes, chamadores):
+    """`nomes` mais as funções que chamam alguma delas, direta ou indiretamente."""
+    vistas, pendentes = set(nomes), list(nomes)
+    while pendentes:
+        for chamador in chamadores.get(pendentes.pop(), ()):
+            if chamador not in vistas:
+                vistas.add(chamador)
+                pendentes.append(chamador)
+    return vistas
 
 mapa_op = {
     '+': 'ADD', '-': 'SUB', '*': 'MUL', '/': 'DIV', 'div': 'DIV', 'mod': 'MOD',
     'eq': 'EQ', 'gt': 'GT', 'lt': 'LT', 'geq': 'GEQ', 'leq': 'LEQ', 'neq': 'NEQ',
     'car': 'CAR', 'cdr': 'CDR', 'cons': 'CONS',
-    'not': 'NOT', 'and': 'AND', 'or': 'OR', 'print': 'PRINT'
+    'not': 'NOT', 'and': 'AND', 'or': 'OR', 'print': 'PRINT',
+    # Builtins vetoriais chamados pelo nome (uma função do programa com o mesmo nome tem prioridade)
+    'range': 'RANGE', 'sum': 'SUM', 'length': 'LENGTH', 'vetor': 'VETOR',
+    'mapcar': 'MAPCAR', 'reduce': 'REDUCE',
 }
+PRIMITIVAS_VETOR = {'range', 'sum', 'length', 'vetor'}
+
+def label_funcao(nome):
+    return f'FUNC_{nome.upper()}'
+
+# --- Ligação: nomes resolvidos no programa inteiro, antes de gerar código ---
 
-def gerar_codigo(node, escopo_local=None):
+# Builtins chamados pelo nome: (mínimo, máximo) de argumentos
+ARIDADE_PRIMITIVAS = {'range': (1, 2), 'sum': (1, 1), 'length': (1, 1), 'vetor': (1, 1)}
+
+class ErroLigacao(ValueError):
+    """O programa não ligou; `erros` traz uma mensagem (com a linha) por problema."""
+    def __init__(self, erros):
+        self.erros = erros
+        super().__init__('\n'.join(erros))
+
+def _onde(linha):
+    # ASTs montadas à mão (sem passar pelo parser) não têm linhas
+    return f'linha {linha}: ' if linha else ''
+
+def ligar(ast, aridades, pendentes, incremental=False):
+    """Confere todas as chamadas e variáveis de `ast`; devolve (aridades visíveis, avisos).
+
+    `aridades` (nome -> parâmetros) são as funções já definidas na sessão; as
+    defuns de `ast` valem no programa inteiro, antes e depois da definição.
+    Função desconhecida, aridade errada e setq sem variável levantam um
+    ErroLigacao com todos os problemas. Nome livre dentro de uma defun vale
+    como símbolo (só gera aviso). No modo incremental (shell, fluxo, servidor)
+    uma defun pode chamar uma função que ainda vai ser definida: a chamada
+    fica em `pendentes` e a aridade é conferida quando a definição chegar.
+    """
+    linhas = getattr(ast, 'linhas', {})
+    definidas, chamadas, erros, avisos = {}, [], [], []
+
+    # Uma passada só: coleta as defuns e os sítios de chamada, que são conferidos no fim
+    def visitar(node, escopo, funcao, linha):
+        linha = linhas.get(id(node), linha)
+        if type(node) is str:
+            if funcao is not None and node not in escopo and node != 'nil':
+                avisos.append(f"{_onde(linha)}'{node}' não é parâmetro nem variável de let em"
+                              f" '{funcao}'; vale como símbolo")
+            return
+        if not isinstance(node, (list, tuple)) or not node: return
+        op = node[0]
+
+        if type(node) is list:
+            chamadas.append((linha, op, len(node) - 1, funcao))
+            for arg in node[1:]: visitar(arg, escopo, funcao, linha)
+        elif op == 'defun':
+            definidas[node[1]] = len(node[2])
+            visitar(node[3], frozenset(node[2]), node[1], linha)
+        elif op == 'let':
+            visitar(node[2], escopo, funcao, linha)
+            visitar(node[3], escopo | {node[1]}, funcao, linha)
+        elif op == 'setq':
+            if node[1] not in escopo:
+                erros.append((linha, f"setq: '{node[1]}' não é parâmetro nem variável de let"))
+            visitar(node[2], escopo, funcao, linha)
+        elif op in ('mapcar', 'reduce'):
+            for arg in node[2:]: visitar(arg, escopo, funcao, linha)
+        else:
+            args = node[1] if op in OPS_ARITMETICOS and len(node) == 2 and type(node[1]) is list else node[1:]
+            if op in OPS_ARITMETICOS and len(args) < 2:
+                erros.append((linha, f"'{op}' espera dois argumentos, recebeu {len(args)}"))
+            for arg in args: visitar(arg, escopo, funcao, linha)
+
+    for expr in ast: visitar(expr, frozenset(), None, None)
+
+    # Visão sem cópia: o custo de ligar não cresce com o número de funções da sessão
+    tabela = ChainMap(definidas, aridades)
+    sombreadas = {nome for nome in PRIMITIVAS_VETOR if nome in tabela}
+    novas = {}
+    for linha, op, n_args, funcao in chamadas:
+        if op in ARIDADE_PRIMITIVAS and op not in sombreadas:
+            minimo, maximo = ARIDADE_PRIMITIVAS[op]
+            if not minimo <= n_args <= maximo:
+                esperado = minimo if minimo == maximo else f'{minimo} a {maximo}'
+                erros.append((linha, f"'{op}' espera {esperado} argumento(s), recebeu {n_args}"))
+        elif type(op) is not str or op == 'nil':
+            erros.append((linha, f"{op!r} não é nome de função"))
+        elif op in tabela:
+            if n_args != tabela[op]:
+                erros.append((linha, f"'{op}' espera {tabela[op]} argumento(s), recebeu {n_args}"))
+        elif incremental and funcao is not None:
+            novas.setdefault(op, []).append((linha, n_args, funcao))
+        else:
+            erros.append((linha, f"função '{op}' não definida"))
+    # Sítios pendentes de uma função redefinida neste trecho já não valem: o corpo novo
+    # traz os próprios (em `novas`)
+    for nome, n_params in definidas.items():
+        for linha, n_args, chamador in pendentes.get(nome, ()):
+            if chamador in definidas: continue
+            if n_args != n_params:
+                erros.append((linha, f"'{chamador}' chama '{nome}' com {n_args} argumento(s),"
+                                     f" mas '{nome}' foi definida com {n_params}"))
+    if erros:
+        erros.sort(key=lambda e: e[0] or 0)
+        raise ErroLigacao([_onde(linha) + msg for linha, msg in erros])
+
+    for nome in definidas: pendentes.pop(nome, None)
+    for nome in list(pendentes):
+        sitios = [s for s in pendentes[nome] if s[2] not in definidas]
+        if sitios: pendentes[nome] = sitios
+        else: del pendentes[nome]
+    for nome, sitios in novas.items(): pendentes.setdefault(nome, []).extend(sitios)
+    return tabela, avisos
+
+def _descartar(comp):
+    """Valor de uma expressão no meio de um corpo não é usado: tira da pilha."""
+    comp.codigo.append('POP')
+
+def gerar_codigo(node, comp, escopo_local=None, cauda=False, topo=False):
+    # cauda=True: o valor de `node` é o retorno da função que o contém
+    # topo=True: forma de topo; print e defun não deixam valor (como no motor nativo).
+    # Em qualquer outra posição toda expressão deixa exatamente um valor (print e defun, nil)
+    # escopo_local: nome -> (instrução de leitura, slot no quadro); parâmetros
+    # ocupam os primeiros slots e as variáveis de `let` os seguintes
     if escopo_local is None: escopo_local = {}
 
     if not isinstance(node, (list, tuple)):
-        if isinstance(node, int): codigo_intermediario.append(f'PUSH {node}')
+        if isinstance(node, int): comp.codigo.append(f'PUSH {node}')
         elif isinstance(node, str):
-            if node in escopo_local: codigo_intermediario.append(f'LOAD_PARAM {escopo_local[node]}')
-            elif node == 'nil': codigo_intermediario.append('PUSH_NIL')
-            else: codigo_intermediario.append(f'PUSH_LITERAL {node}')
+            if node in escopo_local:
+                leitura, slot = escopo_local[node]
+                comp.codigo.append(f'{leitura} {slot}')
+            elif node == 'nil': comp.codigo.append('PUSH_NIL')
+            else: comp.codigo.append(f'PUSH_LITERAL {node}')
         return
 
     if not node:
-        codigo_intermediario.append('PUSH_NIL')
+        comp.codigo.append('PUSH_NIL')
         return
 
     op = node[0]
 
     if op == 'defun':
         nome, params, corpo = node[1], node[2], node[3]
-        label = f'FUNC_{nome.upper()}'
-        tabela_global_funcoes[nome] = {'label': label, 'n_params': len(params)}
-        novo_escopo = {nome: i for i, nome in enumerate(params)}
+        label = label_funcao(nome)
+        pura_local, chama = analisar_pureza(corpo)
+        comp.definir(nome, {'label': label, 'n_params': len(params),
+                            'pura_local': pura_local, 'chama': chama})
+        novo_escopo = {nome: ('LOAD_PARAM', i) for i, nome in enumerate(params)}
         
         fim_func = f'END_FUNC_{nome.upper()}'
-        codigo_intermediario.append(f'JUMP {fim_func}')
-        codigo_intermediario.append(f'{label}:')
-        gerar_codigo(corpo, novo_escopo)
-        codigo_intermediario.append('RET')
-        codigo_intermediario.append(f'{fim_func}:')
+        comp.codigo.append(f'JUMP {fim_func}')
+        comp.codigo.append(f'{label}:')
+        gerar_codigo(corpo, comp, novo_escopo, cauda=True)
+        comp.codigo.append('RET')
+        comp.codigo.append(f'{fim_func}:')
+        if not topo: comp.codigo.append('PUSH_NIL')
         
     elif op == 'if':
         cond, then_b, else_b = node[1], node[2], node[3]
-        lbl_else = f'L_ELSE_{len(codigo_intermediario)}'
-        lbl_fim = f'L_FIM_{len(codigo_intermediario)}'
+        n = next(comp.labels)
+        lbl_else, lbl_fim = f'L_ELSE_{n}', f'L_FIM_{n}'
 
-        gerar_codigo(cond, escopo_local)
-        codigo_intermediario.append(f'JUMP_FALSE {lbl_else}')
-        gerar_codigo(then_b, escopo_local)
-        codigo_intermediario.append(f'JUMP {lbl_fim}')
-        codigo_intermediario.append(f'{lbl_else}:')
-        gerar_codigo(else_b, escopo_local)
-        codigo_intermediario.append(f'{lbl_fim}:')
+        gerar_codigo(cond, comp, escopo_local)
+        comp.codigo.append(f'JUMP_FALSE {lbl_else}')
+        gerar_codigo(then_b, comp, escopo_local, cauda)
+        comp.codigo.append(f'JUMP {lbl_fim}')
+        comp.codigo.append(f'{lbl_else}:')
+        gerar_codigo(else_b, comp, escopo_local, cauda)
+        comp.codigo.append(f'{lbl_fim}:')
+
+    elif op == 'let':
+        nome, valor, corpo = node[1], node[2], node[3]
+        slot = 1 + max((s for _, s in escopo_local.values()), default=-1)
+        gerar_codigo(valor, comp, escopo_local)
+        comp.codigo.append(f'STORE_LOCAL {slot}')
+        gerar_codigo(corpo, comp, {**escopo_local, nome: ('LOAD_LOCAL', slot)}, cauda)
+
+    elif op == 'setq':
+        nome, valor = node[1], node[2]
+        if nome not in escopo_local:
+            raise ValueError(f"setq: '{nome}' não é parâmetro nem variável de let")
+        leitura, slot = escopo_local[nome]
+        gerar_codigo(valor, comp, escopo_local)
+        # O valor de (setq x v) é v; como instrução de um corpo, o otimizador tira o par LOAD/POP
+        comp.codigo.append(f'STORE_LOCAL {slot}')
+        comp.codigo.append(f'{leitura} {slot}')
+
+    elif op == 'progn':
+        for expr in node[1:-1]:
+            gerar_codigo(expr, comp, escopo_local)
+            _descartar(comp)
+        gerar_codigo(node[-1], comp, escopo_local, cauda)
+
+    elif op in ('mapcar', 'reduce'):
+        # Operando da instrução é a operação aplicada elemento a elemento (ADD, MUL, ...)
+        for arg in node[2:]: gerar_codigo(arg, comp, escopo_local)
+        comp.codigo.append(f'{mapa_op[op]} {mapa_op[node[1]]}')
+
+    elif op == 'while':
+        # Laço sem chamadas: condição no topo, salto para trás no fim do corpo; vale nil
+        cond, corpo = node[1], node[2]
+        n = next(comp.labels)
+        lbl_laco, lbl_fim = f'L_LACO_{n}', f'L_FIM_LACO_{n}'
+
+        comp.codigo.append(f'{lbl_laco}:')
+        gerar_codigo(cond, comp, escopo_local)
+        comp.codigo.append(f'JUMP_FALSE {lbl_fim}')
+        gerar_codigo(corpo, comp, escopo_local)
+        _descartar(comp)
+        comp.codigo.append(f'JUMP {lbl_laco}')
+        comp.codigo.append(f'{lbl_fim}:')
+        comp.codigo.append('PUSH_NIL')
 
     else:
         # Tratamento de argumentos
@@ -228,211 +569,2357 @@ def gerar_codigo(node, escopo_local=None):
                  lista_args = node[1:]
         else:
              lista_args = node[1:]
+        primitiva = op in mapa_op and op not in comp.sombreadas
+        # (range n) = (range 0 n)
+        if primitiva and op == 'range' and len(lista_args) == 1: lista_args = [0] + lista_args
 
         for arg in lista_args:
-            gerar_codigo(arg, escopo_local)
+            gerar_codigo(arg, comp, escopo_local)
 
-        if op in mapa_op:
-            codigo_intermediario.append(mapa_op[op])
-        elif op in tabela_global_funcoes:
-            lbl = tabela_global_funcoes[op]['label']
-            codigo_intermediario.append(f'CALL {lbl}')
+        # Chamadas em posição de cauda reutilizam o quadro atual (TAILCALL)
+        prefixo = 'TAILCALL' if cauda else 'CALL'
+        # O ligador já conferiu o nome: mesmo uma função definida mais adiante tem label conhecido
+        if primitiva:
+            comp.codigo.append(mapa_op[op])
+            if op == 'print' and not topo: comp.codigo.append('PUSH_NIL')
         else:
-             codigo_intermediario.append(f'CALL_BY_NAME {op}')
+            meta = comp.funcoes.get(op)
+            comp.codigo.append(f"{prefixo} {meta['label'] if meta else label_funcao(op)}")
+
+# --- Pureza das funções (usada pela memoização da VM) ---
+
+OPS_PUROS = set(mapa_op) - {'print'}
+# Formas especiais sem efeito fora do quadro (setq só altera variáveis locais)
+FORMAS_PURAS = {'if', 'let', 'setq', 'progn', 'while'}
+
+def analisar_pureza(corpo):
+    """Devolve (pura_local, chamadas): se o corpo só usa parâmetros, constantes,
+    `if` e OPS_PUROS, e o conjunto de funções que ele chama."""
+    chama, pendentes = set(), [corpo]
+    while pendentes:
+        node = pendentes.pop()
+        if not isinstance(node, (list, tuple)) or not node: continue
+        op = node[0]
+        if op in ('print', 'defun') or not isinstance(op, str): return False, chama
+        if isinstance(node, tuple) and op in OPS_ARITMETICOS and len(node) == 2 and isinstance(node[1], list):
+            pendentes.extend(node[1])
+            continue
+        if op not in FORMAS_PURAS and (op not in OPS_PUROS or op in PRIMITIVAS_VETOR): chama.add(op)
+        pendentes.extend(node[1:])
+    return True, chama
+
+def atualizar_pureza(tabela, nomes=None):
+    """Marca 'pura' nas funções de corpo puro que só chamam funções puras já definidas.
+
+    Com `nomes` (um conjunto fechado por chamadores, veja afetadas) só essas são
+    recalculadas: as outras não chamam nenhuma delas e mantêm a marca.
+    """
+    alvo = tabela.keys() if nomes is None else {nome for nome in nomes if nome in tabela}
+    puras = {nome for nome in alvo if tabela[nome].get('pura_local')}
+    # Builtins vetoriais são puros, a não ser que o programa tenha definido uma função com o nome
+    livres = {nome for nome in PRIMITIVAS_VETOR if nome not in tabela}
+    # Funções de fora do alvo que já estão marcadas como puras
+    fixas = {c for nome in puras for c in tabela[nome]['chama']
+             if c not in alvo and c in tabela and tabela[c].get('pura')}
+    mudou = True
+    while mudou:
+        impuras = {nome for nome in puras if not tabela[nome]['chama'] - livres <= puras | fixas}
+        puras -= impuras
+        mudou = bool(impuras)
+    for nome in alvo: tabela[nome]['pura'] = nome in puras
+
+# =============================================================
+# 3.1 OTIMIZADOR (ENTRE O GERADOR E A MÁQUINA VIRTUAL)
+# =============================================================
+
+# Nível padrão (0 = sem otimização, 1 = dobra de constantes + peephole,
+# 2 = nível 1 + superinstruções). Pode ser trocado com -O<n> na linha de comando.
+NIVEL_OTIMIZACAO = 2
+
+OPS_ARITMETICOS = {'+', '-', '*', '/', 'div', 'mod'}
+OPS_COMPARACAO = {'eq', 'neq', 'gt', 'lt', 'geq', 'leq'}
+
+def _constante_falsa(node):
+    return node == 'nil' or (isinstance(node, list) and not node)
+
+def dobrar_constantes(node):
+    """Avalia na AST aritmética/comparações com operandos inteiros e `if` com condição constante."""
+    if not isinstance(node, (list, tuple)) or not node:
+        return node
+
+    op = node[0]
+    if op == 'defun':
+        return ('defun', node[1], node[2], dobrar_constantes(node[3]))
+    if isinstance(node, list):
+        return [node[0]] + [dobrar_constantes(filho) for filho in node[1:]]
+
+    if op in OPS_ARITMETICOS and len(node) == 2 and isinstance(node[1], list):
+        args = [dobrar_constantes(a) for a in node[1]]
+        if len(args) == 2 and all(type(a) is int for a in args):
+            if op in ('/', 'div', 'mod') and args[1] == 0:
+                return (op, args)   # divisão por zero fica para a execução
+            return BINARIOS[mapa_op[op]](*args)
+        return (op, args)
+
+    filhos = [dobrar_constantes(filho) for filho in node[1:]]
+
+    if op == 'if':
+        cond, then_b, else_b = filhos
+        if type(cond) is int: return then_b if cond else else_b
+        if _constante_falsa(cond): return else_b
+    elif op in OPS_COMPARACAO and all(type(a) is int for a in filhos):
+        return 1 if BINARIOS[mapa_op[op]](*filhos) is not NIL else 'nil'
+    elif op == 'not' and (type(filhos[0]) is int or _constante_falsa(filhos[0])):
+        return 'nil' if filhos[0] and filhos[0] != 'nil' else 1
+
+    return (op, *filhos)
+
+# --- Passes sobre o código textual (lista de linhas de gerar_codigo) ---
+
+OPS_TERMINAIS = {'JUMP', 'RET', 'TAILCALL'}
+OPS_SEM_EFEITO = {'PUSH', 'PUSH_LITERAL', 'PUSH_NIL', 'LOAD_PARAM', 'LOAD_LOCAL'}
+
+def remover_saltos_para_proxima(linhas):
+    """Remove `JUMP L` quando L rotula a instrução seguinte."""
+    saida = []
+    for i, line in enumerate(linhas):
+        if line.startswith('JUMP '):
+            alvo, j = line.split()[1] + ':', i + 1
+            while j < len(linhas) and linhas[j].endswith(':') and linhas[j] != alvo: j += 1
+            if j < len(linhas) and linhas[j] == alvo: continue
+        saida.append(line)
+    return saida
+
+def remover_codigo_inalcancavel(linhas):
+    """Remove instruções entre um salto incondicional/RET e o próximo label."""
+    saida, morto = [], False
+    for line in linhas:
+        if line.endswith(':'): morto = False
+        elif morto: continue
+        elif line.split()[0] in OPS_TERMINAIS: morto = True
+        saida.append(line)
+    return saida
+
+def remover_empilha_descarta(linhas):
+    """Remove `PUSH/LOAD_* x; POP` (valor sem efeito colateral empilhado e descartado)."""
+    saida = []
+    for line in linhas:
+        if line == 'POP' and saida and saida[-1].split()[0] in OPS_SEM_EFEITO:
+            saida.pop()
+            continue
+        saida.append(line)
+    return saida
+
+# Leituras de slot do quadro (parâmetros e variáveis de let são a mesma lista)
+OPS_LEITURA = ('LOAD_PARAM', 'LOAD_LOCAL')
+
+def fundir_superinstrucoes(linhas):
+    """LOAD_* i; LOAD_* j; OP -> OP_PP i j  e  LOAD_* i; PUSH k; OP -> OP_PK i k."""
+    saida, i = [], 0
+    while i < len(linhas):
+        if i + 2 < len(linhas) and linhas[i].startswith(OPS_LEITURA) and linhas[i + 2] in OPS_FUNDIVEIS:
+            segunda = linhas[i + 1].split()
+            if segunda[0] in OPS_LEITURA + ('PUSH',):
+                sufixo = 'PK' if segunda[0] == 'PUSH' else 'PP'
+                saida.append(f'{linhas[i + 2]}_{sufixo} {linhas[i].split()[1]} {segunda[1]}')
+                i += 3
+                continue
+        saida.append(linhas[i])
+        i += 1
+    return saida
+
+# Passes registrados: (nível mínimo, função). Novos passes podem ser anexados.
+PASSES_AST = [(1, dobrar_constantes)]
+PASSES_CODIGO = [
+    (1, remover_codigo_inalcancavel),
+    (1, remover_saltos_para_proxima),
+    (1, remover_empilha_descarta),
+    (2, fundir_superinstrucoes),
+]
+
+def contar_instrucoes(linhas):
+    return sum(1 for line in linhas if not line.endswith(':'))
+
+def otimizar_codigo(linhas, nivel):
+    """Aplica os passes de código do nível até não haver mais mudanças."""
+    while True:
+        anterior = linhas
+        for nivel_passe, passe in PASSES_CODIGO:
+            if nivel >= nivel_passe: linhas = passe(linhas)
+        if linhas == anterior: return linhas
+
+def compilar(ast, comp, nivel=None, incremental=False, relatorio=False):
+    """Liga, gera e otimiza o código de `ast` em `comp`; devolve (texto, relatório de instruções).
+
+    Os passes de AST rodam antes da geração, que acontece uma vez só. A contagem de
+    instruções sem otimização ('antes') custa uma geração extra e só é feita com
+    relatorio=True e nível > 0; sem relatório, 'antes' fica None.
+    """
+    if nivel is None: nivel = NIVEL_OTIMIZACAO
+    visiveis, avisos = ligar(ast, comp.aridades, comp.pendentes, incremental)
+    for aviso in avisos: print(f"Aviso: {aviso}", file=sys.stderr)
+    # Cada compilação começa com o buffer vazio: sessões longas não acumulam texto
+    codigo = comp.codigo = []
+    comp.alteradas = set()
+    # Como as chamadas, um builtin vetorial redefinido vale no trecho inteiro, antes mesmo do defun
+    comp.sombreadas = {nome for nome in PRIMITIVAS_VETOR if nome in visiveis}
+
+    antes = None
+    if relatorio and nivel > 0:
+        # Rascunho com uma cópia das funções: a geração de referência não mexe em `comp`
+        rascunho = Compilador(dict(comp.funcoes))
+        rascunho.sombreadas = comp.sombreadas
+        for expr in ast: gerar_codigo(expr, rascunho, topo=True)
+        antes = contar_instrucoes(rascunho.codigo)
+
+    ast_otimizada = ast
+    for nivel_passe, passe in PASSES_AST:
+        if nivel >= nivel_passe: ast_otimizada = [passe(expr) for expr in ast_otimizada]
+    for expr in ast_otimizada: gerar_codigo(expr, comp, topo=True)
+    if nivel > 0: codigo[:] = otimizar_codigo(codigo, nivel)
+
+    atualizar_pureza(comp.funcoes, afetadas(comp.alteradas, comp.chamadores))
+    depois = contar_instrucoes(codigo)
+    if relatorio and antes is None: antes = depois
+    return '\n'.join(codigo), {'nivel': nivel, 'antes': antes, 'depois': depois}
 
 # =============================================================
 # 4. MÁQUINA VIRTUAL (AMBIENTE DE EXECUÇÃO)
 # =============================================================
 
+# --- Células cons (listas persistentes, caudas compartilhadas) ---
+
+class _Nil:
+    """Lista vazia / falso. Existe uma única instância: NIL."""
+    __slots__ = ()
+    def __bool__(self): return False
+    def __iter__(self): return iter(())
+    def __repr__(self): return 'nil'
+    def __reduce__(self): return 'NIL'
+
+NIL = _Nil()
+
+# --- Símbolos internados (um objeto por nome; criados ao decodificar PUSH_LITERAL) ---
+
+class Simbolo:
+    """Um objeto por nome: EQ entre símbolos é comparação de identidade."""
+    __slots__ = ('nome', '__weakref__')
+
+    def __init__(self, nome): self.nome = nome
+    def __repr__(self): return self.nome
+    # Em outro processo (lote, cache) volta a ser o símbolo daquela tabela
+    def __reduce__(self): return (simbolo, (self.nome,))
+
+# Só símbolos ainda referenciados (código carregado, valores, globais do motor nativo)
+# ficam na tabela: nomes que passaram uma vez pelo programa não a fazem crescer
+TABELA_SIMBOLOS = weakref.WeakValueDictionary()
+
+def simbolo(nome):
+    # nil é a lista vazia (NIL) também como símbolo
+    if nome == 'nil': return NIL
+    s = TABELA_SIMBOLOS.get(nome)
+    if s is None: s = TABELA_SIMBOLOS[nome] = Simbolo(sys.intern(nome))
+    return s
+
+class Cons:
+    """Par imutável (car . cdr); CONS e CDR são O(1) e compartilham a cauda."""
+    __slots__ = ('car', 'cdr')
+
+    def __init__(self, car, cdr):
+        # Um vetor na cauda vira células cons (uma vez só; o vetor guarda a conversão)
+        if type(cdr) is Vetor: cdr = cdr.como_cons()
+        object.__setattr__(self, 'car', car)
+        object.__setattr__(self, 'cdr', cdr)
+
+    def __setattr__(self, nome, valor):
+        raise AttributeError('Cons é imutável')
+
+    def __reduce__(self):
+        # Serializa a espinha de forma iterativa (listas longas não estouram a recursão)
+        itens, no = [], self
+        while type(no) is Cons:
+            itens.append(no.car)
+            no = no.cdr
+        return (_reconstruir_cons, (itens, no))
+
+    def __iter__(self):
+        no = self
+        while type(no) is Cons:
+            yield no.car
+            no = no.cdr
+
+    def __eq__(self, outro):
+        if type(outro) is Vetor: return outro == self
+        if type(outro) is not Cons: return NotImplemented
+        a, b = self, outro
+        while type(a) is Cons and type(b) is Cons:
+            if a is b: return True
+            if a.car != b.car: return False
+            a, b = a.cdr, b.cdr
+        # Só uma das caudas ainda é cons: tamanhos diferentes (sem voltar a este __eq__)
+        if type(a) is Cons or type(b) is Cons: return False
+        return a == b
+
+    def __hash__(self):
+        h = 0
+        for x in self: h = hash((h, x))
+        return h
+
+    def __repr__(self):
+        partes, no = [], self
+        while type(no) is Cons:
+            partes.append(repr(no.car))
+            no = no.cdr
+        if no is not NIL: partes.append(f'. {no!r}')
+        return '(' + ' '.join(partes) + ')'
+
+def _reconstruir_cons(itens, cauda):
+    for x in reversed(itens): cauda = Cons(x, cauda)
+    return cauda
+
+def lista_para_cons(seq):
+    """Converte uma lista Python (listas aninhadas inclusive) em células cons."""
+    resultado = NIL
+    for x in reversed(seq):
+        resultado = Cons(lista_para_cons(x) if isinstance(x, list) else x, resultado)
+    return resultado
+
+def car(valor):
+    if type(valor) is Cons: return valor.car
+    if type(valor) is Vetor: return valor.dados[0]
+    if not valor: return NIL
+    raise TypeError(f"car: {valor!r} não é uma lista")
+
+def cdr(valor):
+    if type(valor) is Cons: return valor.cdr
+    if type(valor) is Vetor: return valor.como_cons().cdr
+    if not valor: return NIL
+    raise TypeError(f"cdr: {valor!r} não é uma lista")
+
+def imprimir_valor(val):
+    print(f"=> {val}")
+    return NIL
+
+def cons_para_lista(valor):
+    """Converte listas próprias de células cons (aninhadas inclusive) em listas Python."""
+    if valor is NIL: return []
+    if type(valor) is not Cons: return valor
+    return [cons_para_lista(x) for x in valor]
+
+# Opcodes numéricos: a posição na lista é o índice na tabela de despacho
+OPCODES = [
+    'PUSH', 'PUSH_LITERAL', 'PUSH_NIL', 'LOAD_PARAM', 'LOAD_LOCAL', 'STORE_LOCAL', 'POP',
+    'ADD', 'SUB', 'MUL', 'DIV', 'MOD',
+    'EQ', 'NEQ', 'GT', 'LT', 'GEQ', 'LEQ',
+    'NOT', 'AND', 'OR',
+    'CAR', 'CDR', 'CONS',
+    'JUMP', 'JUMP_FALSE', 'CALL', 'CALL_BY_NAME', 'TAILCALL', 'TAILCALL_BY_NAME',
+    'RET', 'PRINT',
+    'RANGE', 'SUM', 'LENGTH', 'VETOR', 'MAPCAR', 'REDUCE',
+]
+
+def _div_int(a, b):
+    # Truncada em direção a zero (como int(a / b)), mas exata para inteiros grandes
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+def _div(a, b):
+    if type(a) is int and type(b) is int: return _div_int(a, b)
+    if type(a) is Vetor or type(b) is Vetor: return elemento_a_elemento(_div_int, a, b)
+    return int(a / b)
+
+def _predicado(f): return lambda a, b: 1 if f(a, b) else NIL
+
+# Semântica das operações binárias (usada pelas superinstruções e pelo otimizador)
+BINARIOS = {
+    'ADD': operator.add, 'SUB': operator.sub, 'MUL': operator.mul,
+    'DIV': _div, 'MOD': operator.mod,
+    'EQ': _predicado(operator.eq), 'NEQ': _predicado(operator.ne),
+    'GT': _predicado(operator.gt), 'LT': _predicado(operator.lt),
+    'GEQ': _predicado(operator.ge), 'LEQ': _predicado(operator.le),
+}
+
+# --- Vetores de inteiros (builtins vetoriais) ---
+
+class Vetor:
+    """Lista de inteiros guardada num array compacto ('q', 64 bits), nunca vazia.
+
+    É o que range/mapcar/vetor produzem; para o programa é uma lista como outra
+    qualquer. car lê direto do array; cdr e cons convertem para células cons uma
+    vez (a conversão fica guardada). + - * / mod com um vetor operam elemento a
+    elemento, num único passo nativo (map sobre o array).
+    """
+    __slots__ = ('dados', '_cons')
+
+    def __init__(self, dados):
+        self.dados = dados
+        self._cons = None
+
+    def como_cons(self):
+        if self._cons is None: self._cons = _reconstruir_cons(self.dados, NIL)
+        return self._cons
+
+    def __reduce__(self): return (Vetor, (self.dados,))
+    def __len__(self): return len(self.dados)
+    def __iter__(self): return iter(self.dados)
+
+    def __eq__(self, outro):
+        if type(outro) is Vetor: return self.dados == outro.dados
+        return type(outro) is Cons and self.como_cons() == outro
+
+    def __hash__(self):
+        # Igual ao de Cons: vetor e lista cons iguais caem na mesma entrada
+        h = 0
+        for x in self.dados: h = hash((h, x))
+        return h
+
+    def __repr__(self): return '(' + ' '.join(map(str, self.dados)) + ')'
+
+    def __add__(self, outro): return elemento_a_elemento(operator.add, self, outro)
+    def __radd__(self, outro): return elemento_a_elemento(operator.add, outro, self)
+    def __sub__(self, outro): return elemento_a_elemento(operator.sub, self, outro)
+    def __rsub__(self, outro): return elemento_a_elemento(operator.sub, outro, self)
+    def __mul__(self, outro): return elemento_a_elemento(operator.mul, self, outro)
+    def __rmul__(self, outro): return elemento_a_elemento(operator.mul, outro, self)
+    def __mod__(self, outro): return elemento_a_elemento(operator.mod, self, outro)
+    def __rmod__(self, outro): return elemento_a_elemento(operator.mod, outro, self)
+
+# Operações de mapcar/reduce, pelo nome da instrução binária
+FUNCOES_VETOR = {'ADD': operator.add, 'SUB': operator.sub, 'MUL': operator.mul,
+                 'DIV': _div_int, 'MOD': operator.mod}
+
+def _dados_vetor(valor):
+    """Elementos de uma lista (vetor, cons ou nil) como array; inteiros grandes demais ficam numa list."""
+    if type(valor) is Vetor: return valor.dados
+    if valor is NIL: return array.array('q')
+    if type(valor) is not Cons: raise TypeError(f"{valor!r} não é uma lista")
+    try:
+        return array.array('q', valor)
+    except OverflowError:
+        return list(valor)
+    except TypeError:
+        raise TypeError(f"{valor!r} não é uma lista de inteiros") from None
+
+def _novo_vetor(gerar):
+    """Vetor com os valores de gerar(); nil se vazio, cons se algum não cabe em 64 bits."""
+    try:
+        dados = array.array('q', gerar())
+    except OverflowError:
+        return lista_para_cons(list(gerar()))
+    return Vetor(dados) if dados else NIL
+
+def elemento_a_elemento(f, a, b):
+    """f par a par (o tamanho da lista menor manda); um inteiro vale para todos os elementos."""
+    xs = itertools.repeat(a) if type(a) is int else _dados_vetor(a)
+    ys = itertools.repeat(b) if type(b) is int else _dados_vetor(b)
+    if type(a) is int and type(b) is int: return f(a, b)
+    return _novo_vetor(lambda: map(f, xs, ys))
+
+def vetor_intervalo(inicio, fim):
+    return _novo_vetor(lambda: range(inicio, fim))
+
+def vetor_soma(valor):
+    return sum(_dados_vetor(valor))
+
+def vetor_tamanho(valor):
+    if type(valor) is Vetor: return len(valor.dados)
+    if valor is NIL: return 0
+    if type(valor) is not Cons: raise TypeError(f"length: {valor!r} não é uma lista")
+    return sum(1 for _ in valor)
+
+def para_vetor(valor):
+    """Converte uma lista de inteiros para a forma compacta (a mesma lista se não couber)."""
+    if type(valor) is Vetor or valor is NIL: return valor
+    dados = _dados_vetor(valor)
+    return Vetor(dados) if type(dados) is array.array else valor
+
+def vetor_mapcar(nome, a, b):
+    return elemento_a_elemento(FUNCOES_VETOR[nome], a, b)
+
+def vetor_reduzir(nome, valor):
+    dados = _dados_vetor(valor)
+    if nome == 'ADD': return sum(dados)
+    if nome == 'MUL': return math.prod(dados)
+    if not dados: raise ValueError(f"reduce: lista vazia (sem elemento neutro para {nome})")
+    return functools.reduce(FUNCOES_VETOR[nome], dados)
+
+# Superinstruções: OP_PP i j = LOAD_* i; LOAD_* j; OP   (LOAD_PARAM ou LOAD_LOCAL)
+#                  OP_PK i k = LOAD_* i; PUSH k; OP
+OPS_FUNDIVEIS = {'ADD', 'SUB', 'MUL', 'EQ', 'NEQ', 'GT', 'LT', 'GEQ', 'LEQ'}
+SUPERINSTRUCOES = [f'{op}_{sufixo}' for op in sorted(OPS_FUNDIVEIS) for sufixo in ('PP', 'PK')]
+OPCODES += SUPERINSTRUCOES
+
+# Especialização adaptativa (quickening): cada sítio destas instruções observa os
+# tipos dos operandos; estável em inteiros vira OP_INT, com outro tipo vira OP_GEN
+ESPECIALIZAVEIS = list(BINARIOS) + SUPERINSTRUCOES
+OPCODES += [f'{op}_INT' for op in ESPECIALIZAVEIS] + [f'{op}_GEN' for op in ESPECIALIZAVEIS]
+
+# Execuções com operandos inteiros antes de reescrever o sítio (0 desliga)
+LIMIAR_ESPECIALIZACAO = 8
+
+# Expressões das formas especializadas (a e b já conferidos como int)
+EXPR_INT = {
+    'ADD': 'a + b', 'SUB': 'a - b', 'MUL': 'a * b', 'DIV': '_div_int(a, b)', 'MOD': 'a % b',
+    'EQ': '1 if a == b else NIL', 'NEQ': '1 if a != b else NIL',
+    'GT': '1 if a > b else NIL', 'LT': '1 if a < b else NIL',
+    'GEQ': '1 if a >= b else NIL', 'LEQ': '1 if a <= b else NIL',
+}
+
+# Corpo das formas _INT por tipo de instrução; a guarda falha -> desotimiza e executa a genérica.
+# Cada modelo é compilado uma vez por processo (_fabrica_int) e instanciado por VM
+_MODELO_INT = {
+    'pilha': '''
+def fabricar(vm, desotimizar):
+    def executar(arg):
+        stack = vm.stack
+        b = stack.pop()
+        a = stack[-1]
+        if type(a) is int and type(b) is int:
+            stack[-1] = {expr}
+        else:
+            stack.append(b)
+            desotimizar(vm.ip - 1, arg)
+    return executar
+''',
+    'PP': '''
+def fabricar(vm, desotimizar):
+    def executar(arg):
+        loc = vm.local_scope
+        a, b = loc[arg[0]], loc[arg[1]]
+        if type(a) is int and type(b) is int: vm.stack.append({expr})
+        else: desotimizar(vm.ip - 1, arg)
+    return executar
+''',
+    'PK': '''
+def fabricar(vm, desotimizar):
+    def executar(arg):
+        a, b = vm.local_scope[arg[0]], arg[1]
+        if type(a) is int: vm.stack.append({expr})
+        else: desotimizar(vm.ip - 1, arg)
+    return executar
+''',
+}
+
+_FABRICAS_INT = {}
+
+def _fabrica_int(nome):
+    """Compila (uma vez) a fábrica da forma _INT de `nome` a partir de _MODELO_INT."""
+    if nome not in _FABRICAS_INT:
+        tipo = nome.rsplit('_', 1)[1] if nome in SUPERINSTRUCOES else 'pilha'
+        ns = {'NIL': NIL, '_div_int': _div_int}
+        exec(_MODELO_INT[tipo].format(expr=EXPR_INT[nome.split('_')[0]]), ns)
+        _FABRICAS_INT[nome] = ns['fabricar']
+    return _FABRICAS_INT[nome]
+
+OPCODE = {nome: i for i, nome in enumerate(OPCODES)}
+OP_INT = {OPCODE[op]: OPCODE[op + '_INT'] for op in ESPECIALIZAVEIS}
+OP_GEN = {OPCODE[op + sufixo]: OPCODE[op + '_GEN'] for op in ESPECIALIZAVEIS for sufixo in ('', '_INT')}
+
+# Instruções cujo operando é convertido para inteiro na carga
+OPS_ARG_INT = {'PUSH', 'LOAD_PARAM', 'LOAD_LOCAL', 'STORE_LOCAL'}
+# Instruções cujo operando é um label local, resolvido para índice absoluto
+OPS_ARG_LABEL = {'JUMP', 'JUMP_FALSE'}
+# Instruções cujo operando é o label de uma função, resolvido para o id dela
+OPS_ARG_FUNC = {'CALL', 'TAILCALL'}
+# Instruções com dois operandos inteiros
+OPS_ARG_PAR = set(SUPERINSTRUCOES)
+# Instruções cujo operando é o nome de um símbolo, trocado pelo símbolo internado
+OPS_ARG_SIMBOLO = {'PUSH_LITERAL'}
+IDS_ARG_FUNC = {OPCODE[op] for op in OPS_ARG_FUNC}
+IDS_ARG_LABEL = {OPCODE[op] for op in OPS_ARG_LABEL}
+
+# Instruções mortas (topo já executado, corpos redefinidos) toleradas além do
+# tamanho do código vivo antes de compactar; abaixo disso só se trunca o fim
+CODIGO_MORTO_MIN = 1024
+
+def decodificar(texto, inicio=0, labels=None):
+    """Converte o texto de gerar_codigo em (linhas, opcodes, operandos, labels novos).
+
+    `inicio` é o índice absoluto da primeira instrução; alvos de salto já saem
+    resolvidos. Operandos de CALL/TAILCALL continuam sendo labels (a VM liga).
+    """
+    linhas, labels_novos = [], {}
+
+    # 1ª passada: registra labels e separa operandos
+    for line in texto.split('\n'):
+        line = line.strip()
+        if not line: continue
+        if line.endswith(':'):
+            labels_novos[line[:-1]] = inicio + len(linhas)
+            continue
+        parts = line.split()
+        if parts[0] not in OPCODE:
+            raise ValueError(f"Instrução desconhecida '{parts[0]}'")
+        linhas.append((line, parts[0], parts[1:]))
+
+    # 2ª passada: converte operandos (labels já são todos conhecidos)
+    labels = ChainMap(labels_novos, labels or {})
+    ops, args = [], []
+    for line, op, operandos in linhas:
+        arg = operandos[0] if operandos else None
+        if op in OPS_ARG_INT: arg = int(arg)
+        elif op in OPS_ARG_PAR: arg = (int(operandos[0]), int(operandos[1]))
+        elif op in OPS_ARG_SIMBOLO: arg = simbolo(arg)
+        elif op in OPS_ARG_LABEL:
+            if arg not in labels:
+                raise ValueError(f"Label '{arg}' não definido")
+            arg = labels[arg]
+        ops.append(OPCODE[op])
+        args.append(arg)
+
+    return [line for line, _, _ in linhas], ops, args, labels_novos
+
+# --- Memoização de funções puras (marcadas pelo compilador) ---
+
+# Entradas por função no cache de resultados (0 desliga); troque com --memo=<n>
+LIMITE_MEMO = 1024
+
+# Só argumentos atômicos entram na chave (listas custariam O(n) por chamada)
+TIPOS_MEMO = {int, str, _Nil, Simbolo}
+
+_AUSENTE = object()
+
+def _chave_memo(args):
+    for a in args:
+        if type(a) not in TIPOS_MEMO: return None
+    return tuple(args)
+
+class CacheMemo:
+    """Resultados de uma função pura indexados pelos argumentos, com descarte LRU."""
+    __slots__ = ('dados', 'limite', 'acertos', 'falhas', 'descartes', 'invalidacoes')
+
+    def __init__(self, limite):
+        self.dados = OrderedDict()
+        self.limite = limite
+        self.acertos = self.falhas = self.descartes = self.invalidacoes = 0
+
+    def buscar(self, chave):
+        valor = self.dados.get(chave, _AUSENTE)
+        if valor is _AUSENTE:
+            self.falhas += 1
+        else:
+            self.acertos += 1
+            self.dados.move_to_end(chave)
+        return valor
+
+    def guardar(self, chave, valor):
+        self.dados[chave] = valor
+        if len(self.dados) > self.limite:
+            self.dados.popitem(last=False)
+            self.descartes += 1
+
+    def invalidar(self):
+        self.dados.clear()
+        self.invalidacoes += 1
+
+# --- Limites de execução (conferidos entre blocos de instruções) ---
+
+# Tamanho do bloco executado entre duas verificações de limite; pilha e chamadas
+# podem passar do limite por no máximo o que um bloco empilha
+INSTRUCOES_POR_VERIFICACAO = 1024
+
+NOMES_RECURSOS = {'instrucoes': 'instruções', 'pilha': 'profundidade da pilha',
+                  'chamadas': 'profundidade de chamadas', 'tempo_s': 'tempo (s)'}
+
+class Limites:
+    """Limites por execução; None = sem limite."""
+    def __init__(self, instrucoes=None, pilha=None, chamadas=None, tempo_s=None):
+        self.instrucoes = instrucoes
+        self.pilha = pilha
+        self.chamadas = chamadas
+        self.tempo_s = tempo_s
+
+    def para_dict(self):
+        return {recurso: getattr(self, recurso) for recurso in NOMES_RECURSOS}
+
+    def __repr__(self):
+        return ', '.join(f"{recurso}={'-' if v is None else v}" for recurso, v in self.para_dict().items())
+
+# Limites das VMs novas; troque com --limite-instrucoes=, --limite-pilha=,
+# --limite-chamadas= e --limite-tempo= (segundos) ou ':limites' no shell
+LIMITES = Limites()
+
+def formatar_consumo(consumo):
+    return (f"{consumo['instrucoes']} instruções, {consumo['tempo_s'] * 1000:.1f} ms, "
+            f"pilha máx {consumo['pilha_max']}, chamadas máx {consumo['chamadas_max']}")
+
+class LimiteExcedido(RuntimeError):
+    """Uma execução passou de um limite. A VM já foi liberada para a próxima entrada."""
+    def __init__(self, recurso, limite, consumo):
+        self.recurso, self.limite, self.consumo = recurso, limite, consumo
+        super().__init__(f"limite de {NOMES_RECURSOS[recurso]} excedido ({limite}); "
+                         f"consumo: {formatar_consumo(consumo)}")
+
+    def para_dict(self):
+        return {'recurso': self.recurso, 'limite': self.limite, 'consumo': self.consumo}
+
+# --- Perfilador (só custa algo quando ligado com MaquinaVirtual.perfilar) ---
+
+# Acima desta profundidade as pilhas colapsadas param de crescer
+PROFUNDIDADE_MAX_PILHA = 128
+
+class Perfilador:
+    """Contadores por opcode, por função, por endereço e profundidades máximas."""
+
+    def __init__(self, vm):
+        self.vm = vm
+        self.instrucoes = 0
+        self.tempo = 0.0
+        self.op_contagem = [0] * len(OPCODES)
+        self.op_tempo = [0.0] * len(OPCODES)
+        self.ip_contagem = {}   # endereço -> execuções
+        self.funcoes = {}       # id -> [chamadas, instruções, tempo próprio, tempo total]
+        self.pilhas = {}        # "topo;f;g" -> tempo (formato colapsado dos flamegraphs)
+        self.max_stack = 0
+        self.max_call_stack = 0
+        self._quadros = []      # (id, tempo no início, caminho, profundidade)
+        self._ativos = {}       # id -> ativações em andamento (recursão conta uma vez no total)
+
+    def sincronizar(self):
+        """Descarta quadros pendentes se a VM terminou (ou abortou) com a pilha de chamadas vazia."""
+        if not self.vm.call_stack:
+            self._quadros.clear()
+            self._ativos.clear()
+
+    def registrar(self, ip, op, dt, profundidade):
+        vm = self.vm
+        self.instrucoes += 1
+        self.tempo += dt
+        self.op_contagem[op] += 1
+        self.op_tempo[op] += dt
+        self.ip_contagem[ip] = self.ip_contagem.get(ip, 0) + 1
+
+        if self._quadros:
+            fid, _, caminho, _ = self._quadros[-1]
+            f = self.funcoes[fid]
+            f[1] += 1
+            f[2] += dt
+        else:
+            caminho = '<topo>'
+        self.pilhas[caminho] = self.pilhas.get(caminho, 0.0) + dt
+        if len(vm.stack) > self.max_stack: self.max_stack = len(vm.stack)
+
+        # Entradas e saídas de função (CALL_BY_NAME já foi reescrito como CALL)
+        nova = len(vm.call_stack)
+        if nova > profundidade:
+            self._entrar(vm.args[ip])
+            if nova > self.max_call_stack: self.max_call_stack = nova
+        elif nova < profundidade:
+            self._sair()
+        elif vm.ops[ip] == OPCODE['TAILCALL'] and vm.ip != ip + 1:
+            self._sair()
+            self._entrar(vm.args[ip])
+
+    def _entrar(self, fid):
+        nome = self.vm.func_nomes[fid]
+        if self._quadros:
+            _, _, caminho, prof = self._quadros[-1]
+            # Recursão direta e pilhas profundas demais reaproveitam o caminho do pai
+            if not caminho.endswith(';' + nome) and prof < PROFUNDIDADE_MAX_PILHA:
+                caminho, prof = f'{caminho};{nome}', prof + 1
+        else:
+            caminho, prof = f'<topo>;{nome}', 1
+        self.funcoes.setdefault(fid, [0, 0, 0.0, 0.0])[0] += 1
+        self._ativos[fid] = self._ativos.get(fid, 0) + 1
+        self._quadros.append((fid, self.tempo, caminho, prof))
+
+    def _sair(self):
+        if not self._quadros: return
+        fid, inicio, _, _ = self._quadros.pop()
+        self._ativos[fid] -= 1
+        if not self._ativos[fid]: self.funcoes[fid][3] += self.tempo - inicio
+
+    def _funcao_do_endereco(self, ip):
+        vm = self.vm
+        for fid, entrada in enumerate(vm.func_entrada):
+            if entrada is not None and entrada <= ip < vm.func_fim[fid]: return vm.func_nomes[fid]
+        return '<topo>'
+
+    def para_dict(self, n_enderecos=20):
+        vm = self.vm
+        quentes = sorted(self.ip_contagem.items(), key=lambda x: -x[1])[:n_enderecos]
+        return {
+            'instrucoes': self.instrucoes,
+            'tempo_s': self.tempo,
+            'max_stack': self.max_stack,
+            'max_call_stack': self.max_call_stack,
+            'opcodes': {OPCODES[op]: {'execucoes': n, 'tempo_s': self.op_tempo[op]}
+                        for op, n in enumerate(self.op_contagem) if n},
+            'funcoes': {vm.func_nomes[fid]: {'label': vm.func_labels[fid], 'chamadas': c,
+                                             'instrucoes': i, 'tempo_proprio_s': p, 'tempo_total_s': t}
+                        for fid, (c, i, p, t) in self.funcoes.items()},
+            'enderecos_quentes': [{'ip': ip, 'execucoes': n, 'instrucao': vm.codigo[ip] if ip < len(vm.codigo) else '?',
+                                   'forma': OPCODES[vm.ops[ip]] if ip < len(vm.ops) else '?',
+                                   'funcao': self._funcao_do_endereco(ip)} for ip, n in quentes],
+            'especializacao': vm.estatisticas_especializacao(),
+        }
+
+    def para_json(self):
+        return json.dumps(self.para_dict(), indent=2, ensure_ascii=False)
+
+    def pilhas_colapsadas(self):
+        """Texto `f;g;h microssegundos` por linha, lido por flamegraph.pl/speedscope."""
+        return ''.join(f'{caminho} {round(t * 1e6)}\n' for caminho, t in self.pilhas.items() if t >= 5e-7)
+
+    def relatorio(self, n=10):
+        d = self.para_dict(n)
+        linhas = [f"=== Perfil da VM: {d['instrucoes']} instruções em {d['tempo_s'] * 1000:.1f} ms"
+                  f" | pilha máx {d['max_stack']} | chamadas aninhadas máx {d['max_call_stack']} ===",
+                  f"{'opcode':<16} {'execuções':>10} {'tempo (ms)':>11} {'%':>6}"]
+        total = d['tempo_s'] or 1.0
+        for nome, o in sorted(d['opcodes'].items(), key=lambda x: -x[1]['tempo_s'])[:n]:
+            linhas.append(f"{nome:<16} {o['execucoes']:>10} {o['tempo_s'] * 1000:>11.2f} {o['tempo_s'] / total:>6.1%}")
+        linhas.append(f"{'função':<16} {'chamadas':>10} {'instruções':>11} {'própria (ms)':>13} {'total (ms)':>11}")
+        for nome, f in sorted(d['funcoes'].items(), key=lambda x: -x[1]['tempo_total_s'])[:n]:
+            linhas.append(f"{nome:<16} {f['chamadas']:>10} {f['instrucoes']:>11}"
+                          f" {f['tempo_proprio_s'] * 1000:>13.2f} {f['tempo_total_s'] * 1000:>11.2f}")
+        linhas.append(f"{'endereço':<16} {'execuções':>10}  instrução [forma atual] (função)")
+        for e in d['enderecos_quentes']:
+            linhas.append(f"{e['ip']:<16} {e['execucoes']:>10}  {e['instrucao']} [{e['forma']}] ({e['funcao']})")
+        linhas.append(formatar_especializacao(d['especializacao']))
+        return '\n'.join(linhas)
+
+def formatar_especializacao(e):
+    sitios = e['sitios']
+    return (f"Especialização: {sum(e['especializacoes'].values())} sítios especializados, "
+            f"{sum(e['desotimizacoes'].values())} desotimizados | formas atuais: {sitios['int']} _INT, "
+            f"{sitios['generico']} _GEN, {sitios['observando']} observando"
+            + ''.join(f"\n  {nome:<14} +{n} especializações, -{e['desotimizacoes'].get(nome, 0)} desotimizações"
+                      for nome, n in sorted(e['especializacoes'].items())))
+
 class MaquinaVirtual:
-    def __init__(self, tabela_funcoes):
-        self.codigo = []
+    def __init__(self, tabela_funcoes=None):
+        self.compilador = Compilador(tabela_funcoes)
+        self.codigo = []    # forma textual (para depuração e dumps)
+        self.ops = []       # opcodes inteiros, paralelo a self.codigo
+        self.args = []      # operandos já convertidos, paralelo a self.ops
         self.labels = {}
-        self.tabela_funcoes = tabela_funcoes
+        self.tabela_funcoes = self.compilador.funcoes
+        # Tabela de funções indexada pelo id (denso) de cada uma
+        self.func_ids = {}       # label -> id
+        self.func_entrada = []   # id -> ip de entrada (None se ainda não definida)
+        self.func_aridade = []   # id -> número de parâmetros
+        self.func_nomes = []     # id -> nome (mensagens de erro)
+        self.func_labels = []    # id -> label
+        self.func_memo = []      # id -> CacheMemo se a função é pura (None caso contrário)
+        self.func_fim = []       # id -> ip logo após o RET (o segmento da função é [entrada, fim))
+        # Segmentos das funções definidas, mantidos a cada defun (veja _segmentos_vivos)
+        self._brutos = []        # (entrada, fim) de cada função, ordenados
+        self._unidos = []        # [início, fim] da união dos brutos, ordenados
+        self._vivas = 0          # instruções cobertas pela união
+        self.memo_limite = LIMITE_MEMO
+        self._memo_pendentes = [] # (quadro, cache, chave) das chamadas memoizadas em curso
+        self.compactacoes = 0    # vezes que o código vivo foi copiado para o início
+        self.instrucoes_recuperadas = 0
+        self.perfilador = None   # Perfilador quando o modo de perfil está ligado
+        self.limites = LIMITES
+        self.consumo = None      # recursos gastos pela última execução (veja iniciar_execucao)
         self.ip = 0 
         self.stack = [] 
         self.call_stack = [] 
         self.local_scope = [] 
+        # Especialização: sítio -> execuções inteiras seguidas; contagens por instrução
+        self.limiar_especializacao = LIMIAR_ESPECIALIZACAO
+        self._aquecimento = {}
+        self.especializacoes = {}
+        self.desotimizacoes = {}
+        self._despacho = [self._handler(nome) for nome in OPCODES]
+
+    def _handler(self, nome):
+        if nome.endswith('_GEN'): return self._handler_generico(nome[:-4])
+        if nome.endswith('_INT'): return self._especializado(nome[:-4])
+        if nome in ESPECIALIZAVEIS and self.limiar_especializacao > 0: return self._observador(nome)
+        return self._handler_generico(nome)
+
+    def _handler_generico(self, nome):
+        return getattr(self, '_op_' + nome.lower(), None) or self._superinstrucao(nome)
+
+    def traduzir(self, ast, incremental=False):
+        """Compila `ast` para o código textual que adicionar_codigo_e_executar recebe."""
+        texto, _ = compilar(ast, self.compilador, incremental=incremental)
+        return texto
 
     def adicionar_codigo_e_executar(self, texto_novo):
-        lines = texto_novo.split('\n')
         inicio_execucao = len(self.codigo)
-        
-        for line in lines:
-            line = line.strip()
-            if not line: continue
-            if line.endswith(':'):
-                self.labels[line[:-1]] = len(self.codigo)
-            else:
-                self.codigo.append(line)
-        
+        self.carregar(texto_novo)
         self.ip = inicio_execucao
-        self.run()
+        try:
+            self.run()
+        finally:
+            self.recuperar_codigo()
+
+    def carregar(self, texto_novo):
+        """Decodifica o texto de gerar_codigo e anexa ao código."""
+        self.carregar_decodificado(*decodificar(texto_novo, len(self.codigo), self.labels))
+
+    def carregar_decodificado(self, linhas, ops, args, labels_novos):
+        """Anexa código já decodificado (do texto ou do cache), ligando as chamadas."""
+        args = [self._id_funcao(arg) if op in IDS_ARG_FUNC else arg for op, arg in zip(ops, args)]
+        # Label redefinido vai para o fim: self.labels fica em ordem crescente de posição
+        for nome in labels_novos: self.labels.pop(nome, None)
+        self.labels.update(labels_novos)
+        # Contagens de aquecimento de código truncado não passam para o que ocupa o lugar
+        aquecimento = self._aquecimento
+        if aquecimento:
+            for ip in range(len(self.ops), len(self.ops) + len(ops)): aquecimento.pop(ip, None)
+        self.codigo.extend(linhas)
+        self.ops.extend(ops)
+        self.args.extend(args)
+        self._vincular_funcoes(labels_novos)
+
+    def _id_funcao(self, label):
+        """Devolve o id denso da função de `label`, reservando um novo se preciso."""
+        fid = self.func_ids.get(label)
+        if fid is None:
+            fid = self.func_ids[label] = len(self.func_entrada)
+            self.func_entrada.append(None)
+            self.func_aridade.append(0)
+            # Ainda não definida (chamada pendente do modo incremental): o nome vem do compilador
+            self.func_nomes.append(next((n for n in self.compilador.pendentes if label_funcao(n) == label), label))
+            self.func_labels.append(label)
+            self.func_memo.append(None)
+            self.func_fim.append(None)
+        return fid
+
+    def _vincular_funcoes(self, labels_novos):
+        """Atualiza entrada e aridade das funções (re)definidas no trecho carregado."""
+        por_label = self.compilador.por_label
+        novas, redefinidas = [], []
+        for label, entrada in labels_novos.items():
+            nome = por_label.get(label)
+            if nome is None: continue   # labels de if, de fim de função etc.
+            fid = self._id_funcao(label)
+            if self.func_entrada[fid] is not None:
+                redefinidas.append(nome)
+                self._remover_segmento(self.func_entrada[fid], self.func_fim[fid])
+            novas.append(nome)
+            self.func_entrada[fid] = entrada
+            self.func_aridade[fid] = self.tabela_funcoes[nome]['n_params']
+            self.func_nomes[fid] = nome
+            # Sem o label de fim (código de fora do gerador), o segmento vai até o fim do trecho
+            self.func_fim[fid] = labels_novos.get('END_' + label, len(self.ops))
+            self._adicionar_segmento(entrada, self.func_fim[fid])
+        chamadores = self.compilador.chamadores
+        self._atualizar_memo(afetadas(novas, chamadores), afetadas(redefinidas, chamadores))
+
+    def _atualizar_memo(self, nomes, invalidar=()):
+        """Cria/remove os caches de `nomes` conforme a pureza atual e esvazia os de
+        `invalidar` (uma função redefinida e quem a chama podem mudar de resultado)."""
+        for nome in nomes:
+            meta = self.tabela_funcoes.get(nome)
+            fid = None if meta is None else self.func_ids.get(meta['label'])
+            if fid is None or self.func_entrada[fid] is None: continue
+            memo = self.func_memo[fid]
+            if meta.get('pura') and self.memo_limite > 0:
+                if memo is None: self.func_memo[fid] = CacheMemo(self.memo_limite)
+                elif nome in invalidar: memo.invalidar()
+            elif memo is not None:
+                self.func_memo[fid] = None
+
+    def configurar_memo(self, limite):
+        """Troca o limite de entradas por função (0 desliga a memoização)."""
+        self.memo_limite = limite
+        self.func_memo = [None] * len(self.func_memo)
+        self._memo_pendentes.clear()
+        self._atualizar_memo(self.tabela_funcoes)
+
+    def estatisticas_memo(self):
+        """{nome: {acertos, falhas, descartes, invalidacoes, entradas, limite}} das funções memoizadas."""
+        return {self.func_nomes[fid]: {'acertos': m.acertos, 'falhas': m.falhas, 'descartes': m.descartes,
+                                       'invalidacoes': m.invalidacoes, 'entradas': len(m.dados),
+                                       'limite': m.limite}
+                for fid, m in enumerate(self.func_memo) if m is not None}
+
+    # --- Recuperação do espaço de código (sessões longas) ---
+    def _segmentos_vivos(self):
+        """Intervalos [início, fim) dos corpos das funções definidas, ordenados e
+        unidos (uma defun aninhada fica dentro do segmento de quem a contém)."""
+        return self._unidos
+
+    def _adicionar_segmento(self, inicio, fim):
+        bisect.insort(self._brutos, (inicio, fim))
+        unidos = self._unidos
+        # Caso comum: o corpo novo está no fim do código, depois de todos os outros
+        if not unidos or inicio > unidos[-1][1]:
+            unidos.append([inicio, fim])
+            self._vivas += fim - inicio
+        elif inicio >= unidos[-1][0]:
+            novo_fim = max(unidos[-1][1], fim)
+            self._vivas += novo_fim - unidos[-1][1]
+            unidos[-1][1] = novo_fim
+        else: self._unir()
+
+    def _remover_segmento(self, inicio, fim):
+        brutos, unidos = self._brutos, self._unidos
+        i = bisect.bisect_left(brutos, (inicio, fim))
+        del brutos[i]
+        # Pedaço da união formado só por este corpo sai direto; com aninhamento, refaz
+        j = bisect.bisect_right(unidos, [inicio, fim]) - 1
+        sozinho = (j >= 0 and unidos[j] == [inicio, fim] and (i == len(brutos) or brutos[i][0] > fim)
+                   and (i == 0 or brutos[i - 1][0] < inicio))
+        if sozinho:
+            del unidos[j]
+            self._vivas -= fim - inicio
+        else: self._unir()
+
+    def _refazer_segmentos(self):
+        """Recalcula os segmentos do zero (compactação e clonagem)."""
+        self._brutos = sorted((e, f) for e, f in zip(self.func_entrada, self.func_fim) if e is not None)
+        self._unir()
+
+    def _unir(self):
+        """União dos brutos (caso raro: corpo aninhado ou fora de ordem)."""
+        unidos = []
+        for inicio, fim in self._brutos:
+            if unidos and inicio <= unidos[-1][1]: unidos[-1][1] = max(unidos[-1][1], fim)
+            else: unidos.append([inicio, fim])
+        self._unidos = unidos
+        self._vivas = sum(fim - inicio for inicio, fim in unidos)
+
+    def recuperar_codigo(self):
+        """Com a VM parada, libera o código de topo já executado e os corpos de funções
+        redefinidas; devolve quantas instruções saíram.
+
+        O fim do código é só truncado; buracos no meio esperam até o código morto
+        passar do vivo (e de CODIGO_MORTO_MIN), e aí o vivo é compactado no início.
+        Cada instrução é copiada O(1) vezes amortizado. Com o perfil ligado nada sai
+        (os contadores do perfilador são por endereço).
+        """
+        if self.call_stack or self.ip < len(self.ops) or self.perfilador is not None: return 0
+        segmentos, vivas = self._segmentos_vivos(), self._vivas
+        fim = segmentos[-1][1] if segmentos else 0
+        antes = len(self.ops)
+        if fim - vivas > max(vivas, CODIGO_MORTO_MIN): self._compactar(segmentos)
+        elif fim < antes: self._truncar(fim)
+        self.ip = len(self.ops)
+        self.instrucoes_recuperadas += antes - len(self.ops)
+        return antes - len(self.ops)
+
+    def _truncar(self, fim):
+        del self.codigo[fim:], self.ops[fim:], self.args[fim:]
+        while self.labels and next(reversed(self.labels.values())) >= fim:
+            self.labels.popitem()
+
+    def _compactar(self, segmentos):
+        """Copia os segmentos vivos para o início, corrigindo saltos, entradas e labels."""
+        inicios, deslocamentos, pos = [], [], 0
+        for inicio, fim in segmentos:
+            inicios.append(inicio)
+            deslocamentos.append(inicio - pos)
+            pos += fim - inicio
+
+        def realocar(ip):
+            # None para endereços fora dos segmentos (o fim de um segmento ainda conta)
+            i = bisect.bisect_right(inicios, ip) - 1
+            return ip - deslocamentos[i] if i >= 0 and ip <= segmentos[i][1] else None
+
+        codigo, ops, args = [], [], []
+        for inicio, fim in segmentos:
+            codigo += self.codigo[inicio:fim]
+            ops += self.ops[inicio:fim]
+            args += self.args[inicio:fim]
+        for ip, op in enumerate(ops):
+            if op in IDS_ARG_LABEL: args[ip] = realocar(args[ip])
+        self.codigo, self.ops, self.args = codigo, ops, args
+
+        self.func_entrada = [None if e is None else realocar(e) for e in self.func_entrada]
+        self.func_fim = [None if f is None else realocar(f) for f in self.func_fim]
+        # A realocação preserva a ordem: labels continuam em ordem crescente de posição
+        labels, aquecimento = {}, {}
+        for nome, p in self.labels.items():
+            if realocar(p) is not None: labels[nome] = realocar(p)
+        for ip, n in self._aquecimento.items():
+            if realocar(ip) is not None: aquecimento[realocar(ip)] = n
+        self.labels, self._aquecimento = labels, aquecimento
+        self._refazer_segmentos()
+        self.compactacoes += 1
+
+    def estatisticas_codigo(self):
+        """Tamanho do código carregado, parte viva (corpos de funções) e recuperações."""
+        return {'instrucoes': len(self.ops), 'vivas': self._vivas,
+                'labels': len(self.labels), 'compactacoes': self.compactacoes,
+                'recuperadas': self.instrucoes_recuperadas}
+
+    def clonar(self):
+        """VM nova com o código e as funções desta, sem recompilar nada.
+
+        Instruções e operandos são copiados (a VM reescreve self.ops no lugar);
+        pilhas, escopos, caches de memoização e contadores começam vazios.
+        """
+        vm = MaquinaVirtual({nome: dict(meta) for nome, meta in self.tabela_funcoes.items()})
+        # Labels de `if` novos continuam a numeração (não colidem com os copiados)
+        vm.compilador.labels = itertools.count(next(self.compilador.labels))
+        vm.compilador.pendentes = {nome: list(c) for nome, c in self.compilador.pendentes.items()}
+        vm.codigo, vm.ops, vm.args = list(self.codigo), list(self.ops), list(self.args)
+        vm.labels = dict(self.labels)
+        vm.func_ids = dict(self.func_ids)
+        vm.func_entrada, vm.func_aridade = list(self.func_entrada), list(self.func_aridade)
+        vm.func_nomes, vm.func_labels = list(self.func_nomes), list(self.func_labels)
+        vm.func_memo = [None] * len(self.func_memo)
+        vm.func_fim = list(self.func_fim)
+        vm._refazer_segmentos()
+        vm._atualizar_memo(vm.tabela_funcoes)
+        return vm
+
+    def interromper(self, altura=0):
+        """Abandona a execução em curso (após um erro) e deixa a VM pronta para o próximo trecho."""
+        del self.stack[altura:]
+        self.call_stack.clear()
+        self._memo_pendentes.clear()
+        self.local_scope = []
+        self.ip = len(self.ops)
+
+    def perfilar(self, ligar=True):
+        """Liga (com contadores zerados) ou desliga o modo de perfil."""
+        self.perfilador = Perfilador(self) if ligar else None
+        return self.perfilador
 
     def run(self):
-        
-        while self.ip < len(self.codigo):
-            line = self.codigo[self.ip]
-            parts = line.split()
-            op = parts[0]
-            arg = parts[1] if len(parts) > 1 else None
-            
-            if op == 'PUSH': self.stack.append(int(arg))
-            elif op == 'PUSH_LITERAL': self.stack.append(arg)
-            elif op == 'PUSH_NIL': self.stack.append([])
-            elif op == 'LOAD_PARAM': self.stack.append(self.local_scope[int(arg)])
-            
-            elif op == 'ADD': b, a = self.stack.pop(), self.stack.pop(); self.stack.append(a + b)
-            elif op == 'SUB': b, a = self.stack.pop(), self.stack.pop(); self.stack.append(a - b)
-            elif op == 'MUL': b, a = self.stack.pop(), self.stack.pop(); self.stack.append(a * b)
-            elif op == 'DIV': b, a = self.stack.pop(), self.stack.pop(); self.stack.append(int(a / b))
-            
-            elif op == 'EQ':
-                b, a = self.stack.pop(), self.stack.pop()
-                self.stack.append(1 if a == b else [])
-            
-            elif op == 'CAR':
-                lst = self.stack.pop()
-                self.stack.append(lst[0] if lst else [])
-            elif op == 'CDR':
-                lst = self.stack.pop()
-                self.stack.append(lst[1:] if lst else [])
-            elif op == 'CONS':
-                b, a = self.stack.pop(), self.stack.pop()
-                if isinstance(b, list): self.stack.append([a] + b)
-                else: self.stack.append([a, b])
-
-            elif op == 'JUMP':
-                self.ip = self.labels[arg]
-                continue
-            elif op == 'JUMP_FALSE':
-                val = self.stack.pop()
-                if not val or val == []:
-                    self.ip = self.labels[arg]
-                    continue
-            
-            elif op == 'CALL' or op == 'CALL_BY_NAME':
-                func_name = arg
-                if op == 'CALL_BY_NAME':
-                    for nome, dados in self.tabela_funcoes.items():
-                        if nome == arg:
-                             func_name = dados['label']
-                             break
-                        if dados['label'] == arg:
-                             func_name = arg
-                             break
-                
-                nome_real = None
-                for n, d in self.tabela_funcoes.items():
-                    if d['label'] == func_name:
-                        nome_real = n
-                        break
-                
-                if nome_real and nome_real in self.tabela_funcoes:
-                    meta = self.tabela_funcoes[nome_real]
-                    n_params = meta['n_params']
-                    novos_args = []
-                    for _ in range(n_params):
-                        if self.stack: novos_args.insert(0, self.stack.pop())
-                        else: novos_args.insert(0, [])
-                    
-                    self.call_stack.append((self.ip + 1, self.local_scope))
-                    self.local_scope = novos_args
-                    self.ip = self.labels[meta['label']]
-                    continue
-                else:
-                    print(f"Erro Runtime: Função '{arg}' não encontrada.")
-                    self.ip += 1
-                    continue
-
-            elif op == 'RET':
-                ret_ip, old_scope = self.call_stack.pop()
-                self.local_scope = old_scope
-                self.ip = ret_ip
-                continue
-            
-            elif op == 'PRINT':
-                if self.stack:
-                    val = self.stack.pop()
-                    print(f"=> {val}")
-                else:
-                    print("=> (Vazio)")
+        self.iniciar_execucao()
+        self.continuar_execucao()
+
+    def iniciar_execucao(self):
+        """Zera o consumo; limites de tempo e instruções contam a partir daqui."""
+        agora = time.perf_counter()
+        self._altura_inicial = len(self.stack)
+        self._inicio = agora
+        self._prazo = None if self.limites.tempo_s is None else agora + self.limites.tempo_s
+        self.consumo = {'instrucoes': 0, 'tempo_s': 0.0,
+                        'pilha_max': len(self.stack), 'chamadas_max': len(self.call_stack)}
+
+    def continuar_execucao(self, n=None):
+        """Executa até o fim (ou mais `n` instruções) em blocos, conferindo os limites
+        entre um bloco e outro; devolve True se o programa terminou."""
+        lim, consumo = self.limites, self.consumo
+        # Com o perfil ligado, mesmos blocos e limites; só a fatia é a instrumentada
+        executar_fatia = self.executar_fatia if self.perfilador is None else self._executar_fatia_perfilada
+        alvo = None if n is None else consumo['instrucoes'] + n
+        try:
+            while self.ip < len(self.ops):
+                bloco = INSTRUCOES_POR_VERIFICACAO
+                if alvo is not None:
+                    bloco = min(bloco, alvo - consumo['instrucoes'])
+                    if bloco <= 0: return False
+                if lim.instrucoes is not None:
+                    resto = lim.instrucoes - consumo['instrucoes']
+                    if resto <= 0: self._exceder('instrucoes', lim.instrucoes)
+                    bloco = min(bloco, resto)
+                # Em duas linhas: builtins vetoriais somam ao consumo durante a fatia (veja _cobrar)
+                executadas = executar_fatia(bloco)
+                consumo['instrucoes'] += executadas
+
+                pilha, chamadas = len(self.stack), len(self.call_stack)
+                if pilha > consumo['pilha_max']: consumo['pilha_max'] = pilha
+                if chamadas > consumo['chamadas_max']: consumo['chamadas_max'] = chamadas
+                # Programa terminou nesta fatia: o resultado vale, sem conferir limites depois do fim
+                if self.ip >= len(self.ops): break
+                if lim.pilha is not None and pilha > lim.pilha: self._exceder('pilha', lim.pilha)
+                if lim.chamadas is not None and chamadas > lim.chamadas: self._exceder('chamadas', lim.chamadas)
+                if self._prazo is not None and time.perf_counter() > self._prazo:
+                    self._exceder('tempo_s', lim.tempo_s)
+            return True
+        except BaseException:
+            # Erro de execução, limite ou Ctrl-C: a VM continua utilizável
+            self.interromper(self._altura_inicial)
+            raise
+        finally:
+            consumo['tempo_s'] = time.perf_counter() - self._inicio
+
+    def _exceder(self, recurso, limite):
+        self.consumo['tempo_s'] = time.perf_counter() - self._inicio
+        raise LimiteExcedido(recurso, limite, dict(self.consumo))
+
+    def executar_fatia(self, n):
+        """Executa no máximo `n` instruções; devolve quantas executou (acabou se ip chegou ao fim)."""
+        ops, args, despacho = self.ops, self.args, self._despacho
+        fim = len(ops)
+        for i in range(n):
+            ip = self.ip
+            if ip >= fim: return i
+            self.ip = ip + 1
+            despacho[ops[ip]](args[ip])
+        return n
+
+    def _executar_fatia_perfilada(self, n):
+        """Como executar_fatia, registrando tempo e contagens de cada instrução."""
+        perfilador, relogio = self.perfilador, time.perf_counter
+        ops, args, despacho = self.ops, self.args, self._despacho
+        perfilador.sincronizar()
+        fim = len(ops)
+        for i in range(n):
+            ip = self.ip
+            if ip >= fim: return i
+            op = ops[ip]
+            profundidade = len(self.call_stack)
+            self.ip = ip + 1
+            t0 = relogio()
+            despacho[op](args[ip])
+            perfilador.registrar(ip, op, relogio() - t0, profundidade)
+        return n
+
+    # --- Pilha e variáveis ---
+    def _op_push(self, arg): self.stack.append(arg)
+    def _op_push_literal(self, arg): self.stack.append(arg)
+    def _op_push_nil(self, arg): self.stack.append(NIL)
+    def _op_load_param(self, arg): self.stack.append(self.local_scope[arg])
+    def _op_load_local(self, arg): self.stack.append(self.local_scope[arg])
+    def _op_pop(self, arg): self.stack.pop()
+
+    def _op_store_local(self, arg):
+        # Slots de let ficam depois dos parâmetros; o quadro cresce na primeira escrita
+        loc = self.local_scope
+        if arg < len(loc): loc[arg] = self.stack.pop()
+        else:
+            loc.extend([NIL] * (arg - len(loc)))
+            loc.append(self.stack.pop())
+
+    # --- Aritmética (com um vetor é elemento a elemento: cobrada como os builtins vetoriais) ---
+    def _operandos(self):
+        b, a = self.stack.pop(), self.stack.pop()
+        if type(a) is Vetor or type(b) is Vetor: self._cobrar_vetores(a, b)
+        return b, a
+
+    def _op_add(self, arg): b, a = self._operandos(); self.stack.append(a + b)
+    def _op_sub(self, arg): b, a = self._operandos(); self.stack.append(a - b)
+    def _op_mul(self, arg): b, a = self._operandos(); self.stack.append(a * b)
+    def _op_div(self, arg): b, a = self._operandos(); self.stack.append(_div(a, b))
+    def _op_mod(self, arg): b, a = self._operandos(); self.stack.append(a % b)
+
+    # --- Comparação e lógica (verdadeiro = 1, falso = NIL) ---
+    def _op_eq(self, arg): b, a = self.stack.pop(), self.stack.pop(); self.stack.append(1 if a == b else NIL)
+    def _op_neq(self, arg): b, a = self.stack.pop(), self.stack.pop(); self.stack.append(1 if a != b else NIL)
+    def _op_gt(self, arg): b, a = self.stack.pop(), self.stack.pop(); self.stack.append(1 if a > b else NIL)
+    def _op_lt(self, arg): b, a = self.stack.pop(), self.stack.pop(); self.stack.append(1 if a < b else NIL)
+    def _op_geq(self, arg): b, a = self.stack.pop(), self.stack.pop(); self.stack.append(1 if a >= b else NIL)
+    def _op_leq(self, arg): b, a = self.stack.pop(), self.stack.pop(); self.stack.append(1 if a <= b else NIL)
+    def _op_not(self, arg): self.stack.append(NIL if self.stack.pop() else 1)
+    def _op_and(self, arg): b, a = self.stack.pop(), self.stack.pop(); self.stack.append(1 if a and b else NIL)
+    def _op_or(self, arg): b, a = self.stack.pop(), self.stack.pop(); self.stack.append(1 if a or b else NIL)
+
+    # --- Superinstruções (operandos lidos direto dos parâmetros) ---
+    def _superinstrucao(self, nome):
+        op, sufixo = nome.rsplit('_', 1)
+        f = BINARIOS[op]
+        if op in FUNCOES_VETOR:
+            aritmetica = f
+            def f(a, b):
+                if type(a) is Vetor or type(b) is Vetor: self._cobrar_vetores(a, b)
+                return aritmetica(a, b)
+        if sufixo == 'PP':
+            def executar(arg):
+                loc = self.local_scope
+                self.stack.append(f(loc[arg[0]], loc[arg[1]]))
+        else:
+            def executar(arg):
+                self.stack.append(f(self.local_scope[arg[0]], arg[1]))
+        return executar
+
+    # --- Especialização adaptativa (reescreve self.ops no próprio sítio) ---
+    def _observador(self, nome):
+        generico = self._handler_generico(nome)
+        tipo = nome.rsplit('_', 1)[1] if nome in OPS_ARG_PAR else 'pilha'
+        def executar(arg):
+            ip = self.ip - 1
+            if tipo == 'pilha':
+                stack = self.stack
+                inteiros = len(stack) >= 2 and type(stack[-1]) is int and type(stack[-2]) is int
+            elif tipo == 'PP':
+                loc = self.local_scope
+                inteiros = type(loc[arg[0]]) is int and type(loc[arg[1]]) is int
+            else:
+                inteiros = type(self.local_scope[arg[0]]) is int
+            generico(arg)
+            self._observar(ip, inteiros)
+        return executar
+
+    def _observar(self, ip, inteiros):
+        if inteiros:
+            n = self._aquecimento.get(ip, 0) + 1
+            if n < self.limiar_especializacao:
+                self._aquecimento[ip] = n
+                return
+            nome = OPCODES[self.ops[ip]]
+            self.especializacoes[nome] = self.especializacoes.get(nome, 0) + 1
+            self.ops[ip] = OP_INT[self.ops[ip]]
+        else:
+            # Sítio polimórfico: fica na forma genérica, sem observar mais
+            self.ops[ip] = OP_GEN[self.ops[ip]]
+        self._aquecimento.pop(ip, None)
+
+    def _especializado(self, nome):
+        return _fabrica_int(nome)(self, self._desotimizar)
+
+    def _desotimizar(self, ip, arg):
+        """A guarda de tipo falhou: volta o sítio para a forma genérica e executa por ela."""
+        nome = OPCODES[self.ops[ip]][:-4]
+        self.desotimizacoes[nome] = self.desotimizacoes.get(nome, 0) + 1
+        self.ops[ip] = OP_GEN[self.ops[ip]]
+        self._despacho[self.ops[ip]](arg)
+
+    def estatisticas_especializacao(self):
+        """Contagens de especializações/desotimizações e sítios em cada forma."""
+        formas = {'int': 0, 'generico': 0, 'observando': 0}
+        for op in self.ops:
+            nome = OPCODES[op]
+            if nome.endswith('_INT'): formas['int'] += 1
+            elif nome.endswith('_GEN'): formas['generico'] += 1
+            elif nome in ESPECIALIZAVEIS: formas['observando'] += 1
+        return {'especializacoes': dict(self.especializacoes), 'desotimizacoes': dict(self.desotimizacoes),
+                'sitios': formas}
+
+    # --- Listas ---
+    def _op_car(self, arg): self.stack.append(car(self.stack.pop()))
+    def _op_cdr(self, arg): self.stack.append(cdr(self.stack.pop()))
+
+    def _op_cons(self, arg):
+        b, a = self.stack.pop(), self.stack.pop()
+        self.stack.append(Cons(a, b))
+
+    # --- Builtins vetoriais (a operação inteira num passo) ---
+    def _cobrar(self, n):
+        """Um passo nativo sobre n elementos conta como n instruções, conferidas antes
+        de alocar: (range 300000000) para no limite em vez de montar gigabytes."""
+        consumo, lim = self.consumo, self.limites
+        if n <= 0 or consumo is None: return
+        consumo['instrucoes'] += n
+        if lim.instrucoes is not None and consumo['instrucoes'] > lim.instrucoes:
+            self._exceder('instrucoes', lim.instrucoes)
+        if self._prazo is not None and time.perf_counter() > self._prazo:
+            self._exceder('tempo_s', lim.tempo_s)
+
+    def _cobrar_vetores(self, *valores):
+        # Listas cons já custaram uma instrução por célula ao serem montadas
+        self._cobrar(max((len(v.dados) for v in valores if type(v) is Vetor), default=0))
 
-            self.ip += 1
+    def _op_range(self, arg):
+        b, a = self.stack.pop(), self.stack.pop()
+        if type(a) is int and type(b) is int: self._cobrar(b - a)
+        self.stack.append(vetor_intervalo(a, b))
+
+    def _op_sum(self, arg):
+        valor = self.stack.pop(); self._cobrar_vetores(valor); self.stack.append(vetor_soma(valor))
+
+    def _op_length(self, arg): self.stack.append(vetor_tamanho(self.stack.pop()))
+
+    def _op_vetor(self, arg): self.stack.append(para_vetor(self.stack.pop()))
+
+    def _op_mapcar(self, arg):
+        b, a = self.stack.pop(), self.stack.pop(); self._cobrar_vetores(a, b); self.stack.append(vetor_mapcar(arg, a, b))
+
+    def _op_reduce(self, arg):
+        valor = self.stack.pop(); self._cobrar_vetores(valor); self.stack.append(vetor_reduzir(arg, valor))
+
+    # --- Controle de fluxo (operandos de salto já são índices absolutos) ---
+    def _op_jump(self, arg):
+        self.ip = arg
+
+    def _op_jump_false(self, arg):
+        # nil por identidade: não passa pelo __bool__ (em Python) de _Nil
+        valor = self.stack.pop()
+        if valor is NIL or not valor:
+            self.ip = arg
+
+    def _quadro_args(self, n_params):
+        """Retira os argumentos do topo da pilha como uma única fatia."""
+        stack = self.stack
+        if n_params == 0: return []
+        if len(stack) >= n_params:
+            novos_args = stack[-n_params:]
+            del stack[-n_params:]
+            return novos_args
+        novos_args = [NIL] * (n_params - len(stack)) + stack[:]
+        stack.clear()
+        return novos_args
+
+    def _op_call(self, arg):
+        entrada = self.func_entrada[arg]
+        if entrada is None:
+            print(f"Erro Runtime: Função '{self.func_nomes[arg]}' não encontrada.")
+            return
+        novos_args = self._quadro_args(self.func_aridade[arg])
+        quadro = (self.ip, self.local_scope)
+        memo = self.func_memo[arg]
+        if memo is not None:
+            chave = _chave_memo(novos_args)
+            if chave is not None:
+                valor = memo.buscar(chave)
+                if valor is not _AUSENTE:
+                    self.stack.append(valor)
+                    return
+                # O RET que desempilhar este quadro guarda o resultado
+                self._memo_pendentes.append((quadro, memo, chave))
+        self.call_stack.append(quadro)
+        self.local_scope = novos_args
+        self.ip = entrada
+
+    def _op_tailcall(self, arg):
+        # Não empilha retorno: o RET da função chamada volta direto ao chamador atual.
+        # Não consulta o cache: laços de cauda gastariam uma entrada por iteração
+        entrada = self.func_entrada[arg]
+        if entrada is None:
+            print(f"Erro Runtime: Função '{self.func_nomes[arg]}' não encontrada.")
+            # O otimizador tira o RET depois de um TAILCALL: volta daqui mesmo
+            self._op_ret(None)
+            return
+        self.local_scope = self._quadro_args(self.func_aridade[arg])
+        self.ip = entrada
+
+    def _op_call_by_name(self, arg):
+        self._chamar_por_nome(arg, 'CALL')
+
+    def _op_tailcall_by_name(self, arg):
+        self._chamar_por_nome(arg, 'TAILCALL')
+
+    def _chamar_por_nome(self, arg, op_direto):
+        # Aceita tanto o nome quanto o label da função
+        meta = self.tabela_funcoes.get(arg)
+        label = meta['label'] if meta else arg
+        fid = self.func_ids.get(label)
+        if fid is None or self.func_entrada[fid] is None:
+            print(f"Erro Runtime: Função '{arg}' não encontrada.")
+            return
+
+        # Resolvido uma vez: reescreve o sítio de chamada como chamada direta
+        ip = self.ip - 1
+        self.ops[ip], self.args[ip] = OPCODE[op_direto], fid
+        self._despacho[self.ops[ip]](fid)
+
+    def _op_ret(self, arg):
+        quadro = self.call_stack.pop()
+        pendentes = self._memo_pendentes
+        # Comparação por identidade: quadros abandonados por um erro nunca casam
+        if pendentes and pendentes[-1][0] is quadro:
+            _, memo, chave = pendentes.pop()
+            if self.stack: memo.guardar(chave, self.stack[-1])
+        self.ip, self.local_scope = quadro
+
+    def _op_print(self, arg):
+        if self.stack:
+            imprimir_valor(self.stack.pop())
+        else:
+            print("=> (Vazio)")
+
+# =============================================================
+# 4.1 MOTOR NATIVO (AST -> FUNÇÕES PYTHON, SEM A VM DE PILHA)
+# =============================================================
+
+# Motor usado por padrão nas sessões ('vm' ou 'nativo'); troque com --motor=<nome>
+MOTOR = 'vm'
+
+# Liga o perfil da VM desde o início da sessão (--perfil); veja ':profile' no shell
+PERFIL = False
+
+# Recursão não-de-cauda usa a pilha do Python neste motor
+LIMITE_RECURSAO_NATIVO = 200_000
+
+OPS_PYTHON = {'+': '+', '-': '-', '*': '*', 'mod': '%'}
+CMP_PYTHON = {'eq': '==', 'neq': '!=', 'gt': '>', 'lt': '<', 'geq': '>=', 'leq': '<='}
+
+def _funcao_nao_encontrada(nome):
+    def chamar(*args):
+        print(f"Erro Runtime: Função '{nome}' não encontrada.")
+        # Na VM os argumentos ficam na pilha; o último faz as vezes do resultado
+        return args[-1] if args else NIL
+    return chamar
+
+def _erro_aridade(op):
+    raise TypeError(f"'{op}' espera dois argumentos")
+
+class MotorNativo:
+    """Traduz a AST para código Python: cada defun vira uma função Python de verdade.
+
+    Mesma semântica da MaquinaVirtual (nil/0 como falso, PRINT, DIV inteira),
+    mesma interface (traduzir + adicionar_codigo_e_executar). Auto-chamadas em
+    posição de cauda viram laços; as demais chamadas usam a pilha do Python.
+    """
+
+    def __init__(self):
+        self.stack = []       # valores das expressões de topo, como na VM
+        self.aridades = {}    # nome -> número de parâmetros
+        self.pendentes = {}   # chamadas a funções ainda não definidas (veja ligar)
+        self._variaveis = itertools.count()   # nomes Python das variáveis de let (v0, v1, ...)
+        self.ns = {
+            'NIL': NIL, 'Cons': Cons, 'car': car, 'cdr': cdr, '_div': _div,
+            '_imprimir': imprimir_valor, '_nao_encontrada': _funcao_nao_encontrada,
+            '_erro_aridade': _erro_aridade, '_stack': self.stack, '_sempre': itertools.repeat(None),
+            'vetor_intervalo': vetor_intervalo, 'vetor_soma': vetor_soma, 'vetor_tamanho': vetor_tamanho,
+            'para_vetor': para_vetor, 'vetor_mapcar': vetor_mapcar, 'vetor_reduzir': vetor_reduzir,
+        }
+
+    def traduzir(self, ast, incremental=False):
+        """Gera o código-fonte Python de um trecho do programa."""
+        _, avisos = ligar(ast, self.aridades, self.pendentes, incremental)
+        for aviso in avisos: print(f"Aviso: {aviso}", file=sys.stderr)
+        # Como na VM, todas as defuns do trecho existem antes de qualquer expressão rodar
+        defuns = []
+        for expr in ast: self._coletar_defuns(expr, defuns)
+        for d in defuns: self.aridades[d[1]] = len(d[2])
+
+        self._chamadas = set()
+        linhas = []
+        for d in defuns: linhas += self._funcao(d)
+        for expr in ast:
+            if isinstance(expr, tuple) and expr and expr[0] == 'defun': continue
+            if isinstance(expr, tuple) and expr and expr[0] == 'print':
+                linhas.append(self._expr(expr, {}))
+            else:
+                linhas.append(f'_stack.append({self._expr(expr, {})})')
+
+        # Funções ainda não definidas resolvem para um stub até serem definidas
+        stubs = [f"f_{n} = globals().get('f_{n}') or _nao_encontrada({n!r})"
+                 for n in sorted(self._chamadas) if n not in self.aridades]
+        return '\n'.join(stubs + linhas)
+
+    def adicionar_codigo_e_executar(self, fonte):
+        # Limite de recursão elevado só enquanto o código nativo roda; o resto do processo mantém o seu
+        anterior = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(anterior, LIMITE_RECURSAO_NATIVO))
+        try: exec(compile(fonte, '<lisp>', 'exec'), self.ns)
+        finally: sys.setrecursionlimit(anterior)
+
+    def _coletar_defuns(self, node, defuns):
+        if not isinstance(node, (list, tuple)) or not node: return
+        if isinstance(node, tuple) and node[0] == 'defun':
+            defuns.append(node)
+            self._coletar_defuns(node[3], defuns)
+            return
+        for filho in node[1:]: self._coletar_defuns(filho, defuns)
+
+    def _funcao(self, node):
+        _, nome, params, corpo = node
+        params_py = [f'p{i}' for i in range(len(params))]
+        escopo = {p: f'p{i}' for i, p in enumerate(params)}
+        self._laco = False
+        corpo_py = self._cauda(corpo, escopo, (nome, params_py), 2)
+        # Corpo gerado com indentação 2 para caber no while; sem laço, volta um nível
+        if self._laco: corpo_py = ['    while True:'] + corpo_py
+        else: corpo_py = [l[4:] for l in corpo_py]
+        return [f"def f_{nome}({', '.join(params_py)}):"] + corpo_py
+
+    def _cauda(self, node, escopo, funcao, nivel):
+        pad = '    ' * nivel
+        if isinstance(node, tuple) and node and node[0] == 'if':
+            return ([f'{pad}if {self._cond(node[1], escopo)}:']
+                    + self._cauda(node[2], escopo, funcao, nivel + 1)
+                    + [f'{pad}else:']
+                    + self._cauda(node[3], escopo, funcao, nivel + 1))
+        # let e progn em posição de cauda viram comandos: a auto-chamada no fim continua um laço
+        if isinstance(node, tuple) and node and node[0] == 'let':
+            var = f'v{next(self._variaveis)}'
+            return ([f'{pad}{var} = {self._expr(node[2], escopo)}']
+                    + self._cauda(node[3], {**escopo, node[1]: var}, funcao, nivel))
+        if isinstance(node, tuple) and node and node[0] == 'progn':
+            return [f'{pad}{self._expr(e, escopo)}' for e in node[1:-1]] + self._cauda(node[-1], escopo, funcao, nivel)
+        nome, params_py = funcao
+        if isinstance(node, list) and node and node[0] == nome and len(node) - 1 == len(params_py):
+            # Auto-chamada de cauda: reatribui os parâmetros e volta ao início
+            self._laco = True
+            if not params_py: return [f'{pad}continue']
+            args = ', '.join(self._expr(a, escopo) for a in node[1:])
+            return [f"{pad}{', '.join(params_py)} = {args}", f'{pad}continue']
+        return [f'{pad}return {self._expr(node, escopo)}']
+
+    def _cond(self, node, escopo):
+        """Expressão cuja veracidade em Python é a mesma do valor Lisp."""
+        if isinstance(node, tuple) and len(node) == 3 and node[0] in CMP_PYTHON:
+            return f'({self._expr(node[1], escopo)} {CMP_PYTHON[node[0]]} {self._expr(node[2], escopo)})'
+        if isinstance(node, tuple) and len(node) == 2 and node[0] == 'not':
+            return f'(not {self._cond(node[1], escopo)})'
+        return self._expr(node, escopo)
+
+    def _expr(self, node, escopo):
+        if not isinstance(node, (list, tuple)):
+            if isinstance(node, str):
+                if node in escopo: return escopo[node]
+                if node == 'nil': return 'NIL'
+                # Símbolo: global s_<nome> com o objeto da tabela de símbolos
+                self.ns.setdefault(f's_{node}', simbolo(node))
+                return f's_{node}'
+            return repr(node)
+        if not node: return 'NIL'
+
+        op = node[0]
+        if isinstance(node, list): return self._chamada(op, node[1:], escopo)
+        if op == 'defun': return 'NIL'
+        if op == 'if':
+            c, t, e = (self._cond(node[1], escopo), self._expr(node[2], escopo), self._expr(node[3], escopo))
+            return f'({t} if {c} else {e})'
+        # Variáveis locais com :=; o while é um gerador consumido por next(): condição e
+        # corpo ficam no filtro (o := ali atribui no escopo da função, e no iterável
+        # seria SyntaxError), e a primeira volta com a condição falsa devolve nil
+        if op == 'let':
+            var = f'v{next(self._variaveis)}'
+            return f"(({var} := {self._expr(node[2], escopo)}), {self._expr(node[3], {**escopo, node[1]: var})})[-1]"
+        if op == 'setq':
+            if node[1] not in escopo:
+                raise ValueError(f"setq: '{node[1]}' não é parâmetro nem variável de let")
+            return f'({escopo[node[1]]} := {self._expr(node[2], escopo)})'
+        if op == 'progn':
+            return f"({', '.join(self._expr(e, escopo) for e in node[1:])})[-1]"
+        if op in ('mapcar', 'reduce'):
+            args = ', '.join(self._expr(a, escopo) for a in node[2:])
+            return f"vetor_{'mapcar' if op == 'mapcar' else 'reduzir'}({mapa_op[node[1]]!r}, {args})"
+        if op == 'while':
+            return (f"next(NIL for _ in _sempre if not {self._cond(node[1], escopo)}"
+                    f" or ({self._expr(node[2], escopo)}, False)[-1])")
+        if op in OPS_ARITMETICOS and len(node) == 2 and isinstance(node[1], list):
+            args = [self._expr(a, escopo) for a in node[1]]
+            if len(args) < 2: return f'_erro_aridade({op!r})'
+            a, b = args[-2:]
+            valor = f'_div({a}, {b})' if op in ('/', 'div') else f'({a} {OPS_PYTHON[op]} {b})'
+            # Como na VM, só os dois últimos argumentos entram na operação
+            return valor if len(args) == 2 else f"({', '.join(args[:-2])}, {valor})[-1]"
+
+        args = [self._expr(a, escopo) for a in node[1:]]
+        if op in CMP_PYTHON and len(args) == 2: return f'(1 if {args[0]} {CMP_PYTHON[op]} {args[1]} else NIL)'
+        if op == 'not': return f'(NIL if {args[0]} else 1)'
+        if op == 'and': return f'(1 if all(({args[0]}, {args[1]})) else NIL)'
+        if op == 'or': return f'(1 if any(({args[0]}, {args[1]})) else NIL)'
+        if op in ('car', 'cdr'): return f'{op}({args[0]})'
+        if op == 'cons': return f'Cons({args[0]}, {args[1]})'
+        if op == 'print': return f'_imprimir({args[0]})'
+        return self._chamada(op, node[1:], escopo)
+
+    def _chamada(self, op, args, escopo):
+        args_py = ', '.join(self._expr(a, escopo) for a in args)
+        # Builtins vetoriais, a não ser que o programa tenha definido uma função com o nome
+        if op in PRIMITIVAS_VETOR and op not in self.aridades:
+            if op == 'range' and len(args) == 1: args_py = f'0, {args_py}'
+            return f'{NATIVOS_VETOR[op]}({args_py})'
+        if not (isinstance(op, str) and op.isidentifier()):
+            return f'_nao_encontrada({str(op)!r})({args_py})'
+        self._chamadas.add(op)
+        return f'f_{op}({args_py})'
+
+NATIVOS_VETOR = {'range': 'vetor_intervalo', 'sum': 'vetor_soma', 'length': 'vetor_tamanho', 'vetor': 'para_vetor'}
+
+def criar_motor(nome=None):
+    """Cria o motor de execução de uma sessão ('vm' ou 'nativo')."""
+    nome = nome or MOTOR
+    if nome == 'nativo': return MotorNativo()
+    if nome == 'vm':
+        vm = MaquinaVirtual()
+        if PERFIL: vm.perfilar()
+        return vm
+    raise ValueError(f"Motor desconhecido '{nome}'")
+
+def comparar_motores(fonte):
+    """Executa `fonte` nos dois motores e devolve (iguais, saída da VM, saída do nativo)."""
+    ast = analisar(tokenizar(fonte))
+    saidas = {}
+    for nome in ('vm', 'nativo'):
+        # Motor novo: estado de compilação isolado da sessão atual
+        buffer = io.StringIO()
+        motor = criar_motor(nome)
+        with contextlib.redirect_stdout(buffer):
+            try: motor.adicionar_codigo_e_executar(motor.traduzir(ast))
+            except Exception as e: print(f"Erro: {e}")
+        saidas[nome] = buffer.getvalue()
+    return saidas['vm'] == saidas['nativo'], saidas['vm'], saidas['nativo']
+
+# =============================================================
+# 4.2 CACHE DE BYTECODE (INÍCIO A QUENTE SEM PLY)
+# =============================================================
+
+# Cache ao lado da entrada: codigo_fonte.lisp -> codigo_fonte.lbc
+ARQ_BYTECODE = os.path.splitext(ARQ_IN)[0] + '.lbc'
+
+MAGICO_BYTECODE = b'LISPBC\x00\x02'
+_CABECALHO = struct.Struct('<8s32sIIII')  # mágico, chave, n_consts, n_funcoes, n_labels, n_instrucoes
+_CONST = struct.Struct('<BI')             # tipo (0 = int, 1 = str), tamanho em bytes
+_FUNCAO = struct.Struct('<IIIBI')         # nome, label, n_params, pura_local, chamadas (separadas por espaço)
+_LABEL = struct.Struct('<II')             # nome (índice no pool), posição
+_INSTRUCAO = struct.Struct('<HII')        # opcode, operando a, operando b
+_SEM_OPERANDO = 0xFFFFFFFF
+
+def chave_bytecode(fonte, nivel=None):
+    """Hash da fonte + versão do compilador (o próprio analizador.py) + nível de otimização."""
+    h = hashlib.sha256()
+    with open(__file__, 'rb') as f: h.update(f.read())
+    h.update(f'\0{NIVEL_OTIMIZACAO if nivel is None else nivel}\0'.encode())
+    h.update(fonte.encode('utf-8'))
+    return h.digest()
+
+def gravar_bytecode(caminho, chave, texto, tabela_funcoes):
+    """Grava o programa compilado (texto de gerar_codigo) no formato binário do cache."""
+    linhas, ops, args, labels = decodificar(texto)
+    pool, indices = [], {}
+
+    def const(valor):
+        k = (type(valor), valor)
+        if k not in indices:
+            indices[k] = len(pool)
+            pool.append(valor)
+        return indices[k]
+
+    instrucoes = bytearray()
+    for line, op, arg in zip(linhas, ops, args):
+        nome = OPCODES[op]
+        # Saltos guardam a posição e o nome do label (para refazer o texto exato)
+        if nome in OPS_ARG_LABEL: a, b = arg, const(line.split()[1])
+        elif nome in OPS_ARG_PAR: a, b = const(arg[0]), const(arg[1])
+        elif nome in OPS_ARG_SIMBOLO: a, b = const(arg.nome), 0
+        elif arg is None: a, b = _SEM_OPERANDO, 0
+        else: a, b = const(arg), 0
+        instrucoes += _INSTRUCAO.pack(op, a, b)
+
+    funcoes = b''.join(_FUNCAO.pack(const(nome), const(meta['label']), meta['n_params'],
+                                    meta.get('pura_local', False), const(' '.join(sorted(meta.get('chama', ())))))
+                       for nome, meta in tabela_funcoes.items())
+    tabela_labels = b''.join(_LABEL.pack(const(nome), pos) for nome, pos in labels.items())
+
+    constantes = bytearray()
+    for valor in pool:
+        bruto = str(valor).encode() if type(valor) is int else valor.encode('utf-8')
+        constantes += _CONST.pack(0 if type(valor) is int else 1, len(bruto)) + bruto
+
+    cabecalho = _CABECALHO.pack(MAGICO_BYTECODE, chave, len(pool), len(tabela_funcoes), len(labels), len(ops))
+    temporario = caminho + '.tmp'
+    with open(temporario, 'wb') as f:
+        f.write(cabecalho + constantes + funcoes + tabela_labels + instrucoes)
+    os.replace(temporario, caminho)
+
+def ler_bytecode(caminho, chave):
+    """Lê o cache com uma única leitura; devolve None se ausente, inválido ou de outra fonte."""
+    try:
+        with open(caminho, 'rb') as f: dados = f.read()
+        magico, chave_arq, n_consts, n_funcoes, n_labels, n_instrucoes = _CABECALHO.unpack_from(dados, 0)
+    except (OSError, struct.error):
+        return None
+    if magico != MAGICO_BYTECODE or chave_arq != chave: return None
+
+    try:
+        pos, pool = _CABECALHO.size, []
+        for _ in range(n_consts):
+            tipo, tam = _CONST.unpack_from(dados, pos)
+            bruto = dados[pos + _CONST.size:pos + _CONST.size + tam]
+            pool.append(int(bruto) if tipo == 0 else bruto.decode('utf-8'))
+            pos += _CONST.size + tam
+
+        visao = memoryview(dados)
+        fim = pos + n_funcoes * _FUNCAO.size
+        funcoes = {pool[nome]: {'label': pool[label], 'n_params': n,
+                                'pura_local': bool(pura), 'chama': set(pool[chama].split())}
+                   for nome, label, n, pura, chama in _FUNCAO.iter_unpack(visao[pos:fim])}
+        atualizar_pureza(funcoes)
+        pos, fim = fim, fim + n_labels * _LABEL.size
+        labels = {pool[nome]: p for nome, p in _LABEL.iter_unpack(visao[pos:fim])}
+        pos, fim = fim, fim + n_instrucoes * _INSTRUCAO.size
+
+        linhas, ops, args = [], [], []
+        for op, a, b in _INSTRUCAO.iter_unpack(visao[pos:fim]):
+            nome = OPCODES[op]
+            if nome in OPS_ARG_LABEL: arg, texto = a, f'{nome} {pool[b]}'
+            elif nome in OPS_ARG_PAR: arg = (pool[a], pool[b]); texto = f'{nome} {arg[0]} {arg[1]}'
+            elif a == _SEM_OPERANDO: arg, texto = None, nome
+            elif nome in OPS_ARG_SIMBOLO: arg = simbolo(pool[a]); texto = f'{nome} {arg}'
+            else: arg = pool[a]; texto = f'{nome} {arg}'
+            linhas.append(texto)
+            ops.append(op)
+            args.append(arg)
+    except (struct.error, IndexError, ValueError, UnicodeDecodeError):
+        return None
+
+    # Texto com labels, idêntico ao que gerar_codigo produziu
+    por_posicao = {}
+    for nome, p in labels.items(): por_posicao.setdefault(p, []).append(nome + ':')
+    codigo = []
+    for i, line in enumerate(linhas):
+        codigo += por_posicao.get(i, [])
+        codigo.append(line)
+    codigo += por_posicao.get(len(linhas), [])
+
+    return {'codigo': codigo, 'linhas': linhas, 'ops': ops, 'args': args,
+            'labels': labels, 'funcoes': funcoes}
+
+# =============================================================
+# 4.3 EXECUÇÃO EM LOTE (MUITOS PROGRAMAS EM UM POOL DE PROCESSOS)
+# =============================================================
+
+def listar_lote(alvo):
+    """Arquivos .lisp de um diretório (recursivo, em ordem) ou de um manifesto (um caminho por linha)."""
+    if os.path.isdir(alvo):
+        return sorted(os.path.join(raiz, nome) for raiz, _, nomes in os.walk(alvo)
+                      for nome in nomes if nome.endswith('.lisp'))
+    base = os.path.dirname(alvo)
+    with open(alvo, 'r', encoding='utf-8') as f:
+        linhas = [line.strip() for line in f]
+    return [os.path.join(base, line) for line in linhas if line and not line.startswith('#')]
+
+def _iniciar_trabalhador(config):
+    """Inicializador de cada processo: aplica as opções da linha de comando e monta lexer e parser uma vez."""
+    globals().update(config)
+    obter_lexer()
+    obter_parser()
+
+def executar_job(caminho):
+    """Compila e executa um programa em um motor novo; devolve saída, resultados e erro."""
+    saida = io.StringIO()
+    t0 = time.perf_counter()
+    erro, resultados, motor = None, [], None
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f: fonte = f.read()
+        motor = criar_motor()
+        with contextlib.redirect_stdout(saida):
+            ast = analisar(tokenizar(fonte))
+            if ast: motor.adicionar_codigo_e_executar(motor.traduzir(ast))
+        if not ast and fonte.strip(): erro = "SyntaxError: o programa não pôde ser analisado"
+        resultados = [str(v) for v in motor.stack]
+    except Exception as e:
+        erro = f"{type(e).__name__}: {e}"
+    return {'arquivo': caminho, 'saida': saida.getvalue(), 'resultados': resultados,
+            'erro': erro, 'tempo_s': time.perf_counter() - t0,
+            'consumo': getattr(motor, 'consumo', None)}
+
+def executar_lote(caminhos, processos=None):
+    """Distribui os programas por um pool de processos; gera os resultados na ordem de `caminhos`."""
+    processos = processos or os.cpu_count() or 1
+    config = {'NIVEL_OTIMIZACAO': NIVEL_OTIMIZACAO, 'MOTOR': MOTOR, 'LIMITE_MEMO': LIMITE_MEMO,
+              'LIMIAR_ESPECIALIZACAO': LIMIAR_ESPECIALIZACAO, 'LIMITES': LIMITES}
+    # Lotes de jobs por mensagem diluem o custo de comunicação entre processos
+    tamanho = max(1, min(64, len(caminhos) // (processos * 4)))
+    with multiprocessing.Pool(processos, initializer=_iniciar_trabalhador, initargs=(config,)) as pool:
+        yield from pool.imap(executar_job, caminhos, chunksize=tamanho)
+
+def executar_lote_cli(alvo, processos=None):
+    """Modo --lote: imprime cada resultado assim que chega (em ordem) e um resumo no fim."""
+    caminhos = listar_lote(alvo)
+    t0 = time.perf_counter()
+    falhas = 0
+    for r in executar_lote(caminhos, processos):
+        print(f"=== {r['arquivo']} ({r['tempo_s'] * 1000:.1f} ms) ===")
+        if r['saida']: print(r['saida'], end='')
+        if r['resultados']: print(f"Pilha: {' '.join(r['resultados'])}")
+        if r['erro']:
+            falhas += 1
+            print(f"Erro: {r['erro']}")
+    tempo = time.perf_counter() - t0
+    print(f"--- {len(caminhos)} programas, {falhas} com erro, {tempo:.2f} s"
+          f" ({len(caminhos) / tempo if tempo else 0:.0f} programas/s) ---")
+    return falhas
+
+# =============================================================
+# 4.4 SERVIDOR MULTISSESSÃO (ASYNCIO, PROTOCOLO DE LINHAS)
+# =============================================================
+# Cada linha recebida é uma expressão LISP (ou um comando ':').
+# Resposta: uma linha '| texto' por linha impressa, depois
+# 'ok <valor>' ou 'erro <mensagem>'. Comandos: ':metricas'
+# (JSON da sessão), ':sessoes' (JSON de todas) e ':sair'.
+
+# Instruções executadas por sessão antes de ceder a vez às outras
+INSTRUCOES_POR_FATIA = 1000
+
+def criar_biblioteca(fonte):
+    """Compila e executa a biblioteca uma vez; as sessões são clones desta VM."""
+    vm = MaquinaVirtual()
+    ast = analisar(tokenizar(fonte)) if fonte.strip() else None
+    if ast: vm.adicionar_codigo_e_executar(vm.traduzir(ast))
+    vm.stack.clear()
+    return vm
+
+class Sessao:
+    """Uma conexão: VM própria (clonada da biblioteca) e métricas de uso."""
+
+    def __init__(self, numero, vm):
+        self.numero = numero
+        self.vm = vm
+        self.requisicoes = self.erros = self.instrucoes = 0
+        self.tempo_vm = 0.0
+        self.latencias = deque(maxlen=1000)   # segundos, das requisições mais recentes
+        self.inicio = time.perf_counter()
+
+    def metricas(self):
+        lat = sorted(self.latencias)
+        def percentil(p): return lat[min(len(lat) - 1, int(p * len(lat)))] * 1000 if lat else 0.0
+        return {
+            'sessao': self.numero,
+            'requisicoes': self.requisicoes,
+            'erros': self.erros,
+            'instrucoes': self.instrucoes,
+            'tempo_vm_s': self.tempo_vm,
+            'instrucoes_por_s': self.instrucoes / self.tempo_vm if self.tempo_vm else 0.0,
+            'requisicoes_por_s': self.requisicoes / (time.perf_counter() - self.inicio),
+            'latencia_ms': {'media': sum(lat) / len(lat) * 1000 if lat else 0.0,
+                            'p50': percentil(0.50), 'p95': percentil(0.95), 'max': percentil(1.0)},
+            'codigo': self.vm.estatisticas_codigo(),
+        }
+
+async def avaliar_na_sessao(sessao, texto, fatia=None):
+    """Compila e executa `texto` na VM da sessão, cedendo a vez a cada `fatia` instruções."""
+    fatia = fatia or INSTRUCOES_POR_FATIA
+    vm, saida = sessao.vm, io.StringIO()
+    altura = len(vm.stack)
+    try:
+        with contextlib.redirect_stdout(saida):
+            ast = analisar(tokenizar(texto))
+            codigo = vm.traduzir(ast, incremental=True) if ast else ''
+        if not ast: raise SyntaxError(saida.getvalue().strip() or 'expressão vazia')
+        inicio = len(vm.ops)
+        vm.carregar(codigo)
+        vm.ip = inicio
+        vm.iniciar_execucao()
+        try:
+            while True:
+                t0 = time.perf_counter()
+                try:
+                    # Sem await aqui dentro: o redirecionamento não vaza para outras sessões
+                    with contextlib.redirect_stdout(saida):
+                        terminou = vm.continuar_execucao(fatia)
+                finally:
+                    sessao.tempo_vm += time.perf_counter() - t0
+                if terminou: break
+                await asyncio.sleep(0)
+        finally:
+            sessao.instrucoes += vm.consumo['instrucoes']
+        valores = vm.stack[altura:]
+        del vm.stack[altura:]
+        return saida.getvalue(), valores
+    except Exception:
+        vm.interromper(altura)
+        raise
+    finally:
+        vm.recuperar_codigo()
+
+async def atender_sessao(sessao, leitor, escritor, sessoes, fatia=None):
+    def responder(*linhas): escritor.write(''.join(f'{line}\n' for line in linhas).encode('utf-8'))
+    responder(f'# sessão {sessao.numero} pronta')
+    await escritor.drain()
+    while True:
+        linha = await leitor.readline()
+        if not linha: break
+        texto = linha.decode('utf-8', errors='replace').strip()
+        if not texto: continue
+        if texto == ':sair': break
+        if texto == ':metricas':
+            responder(json.dumps(sessao.metricas(), ensure_ascii=False))
+        elif texto == ':sessoes':
+            responder(json.dumps([s.metricas() for s in sessoes.values()], ensure_ascii=False))
+        else:
+            t0 = time.perf_counter()
+            sessao.requisicoes += 1
+            try:
+                impresso, valores = await avaliar_na_sessao(sessao, texto, fatia)
+                responder(*[f'| {line}' for line in impresso.splitlines()],
+                          f'ok {valores[-1] if valores else NIL}')
+            except Exception as e:
+                sessao.erros += 1
+                responder(f'erro {type(e).__name__}: {e}'.replace('\n', ' '))
+            sessao.latencias.append(time.perf_counter() - t0)
+        await escritor.drain()
+
+async def servir(biblioteca, host='127.0.0.1', porta=7070, unix=None, fatia=None, pronto=None):
+    """Atende clientes até ser cancelado; cada conexão recebe um clone de `biblioteca`."""
+    sessoes, numeracao = {}, itertools.count(1)
+
+    async def cliente(leitor, escritor):
+        sessao = Sessao(next(numeracao), biblioteca.clonar())
+        sessoes[sessao.numero] = sessao
+        try:
+            await atender_sessao(sessao, leitor, escritor, sessoes, fatia)
+        except ConnectionError:
+            pass
+        finally:
+            del sessoes[sessao.numero]
+            escritor.close()
+            print(f"[-] sessão {sessao.numero} encerrada: {json.dumps(sessao.metricas(), ensure_ascii=False)}")
+
+    if unix: servidor = await asyncio.start_unix_server(cliente, path=unix)
+    else: servidor = await asyncio.start_server(cliente, host, porta)
+    if unix: endereco = unix
+    else:
+        host_real, porta_real = servidor.sockets[0].getsockname()[:2]
+        endereco = f'{host_real}:{porta_real}'
+    print(f"[+] Servidor LISP em {endereco} ({len(biblioteca.tabela_funcoes)} funções na biblioteca)")
+    if pronto: pronto.set_result(servidor)
+    async with servidor:
+        await servidor.serve_forever()
 
 # =============================================================
 # 5. UTILITÁRIOS E MAIN
 # =============================================================
 
-# FUNÇÃO DESENHAR_ARVORE
-def desenhar_arvore(node, level=0):
+# FUNÇÃO DESENHAR_ARVORE (saida: arquivo de destino; padrão é o terminal)
+def desenhar_arvore(node, level=0, saida=None):
     indent = "  " * level
     if not isinstance(node, (list, tuple)):
-        print(f"{indent}'-' {repr(node)}")
+        print(f"{indent}'-' {repr(node)}", file=saida)
         return
     if not node:
-        print(f"{indent}- NIL")
+        print(f"{indent}- NIL", file=saida)
         return
-    print(f"{indent}+ [{repr(node[0])}]")
+    print(f"{indent}+ [{repr(node[0])}]", file=saida)
     for filho in node[1:]:
-        desenhar_arvore(filho, level + 1)
+        desenhar_arvore(filho, level + 1, saida)
+
+# --- Artefatos (tokens, AST e código intermediário em disco) ---
+
+# Artefatos gravados; troque com --artefatos=tokens,ast,codigo (ou --artefatos=nenhum)
+ARTEFATOS = {'tokens', 'ast', 'codigo'}
+# 'texto' (formato legível, nos arquivos .txt) ou 'jsonl' (um objeto JSON por linha, em .jsonl)
+FORMATO_ARTEFATOS = 'texto'
+# Caracteres acumulados por artefato antes de uma gravação no disco
+TAMANHO_BUFFER_ARTEFATOS = 1 << 16
+
+ARQUIVOS_ARTEFATOS = {'tokens': ARQ_TOKENS, 'ast': ARQ_AST, 'codigo': ARQ_COD}
+
+class Artefatos:
+    """Grava os artefatos habilitados em lotes: cada um acumula texto num buffer
+    e só vai para o disco ao passar de TAMANHO_BUFFER_ARTEFATOS ou ao fechar.
+    Artefatos desligados não custam nada (nem a formatação é feita)."""
+
+    def __init__(self, habilitados=None, formato=None, anexar=False):
+        self.habilitados = set(ARTEFATOS if habilitados is None else habilitados)
+        self.formato = formato or FORMATO_ARTEFATOS
+        self._buffers = {nome: [] for nome in self.habilitados}
+        self._tamanhos = dict.fromkeys(self.habilitados, 0)
+        self._numero = dict.fromkeys(self.habilitados, 0)   # numeração dos registros JSON
+        # Texto: registros separados por uma quebra de linha, sem quebra no fim do arquivo
+        self._separar = dict.fromkeys(self.habilitados, anexar)
+        self._arquivos = {nome: open(self.caminho(nome), 'a' if anexar else 'w', encoding='utf-8')
+                          for nome in sorted(self.habilitados)}
+        if 'ast' in self.habilitados and self.formato == 'texto' and not anexar:
+            self._gravar('ast', "=== Árvore de Sintaxe Abstrata (AST) ===\n")
+
+    def caminho(self, nome):
+        arquivo = ARQUIVOS_ARTEFATOS[nome]
+        return arquivo if self.formato == 'texto' else os.path.splitext(arquivo)[0] + '.jsonl'
+
+    def __enter__(self): return self
+    def __exit__(self, *_): self.fechar()
+
+    def tokens(self, tokens):
+        if 'tokens' not in self.habilitados: return
+        if self.formato == 'texto':
+            if tokens: self._gravar_texto('tokens', '\n'.join(str(tok) for tok in tokens))
+        else:
+            # Tipos de token são identificadores e os campos são fixos: só o valor precisa de json.dumps
+            self._gravar('tokens', ''.join(f'{{"tipo": "{tok.type}", "valor": {json.dumps(tok.value, ensure_ascii=False)}, '
+                                           f'"linha": {tok.lineno}, "pos": {tok.lexpos}}}\n' for tok in tokens))
+
+    def ast(self, ast):
+        if 'ast' not in self.habilitados: return
+        if self.formato == 'texto':
+            arvore = io.StringIO()
+            for expr in ast: desenhar_arvore(expr, saida=arvore)
+            self._gravar_texto('ast', f"{pprint.pformat(ast, indent=2, width=120)}\n"
+                                     f"\n=== Visualização Gráfica ===\n{arvore.getvalue()}")
+        else:
+            # Tuplas da AST viram listas JSON; um registro por forma de topo
+            self._gravar('ast', ''.join(self._registro('ast', {'ast': expr}) for expr in ast))
+
+    def codigo(self, texto):
+        if 'codigo' not in self.habilitados or not texto: return
+        if self.formato == 'texto': self._gravar_texto('codigo', texto)
+        else: self._gravar('codigo', self._registro('codigo', {'codigo': texto.split('\n')}))
+
+    def _registro(self, nome, dados):
+        self._numero[nome] += 1
+        return json.dumps({'n': self._numero[nome], **dados}, ensure_ascii=False) + '\n'
+
+    def _gravar_texto(self, nome, texto):
+        if self._separar[nome]: texto = '\n' + texto
+        self._separar[nome] = True
+        self._gravar(nome, texto)
+
+    def _gravar(self, nome, texto):
+        self._buffers[nome].append(texto)
+        self._tamanhos[nome] += len(texto)
+        if self._tamanhos[nome] >= TAMANHO_BUFFER_ARTEFATOS: self._descarregar(nome)
+
+    def _descarregar(self, nome):
+        self._arquivos[nome].write(''.join(self._buffers[nome]))
+        self._buffers[nome].clear()
+        self._tamanhos[nome] = 0
+
+    def descarregar(self):
+        """Grava no disco tudo o que está nos buffers."""
+        for nome, arquivo in self._arquivos.items():
+            self._descarregar(nome)
+            arquivo.flush()
+
+    def fechar(self):
+        for nome, arquivo in self._arquivos.items():
+            if not arquivo.closed:
+                self._descarregar(nome)
+                arquivo.close()
+
+    def descricao(self):
+        if not self.habilitados: return "Artefatos desligados (--artefatos=tokens,ast,codigo liga)."
+        return f"Artefatos ({self.formato}) salvos em " + ', '.join(f"'{self.caminho(n)}'" for n in sorted(self.habilitados))
+
+# --- Compilação em fluxo (forma a forma) para fontes muito grandes ---
+
+_RE_ELEMENTO = re.compile(r'\(|\)|[^\s()]+')
+
+def ler_formas(arquivo, tamanho_bloco=1 << 20):
+    """Lê `arquivo` aos poucos e gera (linha inicial, texto) de cada forma de topo.
+
+    A memória fica limitada pela maior forma (mais um bloco de leitura).
+    """
+    buffer, pos, prof, inicio = '', 0, 0, 0
+    linha, pos_linha = 1, 0    # `linha` é o número da linha em buffer[pos_linha]
+    while True:
+        bloco = arquivo.read(tamanho_bloco)
+        buffer += bloco
+        formas = []
+        for m in _RE_ELEMENTO.finditer(buffer, pos):
+            el = m.group()
+            # Átomo de topo no fim do bloco pode ter sido cortado: espera o próximo
+            if prof == 0 and el not in ('(', ')') and m.end() == len(buffer) and bloco: break
+            pos = m.end()
+            if el == '(':
+                if prof == 0: inicio = m.start()
+                prof += 1
+                continue
+            if prof > 1 or (prof == 1 and el != ')'):
+                if el == ')': prof -= 1
+                continue
+            if prof == 1: prof = 0
+            else: inicio = m.start()   # átomo (ou ')' solto) no topo
+            linha += buffer.count('\n', pos_linha, inicio)
+            pos_linha = inicio
+            formas.append((linha, buffer[inicio:pos]))
+
+        yield from formas
+        if not bloco:
+            if prof: yield linha + buffer.count('\n', pos_linha, inicio), buffer[inicio:]
+            return
+
+        # Mantém no buffer só a forma incompleta (ou o resto ainda não varrido)
+        corte = inicio if prof else pos
+        linha += buffer.count('\n', pos_linha, corte)
+        buffer, pos, inicio, pos_linha = buffer[corte:], pos - corte, inicio - corte, 0
+
+def executar_em_fluxo(caminho, vm, artefatos):
+    """Lê, compila e executa `caminho` uma forma de topo por vez, gravando os artefatos aos poucos."""
+    with open(caminho, 'r', encoding='utf-8') as entrada:
+        for linha, texto in ler_formas(entrada):
+            tokens = tokenizar(texto, linha)
+            artefatos.tokens(tokens)
+            ast = analisar(tokens)
+            if not ast: continue
+            artefatos.ast(ast)
+
+            altura = len(vm.stack)
+            try:
+                codigo = vm.traduzir(ast, incremental=True)
+                artefatos.codigo(codigo)
+                vm.adicionar_codigo_e_executar(codigo)
+            except ErroLigacao as e:
+                print(f"Erro: {e}")   # as mensagens já trazem a linha
+            except Exception as e:
+                print(f"Erro (linha {linha}): {e}")
+
+            # Nada da forma já executada precisa ficar na memória (o código a VM já recuperou)
+            del vm.stack[altura:]
 
 # =============================================================
 # 6. SHELL INTERATIVO 
 # =============================================================
 
-def shell_interativo(vm):
+def comando_perfil(vm, args):
+    """:profile [on | off | json <arquivo> | flame <arquivo>]"""
+    if not isinstance(vm, MaquinaVirtual):
+        print("Erro: o perfil só está disponível no motor 'vm'.")
+        return
+    acao = args[0].lower() if args else ''
+    if acao in ('on', 'ligar'):
+        vm.perfilar(True)
+        print("[+] Perfil ligado (contadores zerados).")
+    elif acao in ('off', 'desligar'):
+        vm.perfilar(False)
+        print("[+] Perfil desligado.")
+    elif vm.perfilador is None:
+        print("[+] Perfil desligado. Use ':profile on'.")
+    elif not acao:
+        print(vm.perfilador.relatorio())
+    elif acao in ('json', 'flame') and len(args) == 2:
+        conteudo = vm.perfilador.para_json() if acao == 'json' else vm.perfilador.pilhas_colapsadas()
+        with open(args[1], 'w', encoding='utf-8') as f: f.write(conteudo)
+        print(f"[+] Perfil ({acao}) salvo em '{args[1]}'.")
+    else:
+        print("Uso: :profile [on | off | json <arquivo> | flame <arquivo>]")
+
+def comando_memo(vm, args):
+    """:memo [limpar | limite <n>]"""
+    if not isinstance(vm, MaquinaVirtual):
+        print("Erro: a memoização só está disponível no motor 'vm'.")
+        return
+    acao = args[0].lower() if args else ''
+    if acao == 'limpar':
+        for memo in vm.func_memo:
+            if memo is not None: memo.invalidar()
+        print("[+] Caches de memoização esvaziados.")
+    elif acao == 'limite' and len(args) == 2 and args[1].isdigit():
+        vm.configurar_memo(int(args[1]))
+        print(f"[+] Limite de memoização: {vm.memo_limite} entradas por função.")
+    elif not acao:
+        estatisticas = vm.estatisticas_memo()
+        if not estatisticas:
+            print("[+] Nenhuma função memoizada.")
+            return
+        print(f"{'função':<16} {'acertos':>9} {'falhas':>9} {'descartes':>9} {'entradas':>9}  taxa")
+        for nome, e in estatisticas.items():
+            total = e['acertos'] + e['falhas']
+            taxa = e['acertos'] / total if total else 0.0
+            print(f"{nome:<16} {e['acertos']:>9} {e['falhas']:>9} {e['descartes']:>9} "
+                  f"{e['entradas']:>4}/{e['limite']:<4}  {taxa:.0%}")
+    else:
+        print("Uso: :memo [limpar | limite <n>]")
+
+def comando_limites(vm, args):
+    """:limites [nenhum | instrucoes=<n> pilha=<n> chamadas=<n> tempo=<s>]"""
+    if not isinstance(vm, MaquinaVirtual):
+        print("Erro: limites só existem no motor 'vm'.")
+        return
+    if args == ['nenhum']:
+        vm.limites = Limites()
+    elif args:
+        novos = vm.limites.para_dict()
+        for par in args:
+            recurso, _, valor = par.partition('=')
+            recurso = 'tempo_s' if recurso == 'tempo' else recurso
+            if recurso not in NOMES_RECURSOS or not valor:
+                print("Uso: :limites [nenhum | instrucoes=<n> pilha=<n> chamadas=<n> tempo=<s>]")
+                return
+            novos[recurso] = None if valor == '-' else (float(valor) if recurso == 'tempo_s' else int(valor))
+        vm.limites = Limites(**novos)
+    print(f"[+] Limites: {vm.limites!r}")
+
+def comando_shell(vm, partes):
+    """Comandos do shell que começam com ':' (por exemplo ':profile')."""
+    if not partes: return
+    cmd, args = partes[0].lower(), partes[1:]
+    if cmd in ('profile', 'perfil'): comando_perfil(vm, args)
+    elif cmd == 'memo': comando_memo(vm, args)
+    elif cmd == 'limites': comando_limites(vm, args)
+    elif cmd == 'consumo':
+        consumo = getattr(vm, 'consumo', None)
+        print(f"[+] Última execução: {formatar_consumo(consumo)}" if consumo else "[+] Nada executado ainda.")
+    elif cmd in ('quick', 'especializacao'):
+        if isinstance(vm, MaquinaVirtual): print(formatar_especializacao(vm.estatisticas_especializacao()))
+        else: print("Erro: a especialização só existe no motor 'vm'.")
+    else: print(f"Comando desconhecido ':{cmd}'")
+
+def shell_interativo(vm, artefatos=None):
+    artefatos = artefatos or Artefatos(habilitados=())
     print("\n[+] Modo Interativo LISP (Digite 'sair' para encerrar)")
-    print(f"[+] Saídas estão sendo salvas em '{ARQ_TOKENS}' e '{ARQ_COD}'.")
+    print(f"[+] {artefatos.descricao()}")
+    print("[+] ':profile on|off|json <arq>|flame <arq>' controla o perfil da VM.")
+    print("[+] ':memo [limpar | limite <n>]' mostra o cache das funções puras.")
+    print("[+] ':quick' mostra as instruções especializadas para inteiros.")
+    print("[+] ':limites ...' e ':consumo' controlam/mostram os recursos de cada execução.")
     
     while True:
         try:
-            texto = input("\nLISP > ")
+            try:
+                texto = input("\nLISP > ")
+            except EOFError:
+                break
             if texto.lower() in ['sair', 'exit', 'quit']:
                 break
             if not texto.strip(): continue
+            if texto.startswith(':'):
+                comando_shell(vm, texto[1:].split())
+                continue
 
-            # --- 1. Captura Tokens para Log (APPEND) ---
-            log_lexer = lex.lex()
-            log_lexer.input(texto)
-            tokens_log = []
-            for tok in log_lexer:
-                tokens_log.append(str(tok))
-            
-            if tokens_log:
-                with open(ARQ_TOKENS, 'a', encoding='utf-8') as f:
-                    f.write('\n' + '\n'.join(tokens_log))
+            # --- 1. Tokens: uma passada serve ao log (buffer dos artefatos) e ao parser ---
+            tokens = tokenizar(texto)
+            artefatos.tokens(tokens)
 
-            # --- 2. Lexer/Parser para Execução ---
-            novo_lexer = lex.lex()
-            novo_lexer.input(texto)
-            ast = parser.parse(texto, lexer=novo_lexer)
+            # --- 2. Parser para Execução ---
+            ast = analisar(tokens)
 
             if ast:
-                tam_antes = len(codigo_intermediario)
-                
-                for expr in ast:
-                    gerar_codigo(expr)
-                
-                novo_codigo_lista = codigo_intermediario[tam_antes:]
-                novo_codigo_texto = '\n'.join(novo_codigo_lista)
+                artefatos.ast(ast)
+                novo_codigo_texto = vm.traduzir(ast, incremental=True)
                 
-                # --- 3. Salva Código Intermediário para Log (APPEND) ---
+                # --- 3. Código Intermediário para o log ---
                 if novo_codigo_texto:
-                    with open(ARQ_COD, 'a', encoding='utf-8') as f:
-                        f.write('\n' + novo_codigo_texto)
+                    artefatos.codigo(novo_codigo_texto)
                     
                     # --- 4. Executa na VM ---
                     vm.adicionar_codigo_e_executar(novo_codigo_texto)
             
         except Exception as e:
             print(f"Erro: {e}")
+        finally:
+            # Valores de topo já avaliados não ficam vivos (como no servidor e no --fluxo)
+            del vm.stack[:]
 
 if __name__ == "__main__":
-    # Inicializa arquivos de log vazios
-    open(ARQ_TOKENS, 'w', encoding='utf-8').close()
-    open(ARQ_AST, 'w', encoding='utf-8').close() 
-    open(ARQ_COD, 'w', encoding='utf-8').close()
+    # Opções: -O<n> (nível de otimização), --motor=vm|nativo, --diferencial [arquivos|dirs],
+    #         --fluxo [arquivo], --lote <dir|manifesto> [--processos=<n>],
+    #         --servidor [biblioteca] [--porta=<n> | --unix=<caminho>] [--fatia=<n>],
+    #         --limite-instrucoes=<n>, --limite-pilha=<n>, --limite-chamadas=<n>,
+    #         --limite-tempo=<s>, --perfil, --memo=<n>, --gerar-tabelas,
+    #         --artefatos=tokens,ast,codigo|nenhum, --formato-artefatos=texto|jsonl
+    argumentos = sys.argv[1:]
+    for arg in argumentos:
+        if arg.startswith('-O') and arg[2:].isdigit():
+            NIVEL_OTIMIZACAO = int(arg[2:])
+        elif arg.startswith('--motor='):
+            MOTOR = arg.split('=', 1)[1]
+        elif arg == '--perfil':
+            PERFIL = True
+        elif arg.startswith('--memo=') and arg[7:].isdigit():
+            LIMITE_MEMO = int(arg[7:])
+        elif arg.startswith('--limite-'):
+            recurso, valor = arg[len('--limite-'):].split('=', 1)
+            recurso = {'tempo': 'tempo_s'}.get(recurso, recurso)
+            if recurso in NOMES_RECURSOS:
+                setattr(LIMITES, recurso, float(valor) if recurso == 'tempo_s' else int(valor))
+        elif arg.startswith('--artefatos='):
+            ARTEFATOS = {nome for nome in arg.split('=', 1)[1].split(',') if nome in ARQUIVOS_ARTEFATOS}
+        elif arg.startswith('--formato-artefatos=') and arg.split('=', 1)[1] in ('texto', 'jsonl'):
+            FORMATO_ARTEFATOS = arg.split('=', 1)[1]
+
+    # Regrava parsetab.py depois de mudanças na gramática
+    if '--gerar-tabelas' in argumentos:
+        gerar_tabelas_parser()
+        sys.exit(0)
+
+    # Servidor: --servidor [biblioteca.lisp] [--porta=<n> | --unix=<caminho>] [--fatia=<n>]
+    if '--servidor' in argumentos:
+        opcoes = dict(a[2:].split('=', 1) for a in argumentos if a.startswith('--') and '=' in a)
+        alvos = [a for a in argumentos if not a.startswith('-')]
+        caminho = alvos[0] if alvos else ARQ_IN
+        fonte = open(caminho, 'r', encoding='utf-8').read() if os.path.exists(caminho) else ''
+        try:
+            asyncio.run(servir(criar_biblioteca(fonte), porta=int(opcoes.get('porta', 7070)),
+                               unix=opcoes.get('unix'), fatia=int(opcoes.get('fatia', 0)) or None))
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    # Modo em lote: --lote <diretório|manifesto> [--processos=<n>]
+    if '--lote' in argumentos:
+        alvos = [a for a in argumentos if not a.startswith('-')]
+        processos = [int(a.split('=', 1)[1]) for a in argumentos if a.startswith('--processos=')]
+        falhas = executar_lote_cli(alvos[0] if alvos else '.', processos[-1] if processos else None)
+        sys.exit(1 if falhas else 0)
+
+    # Modo em fluxo: compila e executa uma forma de topo por vez
+    if '--fluxo' in argumentos:
+        arquivos = [a for a in argumentos if not a.startswith('-')]
+        vm = criar_motor()
+        with Artefatos() as artefatos:
+            executar_em_fluxo(arquivos[0] if arquivos else ARQ_IN, vm, artefatos)
+            shell_interativo(vm, artefatos)
+        sys.exit(0)
+
+    # Teste diferencial: mesmos programas na VM e no motor nativo
+    if '--diferencial' in argumentos:
+        falhas = 0
+        alvos = [a for a in argumentos if not a.startswith('-')] or [ARQ_IN]
+        for nome in [n for a in alvos for n in (listar_lote(a) if os.path.isdir(a) else [a])]:
+            with open(nome, 'r', encoding='utf-8') as f:
+                iguais, saida_vm, saida_nativo = comparar_motores(f.read())
+            print(f"{'OK   ' if iguais else 'FALHA'} {nome}")
+            if not iguais:
+                falhas += 1
+                print(f"--- vm ---\n{saida_vm}--- nativo ---\n{saida_nativo}")
+        sys.exit(1 if falhas else 0)
 
     try:
         with open(ARQ_IN, 'r', encoding='utf-8') as f: data = f.read()
@@ -440,52 +2927,67 @@ if __name__ == "__main__":
         data = ""
         print(f"Aviso: '{ARQ_IN}' não encontrado. Iniciando vazio.")
 
-    # Se o arquivo estiver vazio
-    if not data.strip():
-        print("--- Arquivo de entrada vazio ou inexistente ---")
-        print("Iniciando VM vazia...")
-        vm = MaquinaVirtual(tabela_global_funcoes)
-        shell_interativo(vm)
+    # Início a quente: fonte e compilador inalterados, usa o bytecode em cache
+    chave = chave_bytecode(data)
+    programa = ler_bytecode(ARQ_BYTECODE, chave) if data.strip() and MOTOR == 'vm' else None
+    if programa:
+        print(f"--- '{ARQ_IN}' inalterado: carregando bytecode de '{ARQ_BYTECODE}' ---")
+        vm = criar_motor('vm')
+        for nome, meta in programa['funcoes'].items(): vm.compilador.definir(nome, meta)
+        vm.carregar_decodificado(programa['linhas'], programa['ops'], programa['args'], programa['labels'])
+        vm.ip = 0
+        try:
+            vm.run()
+        finally:
+            vm.recuperar_codigo()
+        # Os artefatos da execução anterior continuam valendo: o shell só acrescenta
+        with Artefatos(anexar=True) as artefatos:
+            shell_interativo(vm, artefatos)
+        sys.exit(0)
+
+    # Arquivos de log começam vazios; os habilitados são gravados em lotes
+    with Artefatos() as artefatos:
+        # Se o arquivo estiver vazio
+        if not data.strip():
+            print("--- Arquivo de entrada vazio ou inexistente ---")
+            print("Iniciando VM vazia...")
+            vm = criar_motor()
+            shell_interativo(vm, artefatos)
     
-    else:
-        print(f"--- Carregando '{ARQ_IN}' ---")
+        else:
+            print(f"--- Carregando '{ARQ_IN}' ---")
         
-        # 1. Lexer
-        lexer.input(data)
-        lista_tokens = []
-        for tok in lexer: lista_tokens.append(str(tok))
-        with open(ARQ_TOKENS, 'w', encoding='utf-8') as f: f.write('\n'.join(lista_tokens))
+            # 1. Lexer (uma única passada para o log e para o parser)
+            lista_tokens = tokenizar(data)
+            artefatos.tokens(lista_tokens)
         
-        # 2. Parser
-        lexer.input(data)
-        ast = parser.parse(data, lexer=lexer)
+            # 2. Parser
+            ast = analisar(lista_tokens)
         
-        if ast:
-            # --- GERAÇÃO DO ARQUIVO DA AST 
-            with open(ARQ_AST, 'w', encoding='utf-8') as f:
-                f.write("=== Árvore de Sintaxe Abstrata (AST) ===\n")
-                f.write(pprint.pformat(ast, indent=2, width=120))
-                f.write("\n\n=== Visualização Gráfica ===\n")
-                
-                # Redireciona o print da função desenhar_arvore para o arquivo
-                original_stdout = sys.stdout
-                sys.stdout = f
-                for expr in ast:
-                    desenhar_arvore(expr)
-                sys.stdout = original_stdout # Devolve o print para o terminal
-            
-            print(f"--> AST salva em '{ARQ_AST}'")
+            if ast:
+                # --- ARQUIVO DA AST (só formatado se o artefato estiver ligado)
+                artefatos.ast(ast)
+                if 'ast' in artefatos.habilitados: print(f"--> AST salva em '{artefatos.caminho('ast')}'")
 
-            # 3. Gerador
-            for expr in ast: gerar_codigo(expr)
-            cod_inicial = '\n'.join(codigo_intermediario)
-            with open(ARQ_COD, 'w', encoding='utf-8') as f: f.write(cod_inicial)
+                # 3. Gerador + Otimizador (no motor nativo, tradução para Python)
+                vm = criar_motor()
+                try:
+                    if isinstance(vm, MaquinaVirtual):
+                        cod_inicial, relatorio = compilar(ast, vm.compilador, relatorio=True)
+                        print(f"--> Otimização -O{relatorio['nivel']}: {relatorio['antes']} -> {relatorio['depois']} instruções")
+                        gravar_bytecode(ARQ_BYTECODE, chave, cod_inicial, vm.tabela_funcoes)
+                    else:
+                        cod_inicial = vm.traduzir(ast)
+                except ErroLigacao as e:
+                    # Nada do programa executa; o shell começa com a VM vazia
+                    print(f"Erro de ligação em '{ARQ_IN}':\n{e}")
+                    vm, cod_inicial = criar_motor(), ''
+                artefatos.codigo(cod_inicial)
             
-            # 4. VM
-            vm = MaquinaVirtual(tabela_global_funcoes)
-            vm.adicionar_codigo_e_executar(cod_inicial)
+                # 4. Execução (VM ou motor nativo)
+                if cod_inicial: vm.adicionar_codigo_e_executar(cod_inicial)
             
-            # Entra no shell
-            shell_interativo(vm)
-        else:
-            print("Erro ao processar o arquivo inicial. Verifique a sintaxe.")
\ No newline at end of file
+                # Entra no shell
+                shell_interativo(vm, artefatos)
+            else:
+                print("Erro ao processar o arquivo inicial. Verifique a sintaxe.")
\ No newline at end of file
@@ -0,0 +1,61 @@
+# =============================================================
+# BENCHMARK: CONSTRUÇÃO E PERCURSO DE LISTAS COM CÉLULAS CONS
+# Construir e percorrer listas de n elementos deve ser O(n):
+# o tempo por elemento precisa ficar aproximadamente constante.
+# Uso: python benchmarks/bench_cons.py [n1 n2 ...]
+# =============================================================
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import analizador
+
+# construir: (1 2 ... n) acumulando com cons; tamanho: percorre com cdr
+PROGRAMA = '''
+(defun construir (n acc) (if (eq n 0) acc (construir (- n 1) (cons n acc))))
+(defun tamanho (l) (if l (+ 1 (tamanho (cdr l))) 0))
+'''
+
+def compilar(vm, fonte):
+    return vm.traduzir(analizador.analisar(analizador.tokenizar(fonte)))
+
+def executar(vm, fonte):
+    """Executa `fonte` e devolve (tempo de VM, valor deixado no topo da pilha)."""
+    codigo = compilar(vm, fonte)
+    t0 = time.perf_counter()
+    vm.adicionar_codigo_e_executar(codigo)
+    return time.perf_counter() - t0, vm.stack.pop()
+
+def main(tamanhos):
+    vm = analizador.MaquinaVirtual()
+    # Sem memoização: (construir n nil) repetido viria do cache e zeraria o percurso
+    vm.configurar_memo(0)
+    vm.adicionar_codigo_e_executar(compilar(vm, PROGRAMA))
+
+    # EQ entre uma lista e um átomo é falso (sem recursão no __eq__ de Cons)
+    for atomo in ('5', 'foo', 'nil'):
+        assert executar(vm, f'(eq (cons 1 nil) {atomo})')[1] is analizador.NIL
+    assert executar(vm, '(eq (cons 1 (cons 2 nil)) (cons 1 nil))')[1] is analizador.NIL
+    assert executar(vm, '(eq (cons 1 (cons 2 3)) (cons 1 (cons 2 3)))')[1] == 1
+
+    print(f"{'n':>9} | {'construir (s)':>13} | {'percorrer (s)':>13} | {'ns/elem':>8} | {'host (s)':>8}")
+    for n in tamanhos:
+        t_construir, lista = executar(vm, f'(construir {n} nil)')
+        assert type(lista) is analizador.Cons
+
+        t_total, tamanho = executar(vm, f'(tamanho (construir {n} nil))')
+        assert tamanho == n
+        t_percorrer = max(t_total - t_construir, 0.0)
+
+        # Conversões do lado host (lista Python <-> cons)
+        t0 = time.perf_counter()
+        assert len(analizador.cons_para_lista(analizador.lista_para_cons(list(range(n))))) == n
+        t_host = time.perf_counter() - t0
+
+        ns_elem = t_total / n * 1e9
+        print(f"{n:>9} | {t_construir:>13.3f} | {t_percorrer:>13.3f} | {ns_elem:>8.0f} | {t_host:>8.3f}")
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [100_000, 250_000, 500_000, 1_000_000])
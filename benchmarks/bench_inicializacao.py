@@ -0,0 +1,64 @@
+# =============================================================
+# BENCHMARK: TEMPO DE INICIALIZAÇÃO
+# Mede, em processos novos, o import de analizador e a primeira
+# avaliação (lexer + parser + geração + VM), a frio (sem .pyc)
+# e a quente (com .pyc). Também confere que nada é gravado no
+# diretório de trabalho.
+# Uso: python benchmarks/bench_inicializacao.py [repetições]
+# =============================================================
+
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Executado em cada processo filho; imprime os tempos como JSON
+FILHO = '''
+import contextlib, io, json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {raiz!r})
+import analizador
+t1 = time.perf_counter()
+vm = analizador.criar_motor()
+with contextlib.redirect_stdout(io.StringIO()):
+    vm.adicionar_codigo_e_executar(vm.traduzir(analizador.analisar(analizador.tokenizar(
+        "(defun somar (a b) (+ a b)) (print (somar 5 3))"))))
+t2 = time.perf_counter()
+print(json.dumps({{'import': t1 - t0, 'primeira_avaliacao': t2 - t1}}))
+'''
+
+def limpar_pyc():
+    for arq in glob.glob(os.path.join(RAIZ, '__pycache__', 'analizador*.pyc')):
+        os.remove(arq)
+
+def medir(cwd):
+    # O modo quente depende do .pyc gravado pela execução anterior
+    env = {k: v for k, v in os.environ.items() if k != 'PYTHONDONTWRITEBYTECODE'}
+    saida = subprocess.run([sys.executable, '-c', FILHO.format(raiz=RAIZ)], cwd=cwd, env=env,
+                           capture_output=True, text=True, check=True).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+def main(repeticoes):
+    with tempfile.TemporaryDirectory() as cwd:
+        resultados = {'frio': [], 'quente': []}
+        for _ in range(repeticoes):
+            limpar_pyc()
+            resultados['frio'].append(medir(cwd))
+            resultados['quente'].append(medir(cwd))
+        gravados = os.listdir(cwd)
+
+    print(f"{'modo':>7} | {'import (ms)':>11} | {'1ª avaliação (ms)':>17} | {'total (ms)':>10}")
+    for modo, medidas in resultados.items():
+        imp = min(m['import'] for m in medidas) * 1000
+        aval = min(m['primeira_avaliacao'] for m in medidas) * 1000
+        print(f"{modo:>7} | {imp:>11.1f} | {aval:>17.1f} | {imp + aval:>10.1f}")
+
+    assert not gravados, f"arquivos gravados no diretório de trabalho: {gravados}"
+    print("OK: nenhum arquivo gravado no diretório de trabalho.")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
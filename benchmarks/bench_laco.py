@@ -0,0 +1,39 @@
+# =============================================================
+# BENCHMARK: LAÇO (let/while/dotimes) x RECURSÃO
+# Mesma soma 1..n (e a mesma soma de quadrados com laços aninhados)
+# escrita com laço (STORE_LOCAL + JUMP para trás, sem chamadas),
+# com recursão de cauda (TAILCALL) e com recursão comum (CALL/RET).
+# Uso: python benchmarks/bench_laco.py [n] [repeticoes]
+# =============================================================
+
+import sys
+
+import comparacao
+
+DEFINICOES = '''
+(defun soma_laco (n) (let ((acc 0) (i 1)) (while (leq i n) (setq acc (+ acc i)) (setq i (+ i 1))) acc))
+(defun soma_dotimes (n) (let ((acc 0)) (dotimes (i n) (setq acc (+ acc (+ i 1)))) acc))
+(defun soma_cauda (i n acc) (if (gt i n) acc (soma_cauda (+ i 1) n (+ acc i))))
+(defun soma_rec (n) (if (eq n 0) 0 (+ n (soma_rec (- n 1)))))
+(defun tabela_laco (n) (let ((t 0)) (dotimes (i n) (dotimes (j n) (setq t (+ t (* i j))))) t))
+(defun linha_rec (i j n acc) (if (eq j n) acc (linha_rec i (+ j 1) n (+ acc (* i j)))))
+(defun tabela_rec (i n acc) (if (eq i n) acc (tabela_rec (+ i 1) n (linha_rec i 0 n acc))))
+'''
+
+def casos(n):
+    lado = int(n ** 0.5)
+    return [
+        ('soma: while', f'(soma_laco {n})'),
+        ('soma: dotimes', f'(soma_dotimes {n})'),
+        ('soma: recursão de cauda', f'(soma_cauda 1 {n} 0)'),
+        ('soma: recursão comum', f'(soma_rec {n})'),
+        ('tabela: dotimes aninhados', f'(tabela_laco {lado})'),
+        ('tabela: recursão de cauda', f'(tabela_rec 0 {lado} 0)'),
+    ]
+
+def main(n, repeticoes):
+    comparacao.comparar(DEFINICOES, casos(n), repeticoes, largura_resultado=16)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 3)
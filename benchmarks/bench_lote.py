@@ -0,0 +1,67 @@
+# =============================================================
+# BENCHMARK: EXECUÇÃO EM LOTE COM POOL DE PROCESSOS
+# Gera muitos programas pequenos e compara um processo Python por
+# programa (como chamar analizador.py para cada script) com o modo
+# em lote (executar_lote) usando 1, 2, 4, ... processos.
+# Uso: python benchmarks/bench_lote.py [n_programas]
+# =============================================================
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, RAIZ)
+import analizador
+
+# Um processo novo por programa: importa PLY, monta lexer/parser e executa
+FILHO = '''
+import sys
+sys.path.insert(0, {raiz!r})
+import analizador
+r = analizador.executar_job(sys.argv[1])
+assert r['erro'] is None, r['erro']
+'''
+
+def gerar_programas(diretorio, n):
+    caminhos = []
+    for i in range(n):
+        caminho = os.path.join(diretorio, f'prog{i:05d}.lisp')
+        with open(caminho, 'w', encoding='utf-8') as f:
+            f.write(f'(defun soma (n acc) (if (eq n 0) acc (soma (- n 1) (+ acc n))))\n'
+                    f'(defun fib (n) (if (lt n 2) n (+ (fib (- n 1)) (fib (- n 2)))))\n'
+                    f'(print (soma {200 + i % 50} 0))\n(print (fib {10 + i % 5}))\n')
+        caminhos.append(caminho)
+    return caminhos
+
+def main(n):
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminhos = gerar_programas(diretorio, n)
+
+        # Processo por programa: mede uma amostra e extrapola
+        amostra = caminhos[:min(20, n)]
+        t0 = time.perf_counter()
+        for caminho in amostra:
+            subprocess.run([sys.executable, '-c', FILHO.format(raiz=RAIZ), caminho], check=True)
+        por_programa = (time.perf_counter() - t0) / len(amostra)
+        print(f"{'modo':>22} | {'tempo (s)':>9} | {'programas/s':>11}")
+        print(f"{'processo por programa':>22} | {por_programa * n:>9.2f} | {1 / por_programa:>11.0f}  (estimado)")
+
+        processos, limite = 1, os.cpu_count() or 1
+        referencia = None
+        while True:
+            t0 = time.perf_counter()
+            resultados = list(analizador.executar_lote(caminhos, processos))
+            tempo = time.perf_counter() - t0
+            assert [r['arquivo'] for r in resultados] == caminhos, "resultados fora de ordem"
+            assert all(r['erro'] is None for r in resultados)
+            referencia = referencia or tempo
+            print(f"{f'lote, {processos} processo(s)':>22} | {tempo:>9.2f} | {n / tempo:>11.0f}"
+                  f"  (aceleração {referencia / tempo:.2f}x)")
+            if processos >= limite: break
+            processos = min(processos * 2, limite)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
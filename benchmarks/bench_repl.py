@@ -0,0 +1,54 @@
+# =============================================================
+# BENCHMARK: MEMÓRIA DE UMA SESSÃO LONGA (REPL / SERVIDOR)
+# Avalia muitas linhas na mesma VM (expressões de topo e defuns
+# redefinidas) e mostra, a intervalos, o tamanho do código carregado
+# e a memória alocada, com e sem a recuperação do espaço de código.
+# Uso: python benchmarks/bench_repl.py [n_avaliacoes]
+# =============================================================
+
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import analizador
+
+BIBLIOTECA = '''
+(defun fib (n) (if (lt n 2) n (+ (fib (- n 1)) (fib (- n 2)))))
+(defun soma (n acc) (if (eq n 0) acc (soma (- n 1) (+ acc n))))
+'''
+
+def linha(i):
+    # Metade das linhas redefine uma função; todas executam código de topo
+    if i % 2: return f'(defun passo (x) (if (gt x {i % 7}) (+ x (fib 8)) (* x 2))) (print (passo {i % 13}))'
+    return f'(print (if (eq (soma {i % 50} 0) {sum(range(i % 50 + 1))}) (fib {i % 10}) 0))'
+
+def sessao(n, recuperar):
+    vm = analizador.MaquinaVirtual()
+    if not recuperar: vm.recuperar_codigo = lambda: 0
+    saida = io.StringIO()
+    with contextlib.redirect_stdout(saida):
+        vm.adicionar_codigo_e_executar(vm.traduzir(analizador.analisar(analizador.tokenizar(BIBLIOTECA))))
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    for i in range(1, n + 1):
+        with contextlib.redirect_stdout(saida):
+            vm.adicionar_codigo_e_executar(vm.traduzir(analizador.analisar(analizador.tokenizar(linha(i)))))
+        saida.seek(0)
+        saida.truncate()
+        if i % (n // 5) == 0:
+            print(f"{'sim' if recuperar else 'não':>11} | {i:>10} | {len(vm.ops):>12} | {len(vm.labels):>8}"
+                  f" | {tracemalloc.get_traced_memory()[0] / 1024:>12.0f} | {i / (time.perf_counter() - t0):>10.0f}")
+    tracemalloc.stop()
+
+def main(n):
+    print(f"{'recuperação':>11} | {'avaliações':>10} | {'instruções':>12} | {'labels':>8} | {'memória (KiB)':>12}"
+          f" | {'aval./s':>10}")
+    sessao(n, recuperar=False)
+    sessao(n, recuperar=True)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,89 @@
+# =============================================================
+# BENCHMARK: SERVIDOR MULTISSESSÃO
+# Um cliente "pesado" roda um laço longo enquanto vários clientes
+# "leves" fazem requisições curtas. Com fatias pequenas os leves
+# continuam sendo atendidos; sem ceder a vez (fatia enorme) eles
+# esperam o pesado terminar. Também confere o isolamento das sessões.
+# Uso: python benchmarks/bench_servidor.py [n_leves] [tamanho_do_laço]
+# =============================================================
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import analizador
+
+BIBLIOTECA = '''
+(defun soma (n acc) (if (eq n 0) acc (soma (- n 1) (+ acc n))))
+(defun quadrado (x) (* x x))
+'''
+
+async def pedir(leitor, escritor, linha):
+    escritor.write((linha + '\n').encode())
+    await escritor.drain()
+    resposta = []
+    while True:
+        r = (await leitor.readline()).decode().rstrip('\n')
+        resposta.append(r)
+        if not r.startswith('| '): return resposta
+
+async def conectar(porta):
+    leitor, escritor = await asyncio.open_connection('127.0.0.1', porta)
+    await leitor.readline()   # '# sessão N pronta'
+    return leitor, escritor
+
+async def cenario(fatia, n_leves, n_laco):
+    pronto = asyncio.get_running_loop().create_future()
+    biblioteca = analizador.criar_biblioteca(BIBLIOTECA)
+    tarefa = asyncio.create_task(analizador.servir(biblioteca, porta=0, fatia=fatia, pronto=pronto))
+    servidor = await pronto
+    porta = servidor.sockets[0].getsockname()[1]
+
+    pesado = await conectar(porta)
+    leves = [await conectar(porta) for _ in range(n_leves)]
+
+    # Isolamento: uma definição em uma sessão não aparece nas outras
+    assert (await pedir(*leves[0], '(defun so_aqui (x) x)'))[-1].startswith('ok')
+    assert (await pedir(*leves[1 % n_leves], '(so_aqui 1)'))[0] == 'erro ErroLigacao: linha 1: função \'so_aqui\' não definida'
+
+    async def leve(conexao, i):
+        latencias = []
+        while not fim.done():
+            t0 = time.perf_counter()
+            resposta = await pedir(*conexao, f'(quadrado {i})')
+            assert resposta[-1] == f'ok {i * i}', resposta
+            latencias.append(time.perf_counter() - t0)
+        return latencias
+
+    fim = asyncio.get_running_loop().create_future()
+    tarefas = [asyncio.create_task(leve(c, i)) for i, c in enumerate(leves)]
+    t0 = time.perf_counter()
+    resposta = await pedir(*pesado, f'(soma {n_laco} 0)')
+    tempo_pesado = time.perf_counter() - t0
+    fim.set_result(True)
+    latencias = [l for lista in await asyncio.gather(*tarefas) for l in lista]
+    assert resposta[-1] == f'ok {n_laco * (n_laco + 1) // 2}', resposta
+
+    metricas = json.loads((await pedir(*pesado, ':metricas'))[0])
+    for leitor, escritor in [pesado] + leves: escritor.close()
+    tarefa.cancel()
+    with contextlib.suppress(asyncio.CancelledError): await tarefa
+
+    latencias.sort()
+    return tempo_pesado, len(latencias), latencias[len(latencias) // 2] if latencias else 0.0, metricas
+
+def main(n_leves, n_laco):
+    print(f"{'fatia':>12} | {'pesado (s)':>10} | {'reqs leves':>10} | {'p50 leve (ms)':>13} | {'instr/s (pesado)':>16}")
+    for fatia in (1_000, 10**12):
+        # O log do servidor (uma linha por sessão encerrada) não entra na tabela
+        with contextlib.redirect_stdout(io.StringIO()):
+            tempo, n, p50, metricas = asyncio.run(cenario(fatia, n_leves, n_laco))
+        print(f"{fatia:>12} | {tempo:>10.2f} | {n:>10} | {p50 * 1000:>13.2f} | {metricas['instrucoes_por_s']:>16.0f}")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4, int(sys.argv[2]) if len(sys.argv) > 2 else 200_000)
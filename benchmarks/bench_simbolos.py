@@ -0,0 +1,37 @@
+# =============================================================
+# BENCHMARK: SÍMBOLOS x INTEIROS
+# O mesmo autômato (classifica n números e conta as transições)
+# escrito com símbolos internados (EQ por identidade) e com códigos
+# inteiros (EQ especializado para int).
+# Uso: python benchmarks/bench_simbolos.py [n] [repeticoes]
+# =============================================================
+
+import sys
+
+import comparacao
+
+DEFINICOES = '''
+(defun classe_s (x) (if (eq (mod x 3) 0) fizz (if (eq (mod x 5) 0) buzz outro)))
+(defun passo_s (estado c) (if (eq estado c) estado (if (eq c outro) estado c)))
+(defun conta_s (i n estado trocas)
+  (if (gt i n) trocas
+    (conta_s (+ i 1) n (passo_s estado (classe_s i)) (if (eq (passo_s estado (classe_s i)) estado) trocas (+ trocas 1)))))
+(defun classe_i (x) (if (eq (mod x 3) 0) 1 (if (eq (mod x 5) 0) 2 3)))
+(defun passo_i (estado c) (if (eq estado c) estado (if (eq c 3) estado c)))
+(defun conta_i (i n estado trocas)
+  (if (gt i n) trocas
+    (conta_i (+ i 1) n (passo_i estado (classe_i i)) (if (eq (passo_i estado (classe_i i)) estado) trocas (+ trocas 1)))))
+'''
+
+def casos(n):
+    return [
+        ('autômato: símbolos', f'(conta_s 1 {n} outro 0)'),
+        ('autômato: inteiros', f'(conta_i 1 {n} 3 0)'),
+    ]
+
+def main(n, repeticoes):
+    comparacao.comparar(DEFINICOES, casos(n), repeticoes, largura_resultado=10)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 3)
@@ -0,0 +1,70 @@
+# =============================================================
+# BENCHMARK: CHAMADAS DE CAUDA EM ESPAÇO CONSTANTE
+# Executa laços recursivos de cauda (contagem regressiva e
+# acumulador) com profundidades crescentes e verifica que o pico
+# de memória e a pilha de chamadas da VM não crescem com n.
+# Uso: python benchmarks/bench_tailcall.py [n1 n2 ...]
+# =============================================================
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import analizador
+
+PROGRAMA = '''
+(defun contagem (n) (if (eq n 0) 0 (contagem (- n 1))))
+(defun somatorio (n acc) (if (eq n 0) acc (somatorio (- n 1) (+ acc n))))
+'''
+
+# Pico de memória tolerado além do pico da menor profundidade
+FOLGA_BYTES = 256 * 1024
+
+class VMInstrumentada(analizador.MaquinaVirtual):
+    """Registra a maior profundidade da pilha de chamadas atingida."""
+    def __init__(self, tabela_funcoes=None):
+        super().__init__(tabela_funcoes)
+        self.max_call_stack = 0
+        self._despacho[analizador.OPCODE['CALL']] = self._op_call_medido
+
+    def _op_call_medido(self, arg):
+        self._op_call(arg)
+        self.max_call_stack = max(self.max_call_stack, len(self.call_stack))
+
+def compilar(vm, fonte):
+    return vm.traduzir(analizador.analisar(analizador.tokenizar(fonte)))
+
+def medir(vm, fonte):
+    codigo = compilar(vm, fonte)
+    vm.max_call_stack = 0
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    vm.adicionar_codigo_e_executar(codigo)
+    tempo = time.perf_counter() - t0
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tempo, pico, vm.stack.pop()
+
+def main(tamanhos):
+    vm = VMInstrumentada()
+    vm.adicionar_codigo_e_executar(compilar(vm, PROGRAMA))
+
+    print(f"{'laço':>10} | {'n':>9} | {'tempo (s)':>9} | {'pico (KiB)':>10} | {'call_stack':>10}")
+    for laco, chamada, esperado in [
+        ('contagem', '(contagem {n})', lambda n: 0),
+        ('somatorio', '(somatorio {n} 0)', lambda n: n * (n + 1) // 2),
+    ]:
+        pico_base = None
+        for n in tamanhos:
+            tempo, pico, valor = medir(vm, chamada.format(n=n))
+            assert valor == esperado(n), (laco, n, valor)
+            assert vm.max_call_stack <= 1, f"{laco}: pilha de chamadas cresceu para {vm.max_call_stack}"
+            if pico_base is None: pico_base = pico
+            assert pico <= pico_base + FOLGA_BYTES, f"{laco}: memória cresceu com n ({pico} bytes)"
+            print(f"{laco:>10} | {n:>9} | {tempo:>9.3f} | {pico / 1024:>10.1f} | {vm.max_call_stack:>10}")
+    print("OK: laços de cauda executam em espaço constante.")
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
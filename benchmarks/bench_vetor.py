@@ -0,0 +1,40 @@
+# =============================================================
+# BENCHMARK: BUILTINS VETORIAIS x RECURSÃO COM CAR/CDR
+# Soma, escala e produto escalar de uma lista de n inteiros, com os
+# builtins (range/sum/mapcar/reduce, um passo nativo sobre o array)
+# e com recursão elemento a elemento sobre células cons.
+# Uso: python benchmarks/bench_vetor.py [n] [repeticoes]
+# =============================================================
+
+import sys
+
+import comparacao
+
+DEFINICOES = '''
+(defun intervalo (i n acc) (if (lt n i) acc (intervalo i (- n 1) (cons n acc))))
+(defun soma_rec (l acc) (if l (soma_rec (cdr l) (+ acc (car l))) acc))
+(defun escala_rec (l k) (if l (cons (* k (car l)) (escala_rec (cdr l) k)) nil))
+(defun escalar_rec (a b acc) (if a (escalar_rec (cdr a) (cdr b) (+ acc (* (car a) (car b)))) acc))
+(defun soma_vet (l) (sum l))
+(defun escala_vet (l k) (mapcar * l k))
+(defun escalar_vet (a b) (reduce + (* a b)))
+'''
+
+def casos(n):
+    lista = f'(intervalo 1 {n} nil)'
+    vetor = f'(range 1 {n + 1})'
+    return [
+        ('soma: car/cdr', f'(soma_rec {lista} 0)'),
+        ('soma: sum', f'(soma_vet {vetor})'),
+        ('escala: car/cdr', f'(soma_rec (escala_rec {lista} 3) 0)'),
+        ('escala: mapcar', f'(sum (escala_vet {vetor} 3))'),
+        ('escalar: car/cdr', f'(escalar_rec {lista} {lista} 0)'),
+        ('escalar: * + reduce', f'(escalar_vet {vetor} {vetor})'),
+    ]
+
+def main(n, repeticoes):
+    comparacao.comparar(DEFINICOES, casos(n), repeticoes, largura_resultado=22)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 3)
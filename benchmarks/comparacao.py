@@ -0,0 +1,49 @@
+# =============================================================
+# COMPARAÇÃO CRONOMETRADA DE VERSÕES DE UM MESMO CÁLCULO
+# Usado por bench_vetor, bench_laco e bench_simbolos: carrega as
+# definições numa VM, roda cada caso (print de uma expressão) N
+# vezes e imprime o melhor tempo relativo ao primeiro do grupo.
+# Grupo = o que vem antes de ':' no nome do caso.
+# =============================================================
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import analizador
+
+def traduzir(vm, fonte):
+    return vm.traduzir(analizador.analisar(analizador.tokenizar(fonte)))
+
+def cronometrar(vm, codigo, repeticoes):
+    """Melhor tempo de `repeticoes` execuções de `codigo` e a última palavra que ele imprimiu."""
+    melhor = None
+    for _ in range(repeticoes):
+        saida = io.StringIO()
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(saida):
+            vm.adicionar_codigo_e_executar(codigo)
+        tempo = time.perf_counter() - t0
+        melhor = tempo if melhor is None else min(melhor, tempo)
+    return melhor, saida.getvalue().split()[-1]
+
+def comparar(definicoes, casos, repeticoes, largura_resultado=16):
+    """Imprime a tabela versão | resultado | tempo | instruções | relativo de cada (nome, expressão)."""
+    vm = analizador.MaquinaVirtual()
+    vm.configurar_memo(0)   # repetições iguais não devem vir do cache
+    # Avisos da ligação (nomes livres que valem como símbolos, no stderr) não poluem a tabela
+    with contextlib.redirect_stderr(io.StringIO()):
+        vm.adicionar_codigo_e_executar(traduzir(vm, definicoes))
+    largura = max(len(nome) for nome, _ in casos)
+    print(f"{'versão':>{largura}} | {'resultado':>{largura_resultado}} | {'tempo (ms)':>10}"
+          f" | {'instruções':>11} | {'relativo':>8}")
+    referencia = {}
+    for nome, expr in casos:
+        melhor, resultado = cronometrar(vm, traduzir(vm, f'(print {expr})'), repeticoes)
+        grupo = nome.split(':')[0]
+        referencia.setdefault(grupo, melhor)
+        print(f"{nome:>{largura}} | {resultado:>{largura_resultado}} | {melhor * 1000:>10.2f}"
+              f" | {vm.consumo['instrucoes']:>11} | {melhor / referencia[grupo]:>7.2f}x")
@@ -0,0 +1,4 @@
+(print (eq (cons 1 nil) 5))
+(print (eq (cons 1 nil) nil))
+(print (eq (cons 1 (cons 2 nil)) (cons 1 nil)))
+(print (eq (cons 1 (cons 2 3)) (cons 1 (cons 2 3))))
@@ -0,0 +1,5 @@
+(defun fib (n) (if (lt n 2) n (+ (fib (- n 1)) (fib (- n 2)))))
+(print (fib 20))
+(defun fib_acc (n a b) (if (eq n 0) a (fib_acc (- n 1) b (+ a b))))
+(print (fib_acc 90 0 1))
+(print (eq (fib 15) (fib_acc 15 0 1)))
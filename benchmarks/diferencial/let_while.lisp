@@ -0,0 +1,12 @@
+(defun fatorial (n) (let ((r 1)) (let ((i 1)) (while (leq i n) (setq r (* r i)) (setq i (+ i 1))) r)))
+(print (fatorial 20))
+(defun quadrados (n) (let ((s 0)) (dotimes (i n) (setq s (+ s (* i i)))) s))
+(print (quadrados 100))
+(defun aninhado (n) (let ((t 0)) (dotimes (i n) (dotimes (j i) (setq t (+ t j)))) t))
+(print (aninhado 30))
+(defun colatz (n) (let ((passos 0)) (while (neq n 1) (setq n (if (eq (mod n 2) 0) (div n 2) (+ (* 3 n) 1))) (setq passos (+ passos 1))) passos))
+(print (colatz 27))
+(print (let ((x 5)) (let ((y (* x x))) (- y x))))
+(print (if (and (lt 1 2) (not nil)) 20 30))
+(print (or nil 7))
+(print (and 1 nil))
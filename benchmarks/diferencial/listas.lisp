@@ -0,0 +1,15 @@
+(defun intervalo (i n acc) (if (lt n i) acc (intervalo i (- n 1) (cons n acc))))
+(defun soma (l acc) (if l (soma (cdr l) (+ acc (car l))) acc))
+(defun tamanho (l) (if l (+ 1 (tamanho (cdr l))) 0))
+(defun inverte (l acc) (if l (inverte (cdr l) (cons (car l) acc)) acc))
+(defun dobra (l) (if l (cons (* 2 (car l)) (dobra (cdr l))) nil))
+(defun ultimo (l) (if (cdr l) (ultimo (cdr l)) (car l)))
+(print (intervalo 1 5 nil))
+(print (soma (intervalo 1 1000 nil) 0))
+(print (tamanho (intervalo 1 300 nil)))
+(print (inverte (intervalo 1 6 nil) nil))
+(print (soma (dobra (intervalo 1 100 nil)) 0))
+(print (ultimo (intervalo 1 50 nil)))
+(print (car (cdr (cons 1 (cons 2 (cons 3 nil))))))
+(print (cdr (cons 1 2)))
+(print (cdr nil))
@@ -0,0 +1,6 @@
+(defun f (n) (let ((i 0)) (while (lt i n) (if (eq i 2) (print i) nil) (setq i (+ i 1))) i))
+(print (+ 100 (f 5)))
+(defun g (n) (let ((i 0)) (while (lt i n) (if (eq i 2) nil (print i)) (setq i (+ i 1))) i))
+(print (+ 100 (g 4)))
+(defun h (n) (let ((s 0)) (dotimes (i n) (print i) (setq s (+ s i))) s))
+(print (h 3))
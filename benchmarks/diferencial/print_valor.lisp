@@ -0,0 +1,6 @@
+(defun f (x) (print x))
+(print (f 3))
+(print (cons (print 1) (print 2)))
+(defun g (x) (if (gt x 0) (print x) x))
+(print (g 5))
+(print (g 0))
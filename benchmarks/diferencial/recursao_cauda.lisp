@@ -0,0 +1,10 @@
+(defun contagem (n) (if (eq n 0) 0 (contagem (- n 1))))
+(print (contagem 100000))
+(defun somatorio (n acc) (if (eq n 0) acc (somatorio (- n 1) (+ acc n))))
+(print (somatorio 100000 0))
+(defun par (n) (if (eq n 0) 1 (impar (- n 1))))
+(defun impar (n) (if (eq n 0) nil (par (- n 1))))
+(print (par 5000))
+(print (impar 5000))
+(defun profunda (n) (if (eq n 0) 0 (+ 1 (profunda (- n 1)))))
+(print (profunda 5000))
@@ -0,0 +1,13 @@
+(defun classe (x) (if (eq (mod x 15) 0) fizzbuzz (if (eq (mod x 3) 0) fizz (if (eq (mod x 5) 0) buzz x))))
+(print (classe 9))
+(print (classe 10))
+(print (classe 30))
+(print (classe 7))
+(print (eq fizz fizz))
+(print (eq fizz buzz))
+(print (neq fizz buzz))
+(print (cons a (cons b nil)))
+(defun conta (l s acc) (if l (conta (cdr l) s (if (eq (car l) s) (+ acc 1) acc)) acc))
+(print (conta (cons a (cons b (cons a (cons c nil)))) a 0))
+(defun estado (n e) (if (eq n 0) e (estado (- n 1) (if (eq e ligado) desligado ligado))))
+(print (estado 7 ligado))
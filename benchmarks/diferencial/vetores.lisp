@@ -0,0 +1,13 @@
+(print (range 5))
+(print (range 2 7))
+(print (sum (range 1 101)))
+(print (length (range 10 20)))
+(print (mapcar * (range 1 6) 3))
+(print (reduce + (range 1 11)))
+(print (reduce + (* (range 1 11) (range 1 11))))
+(print (sum (+ (range 4) 10)))
+(print (vetor (cons 1 (cons 2 (cons 3 nil)))))
+(defun media (v) (div (sum v) (length v)))
+(print (media (range 1 100)))
+(defun acumula (n) (let ((w (range 3))) (dotimes (i n) (setq w (+ w 1))) (sum w)))
+(print (acumula 10))
@@ -0,0 +1,7 @@
+(defun f (n) (let ((i 0)) (while (lt (setq i (+ i 1)) n) nil) i))
+(print (f 10))
+(defun g (n) (let ((i 0)) (let ((s 0)) (while (lt (setq i (+ i 1)) n) (setq s (+ s i))) s)))
+(print (g 10))
+(defun h (n) (let ((i 0)) (while (lt (let ((j (+ i 1))) (setq i j)) n) nil) i))
+(print (h 4))
+(print (while nil 1))
@@ -0,0 +1,225 @@
+# =============================================================
+# SUÍTE DE BENCHMARKS: LEXER -> PARSER -> GERAÇÃO -> VM
+# Mede cada etapa do pipeline separadamente em um conjunto de
+# programas LISP, registra instruções/s e pico de memória, grava
+# os resultados em JSON e compara com uma execução de referência.
+# Uso: python benchmarks/suite.py [--saida r.json] [--base base.json]
+#      [--limite 0.10] [--repeticoes 3] [--rapido] [programa ...]
+# Sai com código 1 se alguma métrica regredir além do limite.
+# =============================================================
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import analizador
+
+ETAPAS = ('lexer', 'parser', 'geracao', 'carga', 'vm')
+
+# Métricas comparadas com a referência: quanto maior, pior
+METRICAS = ('total_s', 'vm_s', 'pico_memoria_bytes')
+
+def fonte_fib(n):
+    return f'''
+(defun fib (n) (if (lt n 2) n (+ (fib (- n 1)) (fib (- n 2)))))
+(print (fib {n}))
+'''
+
+def fonte_ackermann(n):
+    return f'''
+(defun ack (m n)
+  (if (eq m 0) (+ n 1)
+    (if (eq n 0) (ack (- m 1) 1)
+      (ack (- m 1) (ack m (- n 1))))))
+(print (ack 2 {n}))
+'''
+
+def fonte_listas(n):
+    # construir com cons, percorrer com car/cdr (soma) e contar sem recursão de cauda
+    return f'''
+(defun construir (n acc) (if (eq n 0) acc (construir (- n 1) (cons n acc))))
+(defun somar (l acc) (if l (somar (cdr l) (+ acc (car l))) acc))
+(defun tamanho (l) (if l (+ 1 (tamanho (cdr l))) 0))
+(print (somar (construir {n} nil) 0))
+(print (tamanho (construir {n} nil)))
+'''
+
+def fonte_recursao_profunda(n):
+    return f'''
+(defun desce (n) (if (eq n 0) 0 (+ 1 (desce (- n 1)))))
+(print (desce {n}))
+'''
+
+def fonte_ramificacao(n):
+    # Collatz: muitos if/comparações por iteração
+    return f'''
+(defun passos (x c) (if (leq x 1) c (if (eq (mod x 2) 0) (passos (/ x 2) (+ c 1)) (passos (+ (* 3 x) 1) (+ c 1)))))
+(defun total (i acc) (if (gt i {n}) acc (total (+ i 1) (+ acc (passos i 0)))))
+(print (total 1 0))
+'''
+
+def fonte_laco(n):
+    # let + dotimes/while: laços aninhados sem chamadas (STORE_LOCAL e salto para trás)
+    return f'''
+(defun tabela (n) (let ((t 0)) (dotimes (i n) (dotimes (j n) (setq t (+ t (* i j))))) t))
+(defun soma (n) (let ((acc 0) (i 1)) (while (leq i n) (setq acc (+ acc i)) (setq i (+ i 1))) acc))
+(print (tabela {n}))
+(print (soma (* {n} {n})))
+'''
+
+def fonte_mutua(n):
+    # Recursão mútua e chamadas a funções definidas mais adiante no fonte (ligadas antes de executar)
+    return f'''
+(defun conta (i acc) (if (eq i 0) acc (conta (- i 1) (+ acc (par (mod i 40))))))
+(defun par (n) (if (eq n 0) 1 (impar (- n 1))))
+(defun impar (n) (if (eq n 0) 0 (par (- n 1))))
+(print (conta {n} 0))
+'''
+
+def fonte_gerada(n):
+    # Fonte grande: n funções pequenas e uma chamada a cada uma
+    defs = [f'(defun f{i} (a b) (if (gt a b) (- a (* b {i % 7})) (+ b (/ a {i % 5 + 1}))))' for i in range(n)]
+    usos = [f'(f{i} {i} {n - i})' for i in range(n)]
+    return '\n'.join(defs + usos) + '\n'
+
+# nome -> (gerador de fonte, tamanho normal, tamanho no modo --rapido)
+PROGRAMAS = {
+    'fib':              (fonte_fib, 22, 15),
+    'ackermann':        (fonte_ackermann, 150, 40),
+    'listas_cons':      (fonte_listas, 50_000, 2_000),
+    'recursao_profunda': (fonte_recursao_profunda, 100_000, 5_000),
+    'ramificacao':      (fonte_ramificacao, 3_000, 200),
+    'laco':             (fonte_laco, 300, 40),
+    'mutua':            (fonte_mutua, 20_000, 1_000),
+    'fonte_gerada':     (fonte_gerada, 3_000, 200),
+}
+
+def executar_pipeline(fonte, perfilar=False):
+    """Roda o pipeline completo; devolve (tempos por etapa, saída impressa, VM)."""
+    tempos = {}
+    # Cada execução tem seu próprio Compilador (estado de compilação isolado)
+    comp = analizador.Compilador()
+    with contextlib.redirect_stdout(io.StringIO()) as saida:
+        t0 = time.perf_counter()
+        tokens = analizador.tokenizar(fonte)
+        t1 = time.perf_counter()
+        ast = analizador.analisar(tokens)
+        t2 = time.perf_counter()
+        codigo, _ = analizador.compilar(ast, comp)
+        t3 = time.perf_counter()
+        vm = analizador.MaquinaVirtual(comp.funcoes)
+        vm.configurar_memo(0)   # fib/ackermann/mutua mediriam acertos no cache, não a VM
+        if perfilar: vm.perfilar()
+        vm.carregar(codigo)
+        t4 = time.perf_counter()
+        vm.ip = 0
+        vm.run()
+        t5 = time.perf_counter()
+    tempos.update(lexer=t1 - t0, parser=t2 - t1, geracao=t3 - t2, carga=t4 - t3, vm=t5 - t4)
+    return tempos, saida.getvalue(), vm
+
+def medir(nome, fonte, repeticoes):
+    # Tempos: melhor de N execuções sem instrumentação
+    melhores = {}
+    saida = None
+    for _ in range(repeticoes):
+        tempos, saida_exec, _ = executar_pipeline(fonte)
+        assert saida is None or saida_exec == saida, f"{nome}: saída mudou entre execuções"
+        saida = saida_exec
+        for etapa, t in tempos.items():
+            melhores[etapa] = min(t, melhores.get(etapa, t))
+    assert 'Erro' not in saida, f"{nome}: {saida.strip()}"
+
+    # Instruções executadas: uma execução com o perfilador ligado
+    _, _, vm = executar_pipeline(fonte, perfilar=True)
+    instrucoes = vm.perfilador.instrucoes
+    especializacao = vm.estatisticas_especializacao()
+
+    # Pico de memória: uma execução sob tracemalloc
+    tracemalloc.start()
+    executar_pipeline(fonte)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'bytes_fonte': len(fonte),
+        'saida': saida.strip(),
+        'etapas_s': melhores,
+        'total_s': sum(melhores.values()),
+        'vm_s': melhores['vm'],
+        'instrucoes': instrucoes,
+        'instrucoes_por_s': instrucoes / melhores['vm'] if melhores['vm'] else 0.0,
+        'pico_memoria_bytes': pico,
+        'especializacoes': sum(especializacao['especializacoes'].values()),
+        'desotimizacoes': sum(especializacao['desotimizacoes'].values()),
+    }
+
+def comparar(resultados, base, limite):
+    """Lista de regressões: (programa, métrica, valor de base, valor atual, variação)."""
+    regressoes = []
+    for nome, atual in resultados.items():
+        anterior = base.get('programas', {}).get(nome)
+        if not anterior: continue
+        if anterior.get('bytes_fonte') != atual['bytes_fonte']:
+            print(f"Aviso: '{nome}' mudou de tamanho em relação à referência; não comparado.")
+            continue
+        for metrica in METRICAS:
+            antes, depois = anterior.get(metrica), atual[metrica]
+            if not antes: continue
+            variacao = depois / antes - 1
+            if variacao > limite: regressoes.append((nome, metrica, antes, depois, variacao))
+    return regressoes
+
+def main():
+    argp = argparse.ArgumentParser(description='Suíte de benchmarks do analizador.')
+    argp.add_argument('programas', nargs='*', help=f"subconjunto de: {', '.join(PROGRAMAS)}")
+    argp.add_argument('--saida', help='grava os resultados neste arquivo JSON')
+    argp.add_argument('--base', help='JSON de referência para detectar regressões')
+    argp.add_argument('--limite', type=float, default=0.10, help='piora tolerada (padrão 0.10 = 10%%)')
+    argp.add_argument('--repeticoes', type=int, default=3)
+    argp.add_argument('--rapido', action='store_true', help='tamanhos reduzidos (verificação rápida)')
+    opcoes = argp.parse_args()
+
+    nomes = opcoes.programas or list(PROGRAMAS)
+    desconhecidos = [n for n in nomes if n not in PROGRAMAS]
+    if desconhecidos: argp.error(f"programa(s) desconhecido(s): {', '.join(desconhecidos)}")
+
+    resultados = {}
+    print(f"{'programa':>18} | " + ' | '.join(f'{e + " (ms)":>12}' for e in ETAPAS)
+          + f" | {'instr/s':>10} | {'pico (KiB)':>10}")
+    for nome in nomes:
+        gerar, tamanho, tamanho_rapido = PROGRAMAS[nome]
+        r = medir(nome, gerar(tamanho_rapido if opcoes.rapido else tamanho), opcoes.repeticoes)
+        resultados[nome] = r
+        print(f"{nome:>18} | " + ' | '.join(f"{r['etapas_s'][e] * 1000:>12.2f}" for e in ETAPAS)
+              + f" | {r['instrucoes_por_s']:>10.0f} | {r['pico_memoria_bytes'] / 1024:>10.0f}")
+
+    relatorio = {
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'nivel_otimizacao': analizador.NIVEL_OTIMIZACAO,
+        'rapido': opcoes.rapido,
+        'repeticoes': opcoes.repeticoes,
+        'programas': resultados,
+    }
+    if opcoes.saida:
+        with open(opcoes.saida, 'w', encoding='utf-8') as f: json.dump(relatorio, f, indent=2)
+        print(f"--> Resultados salvos em '{opcoes.saida}'")
+
+    if opcoes.base:
+        with open(opcoes.base, encoding='utf-8') as f: base = json.load(f)
+        regressoes = comparar(resultados, base, opcoes.limite)
+        for nome, metrica, antes, depois, variacao in regressoes:
+            print(f"REGRESSÃO {nome}.{metrica}: {antes:.6g} -> {depois:.6g} (+{variacao:.1%})")
+        if regressoes: sys.exit(1)
+        print(f"--> Nenhuma regressão acima de {opcoes.limite:.0%} em relação a '{opcoes.base}'")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# =============================================================
+# VERIFICAÇÃO DIFERENCIAL: VM x MOTOR NATIVO
+# Roda cada programa de benchmarks/diferencial/ e os programas da
+# suíte (tamanhos do modo --rapido) nos dois motores e compara as
+# saídas. Também confere que o motor nativo devolve o limite de
+# recursão do processo ao terminar.
+# Uso: python benchmarks/verificar_diferencial.py [arquivo|dir ...]
+# Sai com código 1 se algum programa divergir.
+# =============================================================
+
+import contextlib
+import io
+import os
+import sys
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(DIR, '..'))
+import analizador
+import suite
+
+def programas(alvos):
+    """(nome, fonte) dos arquivos/diretórios pedidos, ou do corpus + suíte."""
+    if not alvos:
+        alvos = [os.path.join(DIR, 'diferencial')]
+        for nome, (gerar, _, tamanho_rapido) in suite.PROGRAMAS.items():
+            yield f'suite:{nome}', gerar(tamanho_rapido)
+    for alvo in alvos:
+        for arquivo in analizador.listar_lote(alvo) if os.path.isdir(alvo) else [alvo]:
+            with open(arquivo, 'r', encoding='utf-8') as f: yield arquivo, f.read()
+
+def main(alvos):
+    falhas = 0
+    limite = sys.getrecursionlimit()
+    for nome, fonte in programas(alvos):
+        # Avisos da ligação (símbolos livres) vão para o stderr de cada motor; não interessam aqui
+        with contextlib.redirect_stderr(io.StringIO()):
+            iguais, saida_vm, saida_nativo = analizador.comparar_motores(fonte)
+        print(f"{'OK   ' if iguais else 'FALHA'} {nome}")
+        if not iguais:
+            falhas += 1
+            print(f"--- vm ---\n{saida_vm}--- nativo ---\n{saida_nativo}")
+    if sys.getrecursionlimit() != limite:
+        falhas += 1
+        print(f"FALHA limite de recursão alterado: {limite} -> {sys.getrecursionlimit()}")
+    print(f"{falhas} falha(s)")
+    return 1 if falhas else 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
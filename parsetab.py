@@ -6,9 +6,9 @@ _tabversion = '3.10'
 
 _lr_method = 'LALR'
 
-_lr_signature = 'programaAND CAR CDR COND CONS DEFUN DIFERENTE DIVISAO DIVISAOINT IDENTIFICADOR IF IGUAL MAIOR MAIORIGUAL MAIS MENOR MENORIGUAL MENOS MULTIPLICACAO NIL NOT NUMERO OR PARENTESE_DIR PARENTESE_ESQ PRINT RESTOprograma : programa expressao\n                | expressaoexpressao : atomo\n                 | definicao_funcao\n                 | expressao_if\n                 | expressao_aritmetica\n                 | expressao_comparacao\n                 | expressao_logica\n                 | expressao_lista\n                 | expressao_io\n                 | lista_genericaatomo : NUMERO\n             | IDENTIFICADOR\n             | NILexpressao_aritmetica : PARENTESE_ESQ op_aritmetico lista_de_expressoes PARENTESE_DIRop_aritmetico : MAIS\n                     | MENOS\n                     | MULTIPLICACAO\n                     | DIVISAOINT\n                     | DIVISAO\n                     | RESTOexpressao_comparacao : PARENTESE_ESQ op_comparacao expressao expressao PARENTESE_DIRop_comparacao : IGUAL\n                     | DIFERENTE\n                     | MAIOR\n                     | MENOR\n                     | MAIORIGUAL\n                     | MENORIGUALexpressao_logica : PARENTESE_ESQ NOT expressao PARENTESE_DIR\n                        | PARENTESE_ESQ AND expressao expressao PARENTESE_DIR\n                        | PARENTESE_ESQ OR expressao expressao PARENTESE_DIRexpressao_lista : PARENTESE_ESQ CAR expressao PARENTESE_DIR\n                       | PARENTESE_ESQ CDR expressao PARENTESE_DIR\n                       | PARENTESE_ESQ CONS expressao expressao PARENTESE_DIRexpressao_io : PARENTESE_ESQ PRINT expressao PARENTESE_DIRdefinicao_funcao : PARENTESE_ESQ DEFUN IDENTIFICADOR lista_parametros expressao PARENTESE_DIRlista_parametros : PARENTESE_ESQ lista_de_expressoes PARENTESE_DIRexpressao_if : PARENTESE_ESQ IF expressao expressao expressao PARENTESE_DIRlista_generica : PARENTESE_ESQ lista_de_expressoes PARENTESE_DIRlista_de_expressoes : expressao lista_de_expressoes\n                           | '
+_lr_signature = 'programaAND CAR CDR COND CONS DEFUN DIFERENTE DIVISAO DIVISAOINT DOTIMES IDENTIFICADOR IF IGUAL LET MAIOR MAIORIGUAL MAIS MAPCAR MENOR MENORIGUAL MENOS MULTIPLICACAO NIL NOT NUMERO OR PARENTESE_DIR PARENTESE_ESQ PRINT REDUCE RESTO SETQ WHILEprograma : programa expressao\n                | expressaoexpressao : atomo\n                 | definicao_funcao\n                 | expressao_if\n                 | expressao_aritmetica\n                 | expressao_comparacao\n                 | expressao_logica\n                 | expressao_lista\n                 | expressao_io\n                 | expressao_let\n                 | expressao_setq\n                 | expressao_laco\n                 | expressao_vetorial\n                 | lista_genericaatomo : NUMERO\n             | IDENTIFICADOR\n             | NILexpressao_aritmetica : PARENTESE_ESQ op_aritmetico lista_de_expressoes PARENTESE_DIRop_aritmetico : MAIS\n                     | MENOS\n                     | MULTIPLICACAO\n                     | DIVISAOINT\n                     | DIVISAO\n                     | RESTOexpressao_comparacao : PARENTESE_ESQ op_comparacao expressao expressao PARENTESE_DIRop_comparacao : IGUAL\n                     | DIFERENTE\n                     | MAIOR\n                     | MENOR\n                     | MAIORIGUAL\n                     | MENORIGUALexpressao_logica : PARENTESE_ESQ NOT expressao PARENTESE_DIR\n                        | PARENTESE_ESQ AND expressao expressao PARENTESE_DIR\n                        | PARENTESE_ESQ OR expressao expressao PARENTESE_DIRexpressao_lista : PARENTESE_ESQ CAR expressao PARENTESE_DIR\n                       | PARENTESE_ESQ CDR expressao PARENTESE_DIR\n                       | PARENTESE_ESQ CONS expressao expressao PARENTESE_DIRexpressao_io : PARENTESE_ESQ PRINT expressao PARENTESE_DIRdefinicao_funcao : PARENTESE_ESQ DEFUN IDENTIFICADOR lista_parametros expressao PARENTESE_DIRlista_parametros : PARENTESE_ESQ lista_de_expressoes PARENTESE_DIRexpressao_if : PARENTESE_ESQ IF expressao expressao expressao PARENTESE_DIRexpressao_let : PARENTESE_ESQ LET PARENTESE_ESQ lista_de_ligacoes PARENTESE_DIR lista_de_expressoes PARENTESE_DIRlista_de_ligacoes : PARENTESE_ESQ IDENTIFICADOR expressao PARENTESE_DIR lista_de_ligacoes\n                         | expressao_setq : PARENTESE_ESQ SETQ IDENTIFICADOR expressao PARENTESE_DIRexpressao_laco : PARENTESE_ESQ WHILE expressao lista_de_expressoes PARENTESE_DIR\n                      | PARENTESE_ESQ DOTIMES PARENTESE_ESQ IDENTIFICADOR expressao PARENTESE_DIR lista_de_expressoes PARENTESE_DIRexpressao_vetorial : PARENTESE_ESQ MAPCAR op_aritmetico expressao expressao PARENTESE_DIR\n                          | PARENTESE_ESQ REDUCE op_aritmetico expressao PARENTESE_DIRlista_generica : PARENTESE_ESQ lista_de_expressoes PARENTESE_DIRlista_de_expressoes : expressao lista_de_expressoes\n                           | '
     
-_lr_action_items = {'NUMERO':([0,1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,18,19,20,22,23,24,25,26,27,28,29,30,31,32,33,34,35,36,37,38,39,40,41,44,46,47,49,50,53,55,56,57,58,60,63,64,66,70,71,72,73,74,75,76,],[12,12,-2,-3,-4,-5,-6,-7,-8,-9,-10,-11,-12,-13,-14,12,-1,12,12,12,12,12,12,12,12,12,12,12,-16,-17,-18,-19,-20,-21,-23,-24,-25,-26,-27,-28,12,-39,12,12,12,12,12,12,12,-15,-29,-32,-33,-35,-22,-30,-31,-34,-37,-36,-38,]),'IDENTIFICADOR':([0,1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,22,23,24,25,26,27,28,29,30,31,32,33,34,35,36,37,38,39,40,41,44,46,47,49,50,53,55,56,57,58,60,63,64,66,70,71,72,73,74,75,76,],[13,13,-2,-3,-4,-5,-6,-7,-8,-9,-10,-11,-12,-13,-14,13,-1,42,13,13,13,13,13,13,13,13,13,13,13,-16,-17,-18,-19,-20,-21,-23,-24,-25,-26,-27,-28,13,-39,13,13,13,13,13,13,13,-15,-29,-32,-33,-35,-22,-30,-31,-34,-37,-36,-38,]),'NIL':([0,1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,18,19,20,22,23,24,25,26,27,28,29,30,31,32,33,34,35,36,37,38,39,40,41,44,46,47,49,50,53,55,56,57,58,60,63,64,66,70,71,72,73,74,75,76,],[14,14,-2,-3,-4,-5,-6,-7,-8,-9,-10,-11,-12,-13,-14,14,-1,14,14,14,14,14,14,14,14,14,14,14,-16,-17,-18,-19,-20,-21,-23,-24,-25,-26,-27,-28,14,-39,14,14,14,14,14,14,14,-15,-29,-32,-33,-35,-22,-30,-31,-34,-37,-36,-38,]),'PARENTESE_ESQ':([0,1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,18,19,20,22,23,24,25,26,27,28,29,30,31,32,33,34,35,36,37,38,39,40,41,42,44,46,47,49,50,53,55,56,57,58,60,63,64,66,70,71,72,73,74,75,76,],[15,15,-2,-3,-4,-5,-6,-7,-8,-9,-10,-11,-12,-13,-14,15,-1,15,15,15,15,15,15,15,15,15,15,15,-16,-17,-18,-19,-20,-21,-23,-24,-25,-26,-27,-28,55,15,-39,15,15,15,15,15,15,15,-15,-29,-32,-33,-35,-22,-30,-31,-34,-37,-36,-38,]),'$end':([1,2,3,4,5,6,7,8,9,10,11,12,13,14,16,46,58,60,63,64,66,70,71,72,73,75,76,],[0,-2,-3,-4,-5,-6,-7,-8,-9,-10,-11,-12,-13,-14,-1,-39,-15,-29,-32,-33,-35,-22,-30,-31,-34,-36,-38,]),'PARENTESE_DIR':([3,4,5,6,7,8,9,10,11,12,13,14,15,18,20,21,30,31,32,33,34,35,43,45,46,48,51,52,54,55,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,75,76,],[-3,-4,-5,-6,-7,-8,-9,-10,-11,-12,-13,-14,-41,-41,-41,46,-16,-17,-18,-19,-20,-21,-40,58,-39,60,63,64,66,-41,-15,70,-29,71,72,-32,-33,73,-35,74,75,76,-22,-30,-31,-34,-36,-38,]),'DEFUN':([15,],[17,]),'IF':([15,],[19,]),'NOT':([15,],[23,]),'AND':([15,],[24,]),'OR':([15,],[25,]),'CAR':([15,],[26,]),'CDR':([15,],[27,]),'CONS':([15,],[28,]),'PRINT':([15,],[29,]),'MAIS':([15,],[30,]),'MENOS':([15,],[31,]),'MULTIPLICACAO':([15,],[32,]),'DIVISAOINT':([15,],[33,]),'DIVISAO':([15,],[34,]),'RESTO':([15,],[35,]),'IGUAL':([15,],[36,]),'DIFERENTE':([15,],[37,]),'MAIOR':([15,],[38,]),'MENOR':([15,],[39,]),'MAIORIGUAL':([15,],[40,]),'MENORIGUAL':([15,],[41,]),}
+_lr_action_items = {'NUMERO':([0,1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,22,23,24,26,27,28,29,30,31,32,33,36,40,41,42,43,44,45,46,47,48,49,50,51,54,56,57,59,60,63,66,67,69,70,71,72,73,74,76,79,80,82,87,88,93,94,95,96,97,98,99,100,103,104,105,106,109,110,112,115,],[16,16,-2,-3,-4,-5,-6,-7,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,16,-1,16,16,16,16,16,16,16,16,16,16,16,16,-20,-21,-22,-23,-24,-25,-27,-28,-29,-30,-31,-32,16,-51,16,16,16,16,16,16,16,16,16,16,16,-19,-33,-36,-37,-39,16,16,-26,-34,-35,-38,16,16,-46,-47,-50,-41,-40,-42,16,-49,-43,-48,]),'IDENTIFICADOR':([0,1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,26,27,28,29,30,31,32,33,35,36,40,41,42,43,44,45,46,47,48,49,50,51,54,56,57,59,60,63,66,67,68,69,70,71,72,73,74,76,79,80,82,83,87,88,93,94,95,96,97,98,99,100,103,104,105,106,109,110,112,115,],[17,17,-2,-3,-4,-5,-6,-7,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,17,-1,52,17,17,17,17,17,17,17,17,17,17,17,66,17,-20,-21,-22,-23,-24,-25,-27,-28,-29,-30,-31,-32,17,-51,17,17,17,17,17,17,87,17,17,17,17,17,-19,-33,-36,-37,-39,97,17,17,-26,-34,-35,-38,17,17,-46,-47,-50,-41,-40,-42,17,-49,-43,-48,]),'NIL':([0,1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,22,23,24,26,27,28,29,30,31,32,33,36,40,41,42,43,44,45,46,47,48,49,50,51,54,56,57,59,60,63,66,67,69,70,71,72,73,74,76,79,80,82,87,88,93,94,95,96,97,98,99,100,103,104,105,106,109,110,112,115,],[18,18,-2,-3,-4,-5,-6,-7,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,18,-1,18,18,18,18,18,18,18,18,18,18,18,18,-20,-21,-22,-23,-24,-25,-27,-28,-29,-30,-31,-32,18,-51,18,18,18,18,18,18,18,18,18,18,18,-19,-33,-36,-37,-39,18,18,-26,-34,-35,-38,18,18,-46,-47,-50,-41,-40,-42,18,-49,-43,-48,]),'PARENTESE_ESQ':([0,1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,22,23,24,26,27,28,29,30,31,32,33,34,36,37,40,41,42,43,44,45,46,47,48,49,50,51,52,54,56,57,59,60,63,65,66,67,69,70,71,72,73,74,76,79,80,82,87,88,93,94,95,96,97,98,99,100,103,104,105,106,109,110,111,112,115,],[19,19,-2,-3,-4,-5,-6,-7,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,19,-1,19,19,19,19,19,19,19,19,19,19,19,65,19,68,-20,-21,-22,-23,-24,-25,-27,-28,-29,-30,-31,-32,71,19,-51,19,19,19,19,83,19,19,19,19,19,19,19,-19,-33,-36,-37,-39,19,19,-26,-34,-35,-38,19,19,-46,-47,-50,-41,-40,-42,19,-49,83,-43,-48,]),'$end':([1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,20,56,74,76,79,80,82,93,94,95,96,99,100,103,105,106,110,112,115,],[0,-2,-3,-4,-5,-6,-7,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,-1,-51,-19,-33,-36,-37,-39,-26,-34,-35,-38,-46,-47,-50,-40,-42,-49,-43,-48,]),'PARENTESE_DIR':([3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,22,24,25,40,41,42,43,44,45,53,55,56,58,61,62,64,65,67,71,74,75,76,77,78,79,80,81,82,84,85,86,89,90,91,92,93,94,95,96,98,99,100,101,102,103,105,106,107,108,109,110,111,112,113,114,115,],[-3,-4,-5,-6,-7,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,-53,-53,-53,56,-20,-21,-22,-23,-24,-25,-52,74,-51,76,79,80,82,-45,-53,-53,-19,93,-33,94,95,-36,-37,96,-39,98,99,100,103,104,105,106,-26,-34,-35,-38,-53,-46,-47,109,110,-50,-40,-42,111,112,-53,-49,-45,-43,115,-44,-48,]),'DEFUN':([19,],[21,]),'IF':([19,],[23,]),'NOT':([19,],[27,]),'AND':([19,],[28,]),'OR':([19,],[29,]),'CAR':([19,],[30,]),'CDR':([19,],[31,]),'CONS':([19,],[32,]),'PRINT':([19,],[33,]),'LET':([19,],[34,]),'SETQ':([19,],[35,]),'WHILE':([19,],[36,]),'DOTIMES':([19,],[37,]),'MAPCAR':([19,],[38,]),'REDUCE':([19,],[39,]),'MAIS':([19,38,39,],[40,40,40,]),'MENOS':([19,38,39,],[41,41,41,]),'MULTIPLICACAO':([19,38,39,],[42,42,42,]),'DIVISAOINT':([19,38,39,],[43,43,43,]),'DIVISAO':([19,38,39,],[44,44,44,]),'RESTO':([19,38,39,],[45,45,45,]),'IGUAL':([19,],[46,]),'DIFERENTE':([19,],[47,]),'MAIOR':([19,],[48,]),'MENOR':([19,],[49,]),'MAIORIGUAL':([19,],[50,]),'MENORIGUAL':([19,],[51,]),}
 
 _lr_action = {}
 for _k, _v in _lr_action_items.items():
@@ -17,7 +17,7 @@ for _k, _v in _lr_action_items.items():
       _lr_action[_x][_k] = _y
 del _lr_action_items
 
-_lr_goto_items = {'programa':([0,],[1,]),'expressao':([0,1,15,18,19,20,22,23,24,25,26,27,28,29,44,47,49,50,53,55,56,57,],[2,16,18,18,44,18,47,48,49,50,51,52,53,54,57,59,61,62,65,18,68,69,]),'atomo':([0,1,15,18,19,20,22,23,24,25,26,27,28,29,44,47,49,50,53,55,56,57,],[3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,]),'definicao_funcao':([0,1,15,18,19,20,22,23,24,25,26,27,28,29,44,47,49,50,53,55,56,57,],[4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,]),'expressao_if':([0,1,15,18,19,20,22,23,24,25,26,27,28,29,44,47,49,50,53,55,56,57,],[5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,]),'expressao_aritmetica':([0,1,15,18,19,20,22,23,24,25,26,27,28,29,44,47,49,50,53,55,56,57,],[6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,]),'expressao_comparacao':([0,1,15,18,19,20,22,23,24,25,26,27,28,29,44,47,49,50,53,55,56,57,],[7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,]),'expressao_logica':([0,1,15,18,19,20,22,23,24,25,26,27,28,29,44,47,49,50,53,55,56,57,],[8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,]),'expressao_lista':([0,1,15,18,19,20,22,23,24,25,26,27,28,29,44,47,49,50,53,55,56,57,],[9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,]),'expressao_io':([0,1,15,18,19,20,22,23,24,25,26,27,28,29,44,47,49,50,53,55,56,57,],[10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,]),'lista_generica':([0,1,15,18,19,20,22,23,24,25,26,27,28,29,44,47,49,50,53,55,56,57,],[11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,]),'op_aritmetico':([15,],[20,]),'lista_de_expressoes':([15,18,20,55,],[21,43,45,67,]),'op_comparacao':([15,],[22,]),'lista_parametros':([42,],[56,]),}
+_lr_goto_items = {'programa':([0,],[1,]),'expressao':([0,1,19,22,23,24,26,27,28,29,30,31,32,33,36,54,57,59,60,63,66,67,69,70,71,72,73,87,88,97,98,109,],[2,20,22,22,54,22,57,58,59,60,61,62,63,64,67,73,75,77,78,81,85,22,88,89,22,91,92,101,102,107,22,22,]),'atomo':([0,1,19,22,23,24,26,27,28,29,30,31,32,33,36,54,57,59,60,63,66,67,69,70,71,72,73,87,88,97,98,109,],[3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,]),'definicao_funcao':([0,1,19,22,23,24,26,27,28,29,30,31,32,33,36,54,57,59,60,63,66,67,69,70,71,72,73,87,88,97,98,109,],[4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,]),'expressao_if':([0,1,19,22,23,24,26,27,28,29,30,31,32,33,36,54,57,59,60,63,66,67,69,70,71,72,73,87,88,97,98,109,],[5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,]),'expressao_aritmetica':([0,1,19,22,23,24,26,27,28,29,30,31,32,33,36,54,57,59,60,63,66,67,69,70,71,72,73,87,88,97,98,109,],[6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,]),'expressao_comparacao':([0,1,19,22,23,24,26,27,28,29,30,31,32,33,36,54,57,59,60,63,66,67,69,70,71,72,73,87,88,97,98,109,],[7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,]),'expressao_logica':([0,1,19,22,23,24,26,27,28,29,30,31,32,33,36,54,57,59,60,63,66,67,69,70,71,72,73,87,88,97,98,109,],[8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,]),'expressao_lista':([0,1,19,22,23,24,26,27,28,29,30,31,32,33,36,54,57,59,60,63,66,67,69,70,71,72,73,87,88,97,98,109,],[9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,]),'expressao_io':([0,1,19,22,23,24,26,27,28,29,30,31,32,33,36,54,57,59,60,63,66,67,69,70,71,72,73,87,88,97,98,109,],[10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,]),'expressao_let':([0,1,19,22,23,24,26,27,28,29,30,31,32,33,36,54,57,59,60,63,66,67,69,70,71,72,73,87,88,97,98,109,],[11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,]),'expressao_setq':([0,1,19,22,23,24,26,27,28,29,30,31,32,33,36,54,57,59,60,63,66,67,69,70,71,72,73,87,88,97,98,109,],[12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,]),'expressao_laco':([0,1,19,22,23,24,26,27,28,29,30,31,32,33,36,54,57,59,60,63,66,67,69,70,71,72,73,87,88,97,98,109,],[13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,]),'expressao_vetorial':([0,1,19,22,23,24,26,27,28,29,30,31,32,33,36,54,57,59,60,63,66,67,69,70,71,72,73,87,88,97,98,109,],[14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,]),'lista_generica':([0,1,19,22,23,24,26,27,28,29,30,31,32,33,36,54,57,59,60,63,66,67,69,70,71,72,73,87,88,97,98,109,],[15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,]),'op_aritmetico':([19,38,39,],[24,69,70,]),'lista_de_expressoes':([19,22,24,67,71,98,109,],[25,53,55,86,90,108,113,]),'op_comparacao':([19,],[26,]),'lista_parametros':([52,],[72,]),'lista_de_ligacoes':([65,111,],[84,114,]),}
 
 _lr_goto = {}
 for _k, _v in _lr_goto_items.items():
@@ -27,45 +27,57 @@ for _k, _v in _lr_goto_items.items():
 del _lr_goto_items
 _lr_productions = [
   ("S' -> programa","S'",1,None,None,None),
-  ('programa -> programa expressao','programa',2,'p_programa','analizador.py',80),
-  ('programa -> expressao','programa',1,'p_programa','analizador.py',81),
-  ('expressao -> atomo','expressao',1,'p_expressao','analizador.py',88),
-  ('expressao -> definicao_funcao','expressao',1,'p_expressao','analizador.py',89),
-  ('expressao -> expressao_if','expressao',1,'p_expressao','analizador.py',90),
-  ('expressao -> expressao_aritmetica','expressao',1,'p_expressao','analizador.py',91),
-  ('expressao -> expressao_comparacao','expressao',1,'p_expressao','analizador.py',92),
-  ('expressao -> expressao_logica','expressao',1,'p_expressao','analizador.py',93),
-  ('expressao -> expressao_lista','expressao',1,'p_expressao','analizador.py',94),
-  ('expressao -> expressao_io','expressao',1,'p_expressao','analizador.py',95),
-  ('expressao -> lista_generica','expressao',1,'p_expressao','analizador.py',96),
-  ('atomo -> NUMERO','atomo',1,'p_atomo','analizador.py',100),
-  ('atomo -> IDENTIFICADOR','atomo',1,'p_atomo','analizador.py',101),
-  ('atomo -> NIL','atomo',1,'p_atomo','analizador.py',102),
-  ('expressao_aritmetica -> PARENTESE_ESQ op_aritmetico lista_de_expressoes PARENTESE_DIR','expressao_aritmetica',4,'p_expressao_aritmetica','analizador.py',108),
-  ('op_aritmetico -> MAIS','op_aritmetico',1,'p_op_aritmetico','analizador.py',112),
-  ('op_aritmetico -> MENOS','op_aritmetico',1,'p_op_aritmetico','analizador.py',113),
-  ('op_aritmetico -> MULTIPLICACAO','op_aritmetico',1,'p_op_aritmetico','analizador.py',114),
-  ('op_aritmetico -> DIVISAOINT','op_aritmetico',1,'p_op_aritmetico','analizador.py',115),
-  ('op_aritmetico -> DIVISAO','op_aritmetico',1,'p_op_aritmetico','analizador.py',116),
-  ('op_aritmetico -> RESTO','op_aritmetico',1,'p_op_aritmetico','analizador.py',117),
-  ('expressao_comparacao -> PARENTESE_ESQ op_comparacao expressao expressao PARENTESE_DIR','expressao_comparacao',5,'p_expressao_comparacao','analizador.py',121),
-  ('op_comparacao -> IGUAL','op_comparacao',1,'p_op_comparacao','analizador.py',125),
-  ('op_comparacao -> DIFERENTE','op_comparacao',1,'p_op_comparacao','analizador.py',126),
-  ('op_comparacao -> MAIOR','op_comparacao',1,'p_op_comparacao','analizador.py',127),
-  ('op_comparacao -> MENOR','op_comparacao',1,'p_op_comparacao','analizador.py',128),
-  ('op_comparacao -> MAIORIGUAL','op_comparacao',1,'p_op_comparacao','analizador.py',129),
-  ('op_comparacao -> MENORIGUAL','op_comparacao',1,'p_op_comparacao','analizador.py',130),
-  ('expressao_logica -> PARENTESE_ESQ NOT expressao PARENTESE_DIR','expressao_logica',4,'p_expressao_logica','analizador.py',134),
-  ('expressao_logica -> PARENTESE_ESQ AND expressao expressao PARENTESE_DIR','expressao_logica',5,'p_expressao_logica','analizador.py',135),
-  ('expressao_logica -> PARENTESE_ESQ OR expressao expressao PARENTESE_DIR','expressao_logica',5,'p_expressao_logica','analizador.py',136),
-  ('expressao_lista -> PARENTESE_ESQ CAR expressao PARENTESE_DIR','expressao_lista',4,'p_expressao_lista','analizador.py',143),
-  ('expressao_lista -> PARENTESE_ESQ CDR expressao PARENTESE_DIR','expressao_lista',4,'p_expressao_lista','analizador.py',144),
-  ('expressao_lista -> PARENTESE_ESQ CONS expressao expressao PARENTESE_DIR','expressao_lista',5,'p_expressao_lista','analizador.py',145),
-  ('expressao_io -> PARENTESE_ESQ PRINT expressao PARENTESE_DIR','expressao_io',4,'p_expressao_io','analizador.py',153),
-  ('definicao_funcao -> PARENTESE_ESQ DEFUN IDENTIFICADOR lista_parametros expressao PARENTESE_DIR','definicao_funcao',6,'p_definicao_funcao','analizador.py',157),
-  ('lista_parametros -> PARENTESE_ESQ lista_de_expressoes PARENTESE_DIR','lista_parametros',3,'p_lista_parametros','analizador.py',161),
-  ('expressao_if -> PARENTESE_ESQ IF expressao expressao expressao PARENTESE_DIR','expressao_if',6,'p_expressao_if','analizador.py',165),
-  ('lista_generica -> PARENTESE_ESQ lista_de_expressoes PARENTESE_DIR','lista_generica',3,'p_lista_generica','analizador.py',169),
-  ('lista_de_expressoes -> expressao lista_de_expressoes','lista_de_expressoes',2,'p_lista_de_expressoes','analizador.py',174),
-  ('lista_de_expressoes -> <empty>','lista_de_expressoes',0,'p_lista_de_expressoes','analizador.py',175),
+  ('programa -> programa expressao','programa',2,'p_programa','analizador.py',101),
+  ('programa -> expressao','programa',1,'p_programa','analizador.py',102),
+  ('expressao -> atomo','expressao',1,'p_expressao','analizador.py',107),
+  ('expressao -> definicao_funcao','expressao',1,'p_expressao','analizador.py',108),
+  ('expressao -> expressao_if','expressao',1,'p_expressao','analizador.py',109),
+  ('expressao -> expressao_aritmetica','expressao',1,'p_expressao','analizador.py',110),
+  ('expressao -> expressao_comparacao','expressao',1,'p_expressao','analizador.py',111),
+  ('expressao -> expressao_logica','expressao',1,'p_expressao','analizador.py',112),
+  ('expressao -> expressao_lista','expressao',1,'p_expressao','analizador.py',113),
+  ('expressao -> expressao_io','expressao',1,'p_expressao','analizador.py',114),
+  ('expressao -> expressao_let','expressao',1,'p_expressao','analizador.py',115),
+  ('expressao -> expressao_setq','expressao',1,'p_expressao','analizador.py',116),
+  ('expressao -> expressao_laco','expressao',1,'p_expressao','analizador.py',117),
+  ('expressao -> expressao_vetorial','expressao',1,'p_expressao','analizador.py',118),
+  ('expressao -> lista_generica','expressao',1,'p_expressao','analizador.py',119),
+  ('atomo -> NUMERO','atomo',1,'p_atomo','analizador.py',123),
+  ('atomo -> IDENTIFICADOR','atomo',1,'p_atomo','analizador.py',124),
+  ('atomo -> NIL','atomo',1,'p_atomo','analizador.py',125),
+  ('expressao_aritmetica -> PARENTESE_ESQ op_aritmetico lista_de_expressoes PARENTESE_DIR','expressao_aritmetica',4,'p_expressao_aritmetica','analizador.py',129),
+  ('op_aritmetico -> MAIS','op_aritmetico',1,'p_op_aritmetico','analizador.py',133),
+  ('op_aritmetico -> MENOS','op_aritmetico',1,'p_op_aritmetico','analizador.py',134),
+  ('op_aritmetico -> MULTIPLICACAO','op_aritmetico',1,'p_op_aritmetico','analizador.py',135),
+  ('op_aritmetico -> DIVISAOINT','op_aritmetico',1,'p_op_aritmetico','analizador.py',136),
+  ('op_aritmetico -> DIVISAO','op_aritmetico',1,'p_op_aritmetico','analizador.py',137),
+  ('op_aritmetico -> RESTO','op_aritmetico',1,'p_op_aritmetico','analizador.py',138),
+  ('expressao_comparacao -> PARENTESE_ESQ op_comparacao expressao expressao PARENTESE_DIR','expressao_comparacao',5,'p_expressao_comparacao','analizador.py',142),
+  ('op_comparacao -> IGUAL','op_comparacao',1,'p_op_comparacao','analizador.py',146),
+  ('op_comparacao -> DIFERENTE','op_comparacao',1,'p_op_comparacao','analizador.py',147),
+  ('op_comparacao -> MAIOR','op_comparacao',1,'p_op_comparacao','analizador.py',148),
+  ('op_comparacao -> MENOR','op_comparacao',1,'p_op_comparacao','analizador.py',149),
+  ('op_comparacao -> MAIORIGUAL','op_comparacao',1,'p_op_comparacao','analizador.py',150),
+  ('op_comparacao -> MENORIGUAL','op_comparacao',1,'p_op_comparacao','analizador.py',151),
+  ('expressao_logica -> PARENTESE_ESQ NOT expressao PARENTESE_DIR','expressao_logica',4,'p_expressao_logica','analizador.py',155),
+  ('expressao_logica -> PARENTESE_ESQ AND expressao expressao PARENTESE_DIR','expressao_logica',5,'p_expressao_logica','analizador.py',156),
+  ('expressao_logica -> PARENTESE_ESQ OR expressao expressao PARENTESE_DIR','expressao_logica',5,'p_expressao_logica','analizador.py',157),
+  ('expressao_lista -> PARENTESE_ESQ CAR expressao PARENTESE_DIR','expressao_lista',4,'p_expressao_lista','analizador.py',162),
+  ('expressao_lista -> PARENTESE_ESQ CDR expressao PARENTESE_DIR','expressao_lista',4,'p_expressao_lista','analizador.py',163),
+  ('expressao_lista -> PARENTESE_ESQ CONS expressao expressao PARENTESE_DIR','expressao_lista',5,'p_expressao_lista','analizador.py',164),
+  ('expressao_io -> PARENTESE_ESQ PRINT expressao PARENTESE_DIR','expressao_io',4,'p_expressao_io','analizador.py',169),
+  ('definicao_funcao -> PARENTESE_ESQ DEFUN IDENTIFICADOR lista_parametros expressao PARENTESE_DIR','definicao_funcao',6,'p_definicao_funcao','analizador.py',173),
+  ('lista_parametros -> PARENTESE_ESQ lista_de_expressoes PARENTESE_DIR','lista_parametros',3,'p_lista_parametros','analizador.py',177),
+  ('expressao_if -> PARENTESE_ESQ IF expressao expressao expressao PARENTESE_DIR','expressao_if',6,'p_expressao_if','analizador.py',181),
+  ('expressao_let -> PARENTESE_ESQ LET PARENTESE_ESQ lista_de_ligacoes PARENTESE_DIR lista_de_expressoes PARENTESE_DIR','expressao_let',7,'p_expressao_let','analizador.py',194),
+  ('lista_de_ligacoes -> PARENTESE_ESQ IDENTIFICADOR expressao PARENTESE_DIR lista_de_ligacoes','lista_de_ligacoes',5,'p_lista_de_ligacoes','analizador.py',200),
+  ('lista_de_ligacoes -> <empty>','lista_de_ligacoes',0,'p_lista_de_ligacoes','analizador.py',201),
+  ('expressao_setq -> PARENTESE_ESQ SETQ IDENTIFICADOR expressao PARENTESE_DIR','expressao_setq',5,'p_expressao_setq','analizador.py',206),
+  ('expressao_laco -> PARENTESE_ESQ WHILE expressao lista_de_expressoes PARENTESE_DIR','expressao_laco',5,'p_expressao_laco','analizador.py',210),
+  ('expressao_laco -> PARENTESE_ESQ DOTIMES PARENTESE_ESQ IDENTIFICADOR expressao PARENTESE_DIR lista_de_expressoes PARENTESE_DIR','expressao_laco',8,'p_expressao_laco','analizador.py',211),
+  ('expressao_vetorial -> PARENTESE_ESQ MAPCAR op_aritmetico expressao expressao PARENTESE_DIR','expressao_vetorial',6,'p_expressao_vetorial','analizador.py',221),
+  ('expressao_vetorial -> PARENTESE_ESQ REDUCE op_aritmetico expressao PARENTESE_DIR','expressao_vetorial',5,'p_expressao_vetorial','analizador.py',222),
+  ('lista_generica -> PARENTESE_ESQ lista_de_expressoes PARENTESE_DIR','lista_generica',3,'p_lista_generica','analizador.py',226),
+  ('lista_de_expressoes -> expressao lista_de_expressoes','lista_de_expressoes',2,'p_lista_de_expressoes','analizador.py',230),
+  ('lista_de_expressoes -> <empty>','lista_de_expressoes',0,'p_lista_de_expressoes','analizador.py',231),
 ]